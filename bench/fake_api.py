@@ -0,0 +1,339 @@
+"""
+로컬 G 플랫폼 API 서버 (벤치마크용)
+===
+
+https://api.ucloudbiz.olleh.com/server/v1/client/api 를 흉내 내는 HTTP 서버입니다.
+
+- GPlatformApi.create_signature와 같은 방식(HMAC-SHA1)으로 signature 검증
+- 크기를 지정한 가상 인벤토리로 listVolumes, listSnapshots 응답 (page, pagesize 지원)
+- createSnapshot, deleteSnapshot은 비동기 job으로 처리하며 job 소요 시간, 응답 지연, 실패율, 호출 속도 제한 설정 가능
+- 텔레그램 sendMessage 요청도 받아 호출 수만 기록
+
+e.g.)
+    server = FakeGPlatformServer(api_key="key", secret_key="secret", disk_count=1000)
+    server.start()
+    ... config.yml의 kt_cloud.endpoint 를 server.endpoint 로 지정 ...
+    server.stop()
+"""
+
+import base64
+import hashlib
+import hmac
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote_plus
+
+API_PATH = "/server/v1/client/api"
+
+
+class FakeGPlatformServer:
+    def __init__(self, api_key, secret_key, disk_count=10, disks_per_server=2, snapshot_days=0,
+                 job_duration=(0.5, 2.0), latency=0.0, error_rate=0.0, rate_limit=None, page_cap=None, seed=0):
+        """
+        :param api_key: 허용할 API 키
+        :param secret_key: signature 검증에 사용할 secret 키
+        :param disk_count: 가상 디스크 수
+        :param disks_per_server: 서버 하나에 연결된 디스크 수
+        :param snapshot_days: 디스크마다 미리 만들어 둘 일별 스냅샷 수 (오늘 이전 날짜)
+        :param job_duration: job 소요 시간 범위(초) (최소, 최대)
+        :param latency: API 응답 지연(초)
+        :param error_rate: job 실패 비율 (0 ~ 1)
+        :param rate_limit: 초당 허용 호출 수, 넘으면 429 응답 (None이면 제한 없음)
+        :param page_cap: 리스트 API의 최대 pagesize, 요청한 pagesize가 더 크면 이 크기로 응답 (None이면 제한 없음)
+        :param seed: 난수 시드
+        """
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.job_duration = job_duration
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.page_cap = page_cap
+
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+        self.calls = Counter()  # command -> 호출 수
+        self.errors = Counter()  # 응답 코드 -> 수
+
+        self.volumes = []
+        self.snapshots = {}  # 스냅샷 아이디 -> 스냅샷
+        self.jobs = {}  # job 아이디 -> job 상태
+
+        self._rate_window = (0, 0)  # (초 단위 시각, 해당 초의 호출 수)
+
+        self._create_inventory(disk_count, disks_per_server, snapshot_days)
+        self.volume_index = {volume["id"]: volume for volume in self.volumes}
+
+        self.httpd = None
+        self.thread = None
+
+    def _create_inventory(self, disk_count, disks_per_server, snapshot_days):
+        today = datetime.now().date()
+
+        for i in range(disk_count):
+            server_name = f"server-{i // disks_per_server:05d}"
+            volume = {
+                "id": f"vol-{i:06d}",
+                "name": f"disk-{i:06d}",
+                "vmdisplayname": server_name,
+                "size": self.random.choice([50, 100, 200, 500]) * 1024 ** 3,
+                "type": "ROOT" if i % disks_per_server == 0 else "DATADISK",
+                "zonename": "KOR-Seoul M",
+                "state": "Ready",
+            }
+            self.volumes.append(volume)
+
+            for day in range(1, snapshot_days + 1):
+                self._add_snapshot(volume, f"{volume['name']}-{(today - timedelta(days=day)).isoformat()}")
+
+    def _add_snapshot(self, volume, name) -> dict:
+        snapshot = {
+            "id": f"snap-{next(self.ids):08d}",
+            "name": name,
+            "volumeid": volume["id"],
+            "volumename": volume["name"],
+            "volumetype": volume["type"],
+            "snapshottype": "MANUAL",
+            "intervaltype": "MANUAL",
+            "state": "BackedUp",
+            "created": datetime.now().strftime("%Y-%m-%dT%H:%M:%S+0900"),
+        }
+        self.snapshots[snapshot["id"]] = snapshot
+
+        return snapshot
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host="127.0.0.1", port=0):
+        """ 백그라운드 스레드에서 서버 시작 (port=0이면 빈 포트 사용) """
+        server = self
+
+        class Handler(FakeGPlatformHandler):
+            fake = server
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+        return self
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"calls": dict(self.calls), "errors": dict(self.errors)}
+
+    def reset_stats(self):
+        with self.lock:
+            self.calls.clear()
+            self.errors.clear()
+
+    def check_signature(self, raw_query) -> bool:
+        """ GPlatformApi.create_url, create_signature와 같은 방식으로 signature 검증 """
+        if "&signature=" not in raw_query:
+            return False
+
+        query, signature = raw_query.rsplit("&signature=", 1)
+        expected = hmac.new(self.secret_key.encode(), query.lower().encode(), hashlib.sha1)
+
+        return hmac.compare_digest(base64.b64encode(expected.digest()).decode(), unquote_plus(signature))
+
+    def is_rate_limited(self) -> bool:
+        if not self.rate_limit:
+            return False
+
+        with self.lock:
+            second = int(time.monotonic())
+            window, count = self._rate_window
+            count = count + 1 if window == second else 1
+            self._rate_window = (second, count)
+
+            return count > self.rate_limit
+
+    def handle(self, params) -> (int, dict):
+        """
+        API command 처리
+
+        :param params: query 파라미터 딕셔너리
+
+        :return: (응답 코드, 응답 body)
+        """
+        command = params.get("command")
+
+        with self.lock:
+            self.calls[command] += 1
+
+        if params.get("apikey", params.get("apiKey")) != self.api_key:
+            return 401, {"errorresponse": {"errortext": "unable to verify user credentials"}}
+
+        handler = getattr(self, f"_{command}", None)
+        if handler is None:
+            return 432, {"errorresponse": {"errortext": f"unknown command {command}"}}
+
+        with self.lock:
+            return handler(params)
+
+    def _page(self, items, params) -> list:
+        if "pagesize" not in params:
+            return items
+
+        page, page_size = int(params.get("page", 1)), int(params["pagesize"])
+        if self.page_cap:
+            page_size = min(page_size, self.page_cap)
+        return items[(page - 1) * page_size:page * page_size]
+
+    @staticmethod
+    def _filter(items, params) -> list:
+        # 실제 API처럼 keyword는 이름 일부, 나머지 필터는 값이 같은 항목만 반환
+        keyword = params.get("keyword")
+        fields = {key: value for key, value in params.items() if key in ("name", "volumeid", "snapshottype")}
+
+        return [item for item in items
+                if (keyword is None or keyword in item["name"])
+                and all(str(item.get(key)) == value for key, value in fields.items())]
+
+    def _listVolumes(self, params):
+        matched = self._filter(self.volumes, params)
+        volumes = self._page(matched, params)
+        body = {"count": len(matched)}
+        if volumes:
+            body["volume"] = volumes
+
+        return 200, {"listvolumesresponse": body}
+
+    def _listSnapshots(self, params):
+        matched = self._filter(list(self.snapshots.values()), params)
+        snapshots = self._page(matched, params)
+        body = {"count": len(matched)}
+        if snapshots:
+            body["snapshot"] = snapshots
+
+        return 200, {"listsnapshotsresponse": body}
+
+    def _new_job(self, operation, target, name=None) -> str:
+        job_id = f"job-{next(self.ids):08d}"
+        self.jobs[job_id] = {
+            "operation": operation,  # create 또는 delete
+            "target": target,  # 디스크(create) 또는 스냅샷 아이디(delete)
+            "name": name,  # 생성할 스냅샷 이름
+            "done_at": time.monotonic() + self.random.uniform(*self.job_duration),
+            "success": self.random.random() >= self.error_rate,
+            "result": None,  # 완료 후 jobresult
+        }
+
+        return job_id
+
+    def _createSnapshot(self, params):
+        volume = self.volume_index.get(params.get("volumeid"))
+        if volume is None:
+            return 431, {"errorresponse": {"errortext": f"volume {params.get('volumeid')} not found"}}
+
+        return 200, {"createsnapshotresponse": {"jobid": self._new_job("create", volume, params.get("name"))}}
+
+    def _deleteSnapshot(self, params):
+        if params.get("id") not in self.snapshots:
+            return 431, {"errorresponse": {"errortext": f"snapshot {params.get('id')} not found"}}
+
+        return 200, {"deletesnapshotresponse": {"jobid": self._new_job("delete", params["id"])}}
+
+    def _queryAsyncJobResult(self, params):
+        job = self.jobs.get(params.get("jobid"))
+        if job is None:
+            return 431, {"errorresponse": {"errortext": f"job {params.get('jobid')} not found"}}
+
+        response = {
+            "jobid": params["jobid"],
+            "cmd": "org.apache.cloudstack.api.command.user.snapshot."
+                   + ("CreateSnapshotCmd" if job["operation"] == "create" else "DeleteSnapshotCmd"),
+        }
+
+        if time.monotonic() < job["done_at"]:
+            response["jobstatus"] = 0
+        elif not job["success"]:
+            response["jobstatus"] = 2
+            response["jobresult"] = {"errorcode": 530, "errortext": "fake failure"}
+        else:
+            # 완료된 job은 처음 조회될 때 인벤토리에 반영
+            if job["result"] is None:
+                if job["operation"] == "create":
+                    job["result"] = {"snapshot": self._add_snapshot(job["target"], job["name"])}
+                else:
+                    self.snapshots.pop(job["target"], None)
+                    job["result"] = {"success": True}
+
+            response["jobstatus"] = 1
+            response["jobresult"] = job["result"]
+
+        return 200, {"queryasyncjobresultresponse": response}
+
+
+class FakeGPlatformHandler(BaseHTTPRequestHandler):
+    fake = None  # FakeGPlatformServer.start에서 지정
+
+    def log_message(self, format, *args):  # 요청마다 로그를 남기지 않음
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(data)
+
+        if status >= 400:
+            with self.fake.lock:
+                self.fake.errors[status] += 1
+
+    def do_GET(self):
+        path, _, raw_query = self.path.partition("?")
+
+        if self.fake.latency:
+            time.sleep(self.fake.latency)
+
+        if path != API_PATH:
+            return self._send(404, {"errorresponse": {"errortext": "not found"}})
+
+        if self.fake.is_rate_limited():
+            return self._send(429, {"errorresponse": {"errortext": "rate limit exceeded"}})
+
+        if not self.fake.check_signature(raw_query):
+            return self._send(401, {"errorresponse": {"errortext": "signature mismatch"}})
+
+        params = dict(item.split("=", 1) for item in raw_query.split("&") if "=" in item)
+        params = {key: unquote_plus(value) for key, value in params.items()}
+
+        status, body = self.fake.handle(params)
+        self._send(status, body)
+
+    def do_POST(self):  # 텔레그램 sendMessage
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        with self.fake.lock:
+            self.fake.calls["sendMessage"] += 1
+
+        self._send(200, {"ok": True, "result": {}})
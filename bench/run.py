@@ -0,0 +1,188 @@
+"""
+스냅샷 생성, 삭제, 리포트 벤치마크
+===
+
+로컬 가짜 G 플랫폼 API 서버(bench.fake_api)를 띄우고 디스크 수별로
+CreateSnapshotManager, DeleteSnapshotManager, TelegramManager를 실행하여
+소요 시간, API 호출 수, 최대 메모리 사용량을 측정합니다.
+
+각 단계는 별도 프로세스에서 실행하므로 최대 메모리 사용량이 단계별로 측정되고,
+job 기록과 인벤토리 캐시는 임시 디렉토리(SNAPSHOT_RESULT_DIR)에 저장되어 운영 데이터에 영향을 주지 않습니다.
+
+e.g.)
+    python -m bench.run --sizes 10,1000,10000
+    python -m bench.run --sizes 1000 --latency 0.05 --error-rate 0.01 --rate-limit 50
+    python -m bench.run --sizes 1000 --workers 4    # 4개 worker가 lease로 나눠서 실행
+    python -m bench.run --sizes 1000 --pipeline     # 생성, 삭제를 파이프라인으로 함께 실행
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+API_KEY = "bench-api-key"
+SECRET_KEY = "bench-secret-key"
+PHASES = ("create", "delete", "report")
+PIPELINE_PHASES = ("pipeline", "report")
+
+
+def write_config(work_dir, server, args) -> (str, str):
+    """
+    벤치마크용 config.yml, disk_list 작성
+
+    :return: (config 파일 경로, disk_list 파일 경로)
+    """
+    import yaml
+
+    config = {
+        "kt_cloud": {"account_name": "bench", "api_key": API_KEY, "secret_key": SECRET_KEY,
+                     "endpoint": server.endpoint},
+        "telegram": {"bot_token": "bench", "chat_id": "bench", "api_url": server.base_url},
+        "time": {"start_date": "2024-01-01", "cycle": "1d", "del_cycle": f"{args.keep_days}d",
+                 "create_time": "01:00", "delete_time": "02:00"},
+        "http": {"pool_size": args.concurrency, "timeout": [5, 30]},
+        "rate_limit": {"rate": args.client_rate, "burst": args.concurrency, "max_jobs": args.concurrency},
+        "job_tracker": {"poll_interval": args.poll_interval, "max_poll_interval": args.poll_interval * 4},
+        "report": {"workers": args.concurrency},
+    }
+
+    if args.workers > 1:  # 여러 worker가 같은 lease 디렉토리로 디스크를 나눠 처리
+        config["sharding"] = {"enabled": True, "lease_dir": os.path.join(work_dir, "leases"), "ttl": 30}
+
+    config_path = os.path.join(work_dir, "config.yml")
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+
+    disk_list_path = os.path.join(work_dir, "disk_list")
+    with open(disk_list_path, "w") as f:
+        for volume in server.volumes:
+            f.write(f"{volume['name']}, {volume['vmdisplayname']}\n")
+
+    return config_path, disk_list_path
+
+
+def run_phase(phase, config_path, disk_list_path) -> dict:
+    """
+    (자식 프로세스) 단계 하나 실행 후 소요 시간, 최대 메모리 사용량 반환
+    """
+    from src.manager.create_snapshot import CreateSnapshotManager
+    from src.manager.delete_snapshot import DeleteSnapshotManager
+    from src.manager.pipeline import SnapshotPipeline
+    from src.manager.telegram import TelegramManager
+
+    started = time.perf_counter()
+
+    if phase == "create":
+        CreateSnapshotManager(config_path, disk_list_path).create_snapshot()
+    elif phase == "delete":
+        DeleteSnapshotManager(config_path, disk_list_path).delete_snapshot()
+    elif phase == "pipeline":
+        SnapshotPipeline(config_path, disk_list_path).run()
+    else:
+        TelegramManager(config_path, disk_list_path).telegram()
+
+    return {
+        "wall_time": time.perf_counter() - started,
+        "peak_memory_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def bench_size(size, args) -> list:
+    """
+    디스크 수 하나에 대해 create, delete, report 단계 측정
+    """
+    from bench.fake_api import FakeGPlatformServer
+
+    server = FakeGPlatformServer(API_KEY, SECRET_KEY, disk_count=size, snapshot_days=args.snapshot_days,
+                                 job_duration=(args.job_min, args.job_max), latency=args.latency,
+                                 error_rate=args.error_rate, rate_limit=args.rate_limit).start()
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="snapshot-bench-") as work_dir:
+            config_path, disk_list_path = write_config(work_dir, server, args)
+
+            for phase in PIPELINE_PHASES if args.pipeline else PHASES:
+                server.reset_stats()
+
+                # worker마다 job 기록, 인벤토리 캐시를 따로 두고 동시에 실행 (리포트는 첫 번째 worker 기록으로 한 번만)
+                workers = args.workers if phase != "report" else 1
+                procs = []
+                for worker in range(workers):
+                    result_dir = work_dir if args.workers == 1 else os.path.join(work_dir, f"worker-{worker}")
+                    env = dict(os.environ, SNAPSHOT_RESULT_DIR=result_dir, SNAPSHOT_WORKER_ID=f"worker-{worker}",
+                               PYTHONPATH=os.getcwd())
+                    procs.append(subprocess.Popen([sys.executable, "-m", "bench.run", "--phase", phase,
+                                                   "--config", config_path, "--disk-list", disk_list_path],
+                                                  env=env, stdout=subprocess.PIPE,
+                                                  stderr=None if args.verbose else subprocess.DEVNULL, text=True))
+
+                worker_results = []
+                for proc in procs:
+                    stdout, _ = proc.communicate()
+                    if proc.returncode:
+                        raise subprocess.CalledProcessError(proc.returncode, proc.args)
+                    worker_results.append(json.loads(stdout.strip().splitlines()[-1]))
+
+                result = {"wall_time": max(item["wall_time"] for item in worker_results),
+                          "peak_memory_mb": max(item["peak_memory_mb"] for item in worker_results)}
+                stats = server.stats()
+                result.update(size=size, phase=phase, api_calls=sum(stats["calls"].values()),
+                              calls=stats["calls"], errors=stats["errors"])
+                results.append(result)
+
+                print(f"{size:>7} {phase:<7} {result['wall_time']:>10.2f}s {result['api_calls']:>9} "
+                      f"{result['peak_memory_mb']:>10.1f}MB  {stats['calls']} {stats['errors'] or ''}", flush=True)
+    finally:
+        server.stop()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스냅샷 생성, 삭제, 리포트 벤치마크")
+    parser.add_argument("--sizes", default="10,1000,10000", help="디스크 수 목록 (쉼표로 구분)")
+    parser.add_argument("--snapshot-days", type=int, default=3, help="디스크마다 미리 만들어 둘 일별 스냅샷 수")
+    parser.add_argument("--keep-days", type=int, default=2, help="보존 기간(time.del_cycle, 일)")
+    parser.add_argument("--job-min", type=float, default=0.2, help="job 최소 소요 시간(초)")
+    parser.add_argument("--job-max", type=float, default=1.0, help="job 최대 소요 시간(초)")
+    parser.add_argument("--latency", type=float, default=0.0, help="API 응답 지연(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="job 실패 비율")
+    parser.add_argument("--rate-limit", type=int, default=None, help="서버의 초당 허용 호출 수")
+    parser.add_argument("--client-rate", type=float, default=500, help="클라이언트 초당 호출 수 (rate_limit.rate)")
+    parser.add_argument("--concurrency", type=int, default=50, help="동시 job 수, 커넥션 풀 크기")
+    parser.add_argument("--poll-interval", type=float, default=0.2, help="job 상태 확인 간격(초)")
+    parser.add_argument("--pipeline", action="store_true", help="생성, 삭제를 파이프라인 한 단계로 실행")
+    parser.add_argument("--workers", type=int, default=1, help="생성, 삭제를 나눠 실행할 worker 프로세스 수 (sharding)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--verbose", action="store_true", help="Manager 로그 출력")
+
+    # 자식 프로세스용 인자
+    parser.add_argument("--phase", choices=PHASES + PIPELINE_PHASES, help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    parser.add_argument("--disk-list", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.phase:
+        print(json.dumps(run_phase(args.phase, args.config, args.disk_list)))
+        return
+
+    print(f"{'disks':>7} {'phase':<7} {'wall time':>11} {'api calls':>9} {'peak mem':>12}  calls")
+
+    results = []
+    for size in (int(size) for size in args.sizes.split(",")):
+        results.extend(bench_size(size, args))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+한 번 실행하고 종료하는 CLI
+===
+
+상주하는 스케줄러(src/main.py) 대신 cron이나 Kubernetes CronJob에서 단계 하나만 실행할 때 사용합니다.
+
+e.g.)
+    python -m src.cli create --config /etc/snapshot/config/config.yml
+    python -m src.cli delete --account account1
+    python -m src.cli report
+    python -m src.cli plan
+    python -m src.cli verify --online
+
+- 하위 명령에 필요한 모듈만 실행할 때 불러옵니다. (verify는 --online이 아니면 requests를 불러오지 않음)
+- config 파일은 시작할 때 한 번 읽어 검증하고, 이후 Manager는 같은 내용을 공유합니다.
+- 하나라도 실패한 계정이 있으면 종료 코드 1을 반환하여 Job 실패로 기록되도록 합니다.
+"""
+
+import argparse
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from src.common.config import CONFIG_PATH, DISK_LIST_PATH, ACCOUNT_WORKERS
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # 모든 하위 명령이 함께 쓰는 옵션 (e.g. python -m src.cli create --config ...)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--config", default=CONFIG_PATH, help=f"config 파일 경로 (기본값: {CONFIG_PATH})")
+    common.add_argument("--disk-list", default=DISK_LIST_PATH,
+                        help=f"디스크 리스트 파일 경로, 계정의 disk_list가 있으면 그 값을 사용 (기본값: {DISK_LIST_PATH})")
+    common.add_argument("--account", action="append", default=[],
+                        help="실행할 계정 이름 (여러 번 지정 가능, 기본값: 모든 계정)")
+
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="디스크 스냅샷 생성, 삭제, 리포트를 한 번 실행")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    create = commands.add_parser("create", parents=[common], help="스냅샷 생성")
+    create.add_argument("--pipeline", action="store_true", help="생성, 삭제를 파이프라인으로 함께 실행")
+    create.set_defaults(func=create_command)
+
+    commands.add_parser("delete", parents=[common], help="보존 정책에 따라 스냅샷 삭제").set_defaults(func=delete_command)
+    commands.add_parser("report", parents=[common], help="텔레그램 리포트 전송").set_defaults(func=report_command)
+    plan = commands.add_parser("plan", parents=[common],
+                               help="실행하지 않고 호출할 생성, 삭제 API와 예상 소요 시간 출력 (dry-run)")
+    plan.add_argument("--date", type=parse_date, help="실행 날짜 (YYYY-MM-DD, 기본값: 오늘)")
+    plan.add_argument("--refresh", action="store_true", help="인벤토리 캐시를 무시하고 리스트 API 호출")
+    plan.add_argument("--summary", action="store_true", help="API 호출 목록 없이 건수와 확인이 필요한 디스크만 출력")
+    plan.set_defaults(func=plan_command)
+
+    verify = commands.add_parser("verify", parents=[common], help="config 파일, 디스크 리스트 검증")
+    verify.add_argument("--online", action="store_true", help="계정마다 디스크 리스트 API를 호출하여 인증 확인")
+    verify.set_defaults(func=verify_command)
+
+    return parser
+
+
+def parse_date(value) -> str:
+    """ --date 값 검증 (YYYY-MM-DD) """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"YYYY-MM-DD 형태가 아닙니다: {value}")
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from src.common.settings import load_config
+
+    try:
+        args.config_data = load_config(args.config)  # 여기서 한 번 읽고 검증 (잘못된 파일이면 종료)
+        return args.func(args)
+
+    except SystemExit as e:  # 설정, 디스크 리스트 파일 오류 등으로 종료한 경우
+        return e.code if isinstance(e.code, int) and e.code else 1
+
+
+def select_accounts(args) -> list:
+    """
+    config 파일의 계정 중 --account로 지정한 계정 (지정하지 않으면 모든 계정)
+
+    :return account_list: BaseManager.list_accounts 결과 중 실행할 계정 리스트
+    """
+    from src.common.base import BaseManager
+
+    account_list = BaseManager.list_accounts(args.config_data)
+    if not args.account:
+        return account_list
+
+    # 여러 zone으로 펼친 계정은 "계정 이름(zone)" 또는 계정 이름으로 선택
+    def names(account):
+        return {account["account_name"], account["account_name"].rsplit("(", 1)[0]}
+
+    selected = [account for account in account_list if names(account) & set(args.account)]
+
+    unknown = set(args.account) - set().union(*(names(account) for account in account_list))
+    if unknown:
+        _LOGGER.error(f"config 파일에 없는 계정입니다: {', '.join(sorted(unknown))}")
+
+    return selected
+
+
+def run_accounts(args, task, func) -> int:
+    """
+    계정마다 func(account)를 동시에 실행하고 모두 끝날 때까지 대기
+
+    :param task: 로그용 작업 이름
+    :param func: 계정 딕셔너리를 인자로 받는 함수
+
+    :return: 모두 성공하면 0, 실패한 계정이 있으면 1
+    """
+    account_list = select_accounts(args)
+    if not account_list:
+        _LOGGER.error("실행할 계정이 없습니다.")
+        return 1
+
+    workers = min(int(args.config_data.get("workers", ACCOUNT_WORKERS)), len(account_list))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account") as executor:
+        futures = {account["account_name"]: executor.submit(func, account) for account in account_list}
+
+    failed = 0
+    for account_name, future in futures.items():
+        try:
+            future.result()
+        except BaseException as e:  # 작업 안의 sys.exit도 실패로 집계
+            _LOGGER.error(f"[{account_name}] {task} 실행 중 오류 발생: {e!r}")
+            failed += 1
+
+    return 1 if failed else 0
+
+
+def create_command(args) -> int:
+    if args.pipeline:
+        from src.manager.pipeline import SnapshotPipeline
+        return run_accounts(args, "pipeline",
+                            lambda account: SnapshotPipeline(args.config, args.disk_list, account=account).run())
+
+    from src.manager.create_snapshot import CreateSnapshotManager
+    return run_accounts(args, "create", lambda account: CreateSnapshotManager(
+        args.config, args.disk_list, account=account).create_snapshot())
+
+
+def delete_command(args) -> int:
+    from src.manager.delete_snapshot import DeleteSnapshotManager
+    return run_accounts(args, "delete", lambda account: DeleteSnapshotManager(
+        args.config, args.disk_list, account=account).delete_snapshot())
+
+
+def report_command(args) -> int:
+    from src.manager.telegram import TelegramManager
+    from src.manager.notifier import get_notifier
+
+    code = run_accounts(args, "report", lambda account: TelegramManager(
+        args.config, args.disk_list, account=account).telegram())
+
+    # 여러 계정의 리포트를 합쳐 보낸 뒤 종료
+    if not get_notifier(args.config_data).flush():
+        return 1
+    return code
+
+
+def plan_command(args) -> int:
+    from src.common.settings import load_schedule
+    from src.manager.planner import SnapshotPlanner, format_dry_run
+
+    schedule = load_schedule(args.config)
+    now = datetime.now()
+
+    print(f"실행 주기: {schedule.cycle}일 (시작일 {schedule.start_date:%Y-%m-%d})")
+    for task, at_time, days in (("create", schedule.create_time, 0), ("delete", schedule.delete_time, 0),
+                                ("report", schedule.report_time, 1)):
+        print(f"  {task:<7} 다음 실행: {next_run(schedule, at_time, days, now):%Y-%m-%d %H:%M}")
+
+    account_list = select_accounts(args)
+    if not account_list:
+        _LOGGER.error("실행할 계정이 없습니다.")
+        return 1
+
+    def build(account):
+        try:
+            return SnapshotPlanner(args.config, args.disk_list, account=account).build(args.date, args.refresh)
+        except BaseException as e:  # 작업 안의 sys.exit도 실패로 집계
+            _LOGGER.error(f"[{account['account_name']}] 실행 계획 생성 중 오류 발생: {e!r}")
+            return None
+
+    # 계정마다 리스트 API를 동시에 호출하고, 출력은 계정 순서대로
+    workers = min(int(args.config_data.get("workers", ACCOUNT_WORKERS)), len(account_list))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account") as executor:
+        dry_runs = list(executor.map(build, account_list))
+
+    for dry_run in dry_runs:
+        if dry_run is not None:
+            print("\n".join(format_dry_run(dry_run, details=not args.summary)))
+
+    return 1 if None in dry_runs else 0
+
+
+def next_run(schedule, at_time, days=0, now=None) -> datetime:
+    """
+    start_date(+days)부터 cycle일마다 돌아오는 at_time 중 now 이후 가장 빠른 시각
+
+    :param schedule: load_schedule 결과
+    :param at_time: 실행 시각 (HH:MM)
+    :param days: start_date로부터 지난 일 수 (e.g. 리포트는 1)
+
+    :return: 다음 실행 시각
+    """
+    now = now or datetime.now()
+    first = datetime.combine(schedule.start_date.date() + timedelta(days=days),
+                             datetime.strptime(at_time, "%H:%M").time())
+    if first >= now:
+        return first
+
+    interval = timedelta(days=schedule.cycle)
+    return first + interval * -(-(now - first) // interval)  # 올림
+
+
+def verify_command(args) -> int:
+    from src.common.settings import load_disk_list
+    from src.manager.retention import RetentionPolicy
+
+    errors = 0
+
+    try:
+        print(f"보존 정책: {RetentionPolicy.from_config(args.config_data)}")
+    except ValueError as e:
+        _LOGGER.error(e)
+        errors += 1
+
+    account_list = select_accounts(args)
+    if not account_list:
+        _LOGGER.error("실행할 계정이 없습니다.")
+        return 1
+
+    for account in account_list:
+        ok = True
+
+        disk_list = load_disk_list(account.get("disk_list", args.disk_list))
+        invalid = [disk for disk in disk_list if len(disk) != 2 or not all(disk)]
+        if invalid:
+            _LOGGER.error(f"[{account['account_name']}] 디스크 리스트 형식이 잘못되었습니다 "
+                          f"(디스크 이름, 서버 이름): {invalid[:5]}")
+            ok = False
+
+        if args.online:
+            ok = check_account(args, account) and ok
+
+        print(f"[{account['account_name']}] 디스크 {len(disk_list)}개 {'확인 완료' if ok else '확인 실패'}")
+        errors += not ok
+
+    return 1 if errors else 0
+
+
+def check_account(args, account) -> bool:
+    """
+    디스크 리스트 API를 한 번 호출하여 API 주소, 키가 맞는지 확인
+
+    :return: 호출에 성공했으면 True
+    """
+    from src.common.base import BaseManager
+
+    config = BaseManager.apply_account(args.config_data, account)
+    try:
+        response = BaseManager.create_g_platform_api(config).list_disk(page=1, pagesize=1)
+    except Exception as e:
+        _LOGGER.error(f"[{account['account_name']}] API 호출 실패: {e!r}")
+        return False
+
+    if "listvolumesresponse" not in response:
+        _LOGGER.error(f"[{account['account_name']}] API 응답이 올바르지 않습니다: {str(response)[:200]}")
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(main())
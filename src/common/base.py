@@ -7,6 +7,10 @@ Manager 클래스의 베이스 클래스 (=부모 클래스)
 
 import sys
 import logging
+from collections.abc import Mapping
+
+from src.common.config import API_ENDPOINT, HTTP_POOL_SIZE, HTTP_TIMEOUT
+from src.common.settings import load_disk_list
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 _LOGGER = logging.getLogger(__name__)
@@ -39,55 +43,88 @@ class BaseManager:
             _LOGGER.error(f"파일을 로드하는 중 오류가 발생했습니다: {e}")
             sys.exit()
 
-    @staticmethod
-    def write_job_file(content, job_file_path) -> None:
-        """ 
-        job file 작성 함수
-        
-        :param content: 파일에 작성할 job_id
-        :param job_file_path: 기록할 job file 위치
+    def read_disk_list(self):
+        """
+        스냅샷 대상 디스크 파일(self.disk_list_path)을 (디스크 이름, 서버 이름) 튜플 리스트로 반환
+        (파일이 바뀌었을 때만 다시 읽음)
 
-        :return: X
+        :return disk_list: e.g. [("disk_name1", "server_name"), ("disk_name2", "server_name")]
         """
 
-        try:
-            with open(job_file_path, "a") as f:
-                f.write(f"{content}\n")
-                f.flush()
+        return list(load_disk_list(self.disk_list_path))
 
-        except Exception as e:
-            _LOGGER.error(f"Job ID({content}) 파일 쓰기 중 오류 발생: {e}")
+    @staticmethod
+    def list_accounts(config: dict) -> list:
+        """
+        config 파일의 accounts 항목(없으면 kt_cloud)을 계정, zone 단위로 펼쳐 반환
+
+        zones 항목은 zone 아이디 또는 {zone_id, disk_list} 딕셔너리로 작성하며,
+        zone마다 disk_list를 지정하면 다른 zone의 디스크를 없는 디스크로 기록하지 않습니다.
+
+        :param config: 로드한 config 파일 내용
 
-    @classmethod
-    def check_arg(cls, required_arg_list, arg_list) -> dict:
+        :return account_list: kt_cloud 항목과 같은 형태의 딕셔너리 리스트
+                              e.g. [{"account_name": "a(zone1)", "api_key": ..., "zone_id": "zone1"}]
         """
-        python 실행 인자 확인 후 딕셔너리로 반환
-        
-        :param required_arg_list: 필수로 요구하는 인자 리스트
-        :param arg_list: 입력받은 인자 리스트
-        
-        :return arg_dict: 인자들이 담긴 딕셔너리 e.g. {"config": "/root/config.yml"} 
+        account_list = []
+
+        for account in config.get("accounts") or [config["kt_cloud"]]:
+            zones = account.get("zones") or [account.get("zone_id")]
+
+            for zone in zones:
+                zone = zone if isinstance(zone, Mapping) else {"zone_id": zone}  # config는 MappingProxyType
+
+                zone_account = dict(account, zone_id=zone.get("zone_id"))
+                if zone.get("disk_list"):  # zone별 디스크 리스트
+                    zone_account["disk_list"] = zone["disk_list"]
+                if len(zones) > 1:  # 여러 zone이면 계정 이름에 zone 표시
+                    zone_account["account_name"] = f"{account['account_name']}({zone_account['zone_id']})"
+                account_list.append(zone_account)
+
+        return account_list
+
+    @staticmethod
+    def apply_account(config: dict, account) -> dict:
         """
-        arg_dict = {}
+        계정 하나를 kt_cloud 항목으로 하는 config 반환 (계정별 rate_limit이 있으면 함께 적용)
 
-        try:
-            for arg in arg_list:
-                if not arg.startswith("--"):
-                    continue
+        :param config: 로드한 config 파일 내용
+        :param account: list_accounts가 반환한 계정, None이면 config 그대로 반환
 
-                command = arg.split("=")[0].replace("--", "")
-                value = arg.split("=")[1]
+        :return config: 계정을 적용한 config
+        """
+        if account is None:
+            return config
 
-                if command in required_arg_list:
-                    arg_dict[command] = value
-                    required_arg_list.remove(command)
+        config = dict(config, kt_cloud=account)
+        if account.get("rate_limit"):
+            config["rate_limit"] = account["rate_limit"]
 
-            if required_arg_list:
-                raise SyntaxError
+        return config
 
-        except (IndexError, SyntaxError) as e:
-            _LOGGER.error(f"{required_arg_list} 옵션이 잘못되었습니다.    "
-                          f"e.g.) python3 ./src/delete_snapshot.py --config=/root/config.yml")
-            sys.exit()
+    @staticmethod
+    def create_g_platform_api(config: dict):
+        """
+        config 파일 내용으로 공유 커넥션 풀을 사용하는 GPlatformApi 생성
+
+        :param config: 로드한 config 파일 내용
 
-        return arg_dict
+        :return g_platform_api: GPlatformApi 객체
+        """
+        # requests는 API를 호출하는 작업에서만 로드 (cli의 plan, verify 시작 시간 단축)
+        from src.common.retry import RetryPolicy
+        from src.manager.api import GPlatformApi, get_session
+
+        http_config = config.get("http") or {}
+
+        timeout = http_config.get("timeout", HTTP_TIMEOUT)
+        if isinstance(timeout, (list, tuple)):  # yaml에서는 [connect, read] 리스트로 작성
+            timeout = tuple(timeout)
+
+        return GPlatformApi(api_key=config["kt_cloud"]["api_key"],
+                            secret_key=config["kt_cloud"]["secret_key"],
+                            session=get_session(int(http_config.get("pool_size", HTTP_POOL_SIZE))),
+                            timeout=timeout,
+                            endpoint=config["kt_cloud"].get("endpoint", API_ENDPOINT),
+                            zone_id=config["kt_cloud"].get("zone_id"),
+                            retry_policy=RetryPolicy.from_config(config))
@@ -5,3 +5,69 @@ import os
 CONFIG_PATH = "/etc/snapshot/config/config.yml"
 
 DISK_LIST_PATH = "/etc/snapshot/config/disk_list"
+
+# job 기록, 인벤토리 캐시 등 실행 결과를 저장하는 디렉토리 (기본값: src/manager/result)
+RESULT_DIR = os.environ.get("SNAPSHOT_RESULT_DIR",
+                            os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "../manager/result")))
+
+API_ENDPOINT = "https://api.ucloudbiz.olleh.com/server/v1/client/api"  # G 플랫폼 API 주소
+TELEGRAM_API_URL = "https://api.telegram.org"  # 텔레그램 Bot API 주소
+
+# HTTP 커넥션 풀 설정 (config.yml의 http 항목으로 덮어쓸 수 있음)
+HTTP_POOL_SIZE = 10  # 호스트당 유지할 keep-alive 커넥션 수
+HTTP_TIMEOUT = (5, 30)  # (connect timeout, read timeout) 초 단위
+
+# API 호출 속도 제한 (config.yml의 rate_limit 항목으로 덮어쓸 수 있음)
+RATE_LIMIT_RATE = 1.0  # 초당 API 호출 수 (token bucket 충전 속도)
+RATE_LIMIT_BURST = 5  # 한 번에 몰아서 보낼 수 있는 최대 호출 수
+MAX_CONCURRENT_JOBS = 10  # 계정당 동시에 진행할 수 있는 스냅샷 job 수
+
+# API 호출 재시도, circuit breaker (config.yml의 retry 항목으로 덮어쓸 수 있음)
+RETRY_MAX_ATTEMPTS = 4  # 일시적인 오류일 때 API 하나를 호출하는 최대 횟수
+RETRY_BASE_DELAY = 1  # 첫 재시도 전 최대 대기 시간(초), 재시도마다 2배
+RETRY_MAX_DELAY = 30  # 재시도 전 대기 시간 최대값(초)
+RETRY_BUDGET = 100  # 실행 하나에서 쓸 수 있는 재시도 횟수
+BREAKER_THRESHOLD = 5  # 연속으로 이만큼 실패하면 호출을 멈춤
+BREAKER_RESET_TIMEOUT = 60  # 호출을 멈춘 뒤 시험 호출까지 대기 시간(초)
+BREAKER_MAX_WAIT = 60 * 10  # 호출 하나가 멈춘 circuit을 기다리는 최대 시간(초)
+
+# job 완료 확인 (config.yml의 job_tracker 항목으로 덮어쓸 수 있음)
+JOB_POLL_INTERVAL = 10  # 첫 job 상태 확인까지 대기 시간(초)
+JOB_MAX_POLL_INTERVAL = 300  # job 상태 확인 간격 최대값(초)
+JOB_TRACK_TIMEOUT = 60 * 60 * 6  # job 하나를 추적하는 최대 시간(초), 넘으면 진행 중으로 남겨둠
+
+# 여러 worker(replica)가 디스크 리스트를 나눠 처리 (config.yml의 sharding 항목으로 덮어쓸 수 있음)
+LEASE_DIR = os.path.join(RESULT_DIR, "leases")  # lease 파일 디렉토리, 모든 worker가 함께 쓰는 볼륨이어야 함
+LEASE_TTL = 60 * 5  # 갱신하지 않은 lease가 만료되어 다른 worker가 가져갈 수 있게 되는 시간(초)
+LEASE_MAX_WAIT = JOB_TRACK_TIMEOUT  # 다른 worker가 가져간 작업이 끝나기를 기다리는 최대 시간(초)
+LEASE_RETENTION = 60 * 60 * 24 * 7  # 지난 lease 파일을 지우기 전까지 보관하는 시간(초)
+
+# job 소요 시간 예측 (config.yml의 pacing 항목으로 덮어쓸 수 있음)
+DEFAULT_JOB_DURATION = 60 * 5  # 기록이 없을 때 예상하는 job 하나의 소요 시간(초)
+PACING_HISTORY = 500  # 소요 시간 예측에 사용할 최근 job 수
+BACKUP_WINDOW = None  # 실행을 끝내야 하는 시간(초), None이면 동시 job 수를 줄이지 않음
+
+# 생성, 삭제 파이프라인 (config.yml의 pipeline 항목으로 덮어쓸 수 있음)
+PIPELINE_SUBMIT_WORKERS = 10  # 동시에 생성, 삭제 API를 제출하는 단계 worker 수
+
+LIST_PAGE_SIZE = 500  # 디스크, 스냅샷 리스트 API 한 번에 가져올 개수
+STREAM_CHUNK_SIZE = 64 * 1024  # 리스트 API 응답을 나눠 읽는 크기(byte)
+
+INVENTORY_TTL = 60 * 60  # 디스크, 스냅샷 리스트 캐시 유효 시간(초)
+
+# 텔레그램 리포트 job 상태 확인 (config.yml의 report 항목으로 덮어쓸 수 있음)
+REPORT_WORKERS = 10  # 동시에 확인할 job 수
+REPORT_TIMEOUT = 15  # job 하나의 상태 확인 제한 시간(초)
+
+# 텔레그램 알림 큐 (config.yml의 notify 항목으로 덮어쓸 수 있음)
+NOTIFY_QUEUE_SIZE = 1000  # 전송을 기다릴 수 있는 최대 메세지 수, 넘으면 버림
+NOTIFY_BATCH_WINDOW = 2  # 마지막 메세지 이후 더 합칠 메세지를 기다리는 시간(초)
+NOTIFY_MAX_DELAY = 30  # 첫 메세지를 보내기까지 기다리는 최대 시간(초)
+NOTIFY_MAX_ATTEMPTS = 5  # 메세지 하나를 보내는 최대 횟수 (429, 5xx, 연결 실패)
+NOTIFY_FLUSH_TIMEOUT = 60  # 종료할 때 남은 메세지를 보내기를 기다리는 최대 시간(초)
+NOTIFY_FAILURES = False  # 생성, 삭제 실패가 있으면 실행이 끝날 때 알림
+
+METRICS_PORT = 9100  # /metrics 엔드포인트 포트 (config.yml의 metrics.port로 덮어쓸 수 있음)
+ACCOUNT_WORKERS = 4  # 여러 계정의 생성, 삭제를 동시에 실행할 worker 수 (config.yml의 workers로 덮어쓸 수 있음)
+REPORT_TIME = "09:30"  # 삭제 다음 날 텔레그램 리포트 전송 시각 (config.yml의 time.report_time으로 덮어쓸 수 있음)
+CONFIG_CHECK_INTERVAL = 60  # config 파일의 time 항목 변경을 확인하는 주기(초)
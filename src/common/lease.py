@@ -0,0 +1,313 @@
+"""
+여러 worker의 작업 분배 (lease)
+===
+
+여러 프로세스나 replica가 같은 디스크 리스트를 나눠서 처리할 때 사용합니다.
+
+- 작업 단위(생성은 서버 그룹, 삭제는 스냅샷)마다 모든 worker가 함께 쓰는 디렉토리에 lease 파일을 두고,
+  파일 잠금(filelock) 안에서 먼저 가져간 worker만 작업합니다. 빨리 끝낸 worker가 다음 작업을 더 가져갑니다.
+- event loop를 멈추지 않도록 lease를 가져올 때는 잠금을 기다리지 않습니다.
+  다른 worker가 같은 lease 파일을 쓰는 중이면 그 작업은 건너뛰고, sweep에서 다시 가져옵니다.
+- 가져간 lease는 백그라운드 스레드가 주기적으로 연장합니다.
+  worker가 멈춰 ttl 동안 연장되지 않으면 다른 worker가 가져가고, lease에 기록된 job은 다시 제출하지 않고 완료까지 확인합니다.
+- 끝난 작업은 lease에 완료로 남겨 다른 worker가 다시 실행하지 않습니다.
+
+lease 만료 시각은 각 worker의 시계로 비교하므로 worker 사이의 시간이 맞아야 합니다.
+"""
+
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import NamedTuple
+
+from filelock import FileLock, Timeout
+
+from src.common.config import LEASE_DIR, LEASE_TTL, LEASE_MAX_WAIT, LEASE_RETENTION
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+LEASE_HELD = "held"
+LEASE_DONE = "done"
+LOCK_TIMEOUT = 30  # lease 파일 잠금을 기다리는 최대 시간(초)
+SWEEP_POLL_INTERVAL = 2  # 다른 worker의 작업이 끝났는지 확인하는 간격(초)
+
+
+class Lease(NamedTuple):
+    key: str
+    worker: str
+    expires_at: float  # epoch 초
+    status: str  # held, done
+    jobs: tuple  # 제출한 job (job 아이디, 디스크 또는 스냅샷 이름, 디스크 또는 스냅샷 아이디)
+    taken_over: bool = False  # 다른 worker의 만료된 lease를 가져왔는지 여부
+
+
+class LeaseManager:
+    def __init__(self, scope, lease_dir=LEASE_DIR, worker_id=None, ttl=LEASE_TTL, max_wait=LEASE_MAX_WAIT,
+                 enabled=True):
+        """
+        :param scope: 실행 구분 (e.g. account/create/2024-10-21), 같은 scope의 worker끼리 작업을 나눔
+        :param lease_dir: lease 파일 디렉토리
+        :param worker_id: worker 이름, 재시작해도 같은 이름이면 자신의 lease를 바로 다시 가져감 (기본값: 호스트 이름)
+        :param ttl: lease 유효 시간(초)
+        :param max_wait: 다른 worker의 작업이 끝나기를 기다리는 최대 시간(초)
+        :param enabled: False면 lease 파일 없이 모든 작업을 직접 실행
+        """
+        self.scope = scope
+        self.lease_dir = lease_dir
+        self.worker_id = str(worker_id or os.environ.get("SNAPSHOT_WORKER_ID") or socket.gethostname())
+        self.ttl = float(ttl)
+        self.max_wait = float(max_wait)
+        self.enabled = enabled
+
+        self._held = set()  # 연장할 lease key
+        self._held_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, config: dict, scope):
+        """
+        config 파일의 sharding 항목으로 생성
+
+        :param config: 로드한 config 파일 내용
+        :param scope: 실행 구분 (e.g. account/create/2024-10-21)
+        """
+        sharding = config.get("sharding") or {}
+
+        return cls(scope,
+                   lease_dir=sharding.get("lease_dir", LEASE_DIR),
+                   worker_id=sharding.get("worker_id"),
+                   ttl=sharding.get("ttl", LEASE_TTL),
+                   max_wait=sharding.get("max_wait", LEASE_MAX_WAIT),
+                   enabled=bool(sharding.get("enabled", False)))
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self) -> None:
+        """ 지난 lease 파일 정리 후 lease 연장 스레드 시작 """
+        if not self.enabled:
+            return
+
+        os.makedirs(self.lease_dir, exist_ok=True)
+        self._cleanup()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """ lease 연장 스레드 종료 (완료하지 못한 lease는 ttl 후 다른 worker가 가져감) """
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def claim(self, key):
+        """
+        작업 하나의 lease 가져오기 (잠금을 기다리지 않으므로 event loop에서 바로 호출)
+
+        :param key: 작업 구분 (e.g. 서버 이름, 스냅샷 아이디)
+
+        :return lease: 가져온 Lease, 다른 worker가 작업 중이거나 lease 파일을 쓰는 중이거나 이미 끝난 작업이면 None
+        """
+        if not self.enabled:
+            return Lease(key, self.worker_id, float("inf"), LEASE_HELD, ())
+
+        try:
+            with self._lock(key, timeout=0):
+                lease = self._claim(key)
+        except Timeout:  # 다른 worker가 같은 lease 파일을 쓰는 중, sweep에서 다시 시도
+            return None
+
+        if lease is not None:
+            with self._held_lock:
+                self._held.add(key)
+
+        return lease
+
+    def _claim(self, key):
+        """ (잠금 안에서) lease 파일을 읽어 가져갈 수 있으면 자신의 lease로 기록 """
+        lease = self._read(key)
+
+        if lease is not None:
+            if lease.status == LEASE_DONE:
+                return None
+            if lease.worker != self.worker_id and lease.expires_at > time.time():
+                return None
+
+        taken_over = lease is not None and lease.worker != self.worker_id
+        if taken_over:
+            _LOGGER.warning(f"{lease.worker} worker의 만료된 작업을 가져옵니다: {key} "
+                            f"(제출된 job {len(lease.jobs)}개는 완료까지 확인)")
+
+        lease = Lease(key, self.worker_id, time.time() + self.ttl, LEASE_HELD, lease.jobs if lease else (), taken_over)
+        self._write(lease)
+
+        return lease
+
+    async def record(self, key, job_id, resource, resource_id) -> None:
+        """
+        제출한 job을 lease에 기록 (worker가 멈춰도 다른 worker가 다시 제출하지 않고 이어서 확인)
+
+        잠금을 기다려야 하므로 별도 스레드에서 기록합니다.
+
+        :param key: 작업 구분
+        :param job_id: job 아이디
+        :param resource: 디스크 또는 스냅샷 이름
+        :param resource_id: 디스크 또는 스냅샷 아이디
+        """
+        if self.enabled:
+            await asyncio.to_thread(self._update, key,
+                                    lambda lease: lease._replace(jobs=lease.jobs + ((job_id, resource, resource_id),)))
+
+    async def complete(self, key) -> None:
+        """ 작업 완료 기록 (다른 worker가 다시 실행하지 않음), 잠금을 기다려야 하므로 별도 스레드에서 기록 """
+        if not self.enabled:
+            return
+
+        await asyncio.to_thread(self._update, key, lambda lease: lease._replace(status=LEASE_DONE))
+
+        with self._held_lock:
+            self._held.discard(key)
+
+    async def sweep(self, keys, run) -> list:
+        """
+        다른 worker가 가져간 작업이 모두 끝날 때까지 기다리며, 멈춘 worker의 lease가 만료되면 가져와서 실행
+
+        :param keys: 이번 worker가 가져가지 못한 작업 구분 리스트
+        :param run: (key, Lease)를 받아 작업을 실행하는 coroutine 함수, 결과 리스트 반환
+
+        :return results: 가져와서 실행한 작업의 결과를 이어 붙인 리스트
+        """
+        if not self.enabled:
+            return []
+
+        deadline = time.monotonic() + self.max_wait
+        pending = list(keys)
+        results = []
+
+        while pending:
+            claimed = []
+            waiting = []  # 아직 끝나지 않은 작업 (key, lease 만료 시각)
+            for key in pending:
+                lease = self.claim(key)
+                if lease is not None:
+                    claimed.append((key, lease))
+                    continue
+
+                current = self.read(key)
+                if current is None:  # 다른 worker가 lease 파일을 처음 쓰는 중이라 가져오지 못함
+                    waiting.append((key, time.time()))
+                elif current.status != LEASE_DONE:
+                    waiting.append((key, current.expires_at))
+
+            for result in await asyncio.gather(*(run(key, lease) for key, lease in claimed)):
+                results.extend(result)
+
+            pending = [key for key, _ in waiting]
+            if not pending or claimed:
+                continue
+
+            if time.monotonic() >= deadline:
+                _LOGGER.warning(f"다른 worker의 작업 {len(pending)}개가 끝나지 않아 기다리지 않고 종료합니다.")
+                break
+
+            # 가장 먼저 만료되는 lease까지 대기하되, 다른 worker가 끝냈는지 주기적으로 확인
+            wait = min(expires_at for _, expires_at in waiting) - time.time()
+            await asyncio.sleep(min(max(wait, 0.5), SWEEP_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+
+        return results
+
+    def read(self, key):
+        """
+        lease 파일 내용 (파일을 통째로 교체하며 쓰므로 잠금 없이 읽음)
+
+        :return lease: Lease, 아직 아무도 가져가지 않았으면 None
+        """
+        if not self.enabled:
+            return None
+
+        return self._read(key)
+
+    def _heartbeat(self) -> None:
+        """ ttl의 1/3마다 가져간 lease 연장 """
+        while not self._stop.wait(self.ttl / 3):
+            with self._held_lock:
+                keys = list(self._held)
+
+            for key in keys:
+                try:
+                    self._update(key, lambda lease: lease._replace(expires_at=time.time() + self.ttl))
+                except Exception as e:
+                    _LOGGER.error(f"lease 연장 중 오류 발생: {key} {e}")
+
+    def _update(self, key, change) -> None:
+        """ 자신의 lease이면 change(lease)로 바꿔 저장, 다른 worker가 가져갔으면 경고 후 연장 중단 """
+        if not self.enabled:
+            return
+
+        with self._lock(key):
+            lease = self._read(key)
+
+            if lease is None or lease.worker != self.worker_id:
+                _LOGGER.warning(f"lease가 만료되어 다른 worker가 가져갔습니다: {key} "
+                                f"({lease.worker if lease else '없음'})")
+                with self._held_lock:
+                    self._held.discard(key)
+                return
+
+            self._write(change(lease))
+
+    def _path(self, key) -> str:
+        # 파일 이름에 계정 이름 등이 드러나지 않도록 해시 사용
+        digest = hashlib.sha1(f"{self.scope}/{key}".encode()).hexdigest()[:20]
+        return os.path.join(self.lease_dir, f"{digest}.json")
+
+    def _lock(self, key, timeout=LOCK_TIMEOUT) -> FileLock:
+        return FileLock(f"{self._path(key)}.lock", timeout=timeout)
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        return Lease(key, data["worker"], float(data["expires_at"]), data["status"],
+                     tuple(tuple(job) for job in data.get("jobs", [])))
+
+    def _write(self, lease: Lease) -> None:
+        # 임시 파일에 쓴 뒤 교체하여 중간에 멈춰도 깨진 파일이 남지 않도록 함
+        path = self._path(lease.key)
+        tmp_path = f"{path}.{self.worker_id}.tmp"
+
+        with open(tmp_path, "w") as f:
+            json.dump({"scope": self.scope, "key": lease.key, "worker": lease.worker,
+                       "expires_at": lease.expires_at, "status": lease.status, "jobs": lease.jobs}, f)
+        os.replace(tmp_path, path)
+
+    def _cleanup(self) -> None:
+        """ LEASE_RETENTION보다 오래된 lease 파일 삭제 """
+        expired = time.time() - LEASE_RETENTION
+
+        for path in glob.glob(os.path.join(self.lease_dir, "*.json*")):
+            try:
+                if os.path.getmtime(path) < expired:
+                    os.remove(path)
+            except OSError:
+                pass
+
@@ -0,0 +1,186 @@
+"""
+Prometheus 메트릭
+===
+
+외부 라이브러리 없이 Counter, Gauge, Histogram을 Prometheus text 형식으로 노출합니다.
+main.py 프로세스 안에서 /metrics HTTP 엔드포인트를 백그라운드 스레드로 띄웁니다.
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+API_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+JOB_DURATION_BUCKETS = (10, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600)
+
+
+def _format_labels(label_names, label_values, extra=()) -> str:
+    pairs = list(zip(label_names, label_values)) + list(extra)
+    if not pairs:
+        return ""
+
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, label_names=()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._render_value(key, value))
+
+        return lines
+
+    def _render_value(self, key, value) -> list:
+        return [f"{self.name}{_format_labels(self.label_names, key)} {value}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount=1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets=API_LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    def _render_value(self, key, value) -> list:
+        counts, total, count = value
+
+        lines = [f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', bound)])} {bucket_count}"
+                 for bound, bucket_count in zip(self.buckets, counts)]
+        lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+        lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+API_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "gplatform_api_request_duration_seconds", "G 플랫폼 API 응답 시간", ["command"], API_LATENCY_BUCKETS))
+API_REQUEST_ERRORS = REGISTRY.register(Counter(
+    "gplatform_api_request_errors_total", "G 플랫폼 API 호출 실패 수", ["command", "status"]))
+API_REQUEST_RETRIES = REGISTRY.register(Counter(
+    "gplatform_api_request_retries_total", "일시적인 오류로 다시 호출한 수", ["command"]))
+JOB_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "snapshot_job_queue_depth", "동시 job 자리를 기다리는 job 수", ["operation"]))
+JOB_IN_FLIGHT = REGISTRY.register(Gauge(
+    "snapshot_job_in_flight", "제출 후 완료를 기다리는 job 수", ["operation"]))
+JOB_DURATION = REGISTRY.register(Histogram(
+    "snapshot_job_duration_seconds", "스냅샷 job 제출부터 완료까지 걸린 시간", ["operation", "status"],
+    JOB_DURATION_BUCKETS))
+SCHEDULE_LAG = REGISTRY.register(Gauge(
+    "snapshot_schedule_lag_seconds", "예약 시각과 실제 실행 시각의 차이", ["task"]))
+GROUP_SKEW = REGISTRY.register(Histogram(
+    "snapshot_group_skew_seconds", "한 서버의 디스크 스냅샷 생성 요청이 처음과 마지막에 처리된 시각의 차이", [],
+    API_LATENCY_BUCKETS))
+RUN_DURATION = REGISTRY.register(Gauge(
+    "snapshot_run_duration_seconds", "가장 최근 실행의 소요 시간", ["operation"]))
+NOTIFY_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "telegram_notify_queue_depth", "전송을 기다리는 텔레그램 메세지 수", []))
+NOTIFY_MESSAGES = REGISTRY.register(Counter(
+    "telegram_notify_messages_total", "텔레그램 메세지 처리 결과 수 (sent, failed, dropped)", ["status"]))
+RUN_LAST_SUCCESS = REGISTRY.register(Gauge(
+    "snapshot_run_last_finished_timestamp_seconds", "가장 최근 실행이 끝난 시각 (unix time)", ["operation"]))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):  # 요청마다 로그를 남기지 않음
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        data = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_metrics_server(port, host="0.0.0.0") -> ThreadingHTTPServer:
+    """
+    /metrics 엔드포인트를 백그라운드 스레드로 시작
+
+    :param port: 포트 번호
+    :param host: 바인드 주소
+
+    :return httpd: HTTP 서버 객체
+    """
+    httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+
+    _LOGGER.info(f"메트릭 엔드포인트 시작: http://{host}:{httpd.server_address[1]}/metrics")
+    return httpd
@@ -0,0 +1,323 @@
+"""
+API 호출 속도 제한
+===
+
+token bucket으로 초당 호출 수를 제한하고, 계정당 동시에 진행하는 job 수를 제한합니다.
+API가 속도 제한(429, 503) 응답을 주면 호출 속도를 절반으로 줄인 뒤 잠시 멈추고,
+정상 응답이 이어지면 설정한 속도까지 천천히 회복합니다.
+속도 제한 응답의 재시도는 GPlatformApi가 재시도 정책(retry) 안에서 맡고, 여기서는 다시 호출하지 않습니다.
+
+제한은 계정(API 키)마다 하나씩 만들어 공유하므로(get_submitter) 같은 계정의 생성, 삭제가
+서로 다른 스레드, 이벤트 루프에서 동시에 실행되어도 제한을 함께 지킵니다.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+
+from src.common.config import RATE_LIMIT_RATE, RATE_LIMIT_BURST, MAX_CONCURRENT_JOBS
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+MIN_RATE = 0.05  # backoff 시 내려갈 수 있는 최저 호출 속도 (20초에 1번)
+
+_SUBMITTERS = {}
+_SUBMITTERS_LOCK = threading.Lock()
+
+
+def get_submitter(key, config: dict):
+    """
+    계정별로 공유하는 RateLimitedSubmitter 반환
+
+    같은 계정은 제한을 함께 지켜야 하므로 처음 만들 때의 설정을 계속 사용하고,
+    나중에 다른 rate_limit 설정으로 요청하면 무시한 설정을 로그로 남깁니다.
+
+    :param key: 계정 구분 key (API 키)
+    :param config: 로드한 config 파일 내용
+
+    :return submitter: RateLimitedSubmitter 객체
+    """
+    settings = rate_limit_settings(config)
+
+    with _SUBMITTERS_LOCK:
+        if key not in _SUBMITTERS:
+            _SUBMITTERS[key] = RateLimitedSubmitter(*settings)
+            return _SUBMITTERS[key]
+
+        submitter = _SUBMITTERS[key]
+
+    if submitter.settings != settings:
+        _LOGGER.warning(f"같은 계정의 API 호출 제한이 이미 다른 설정으로 동작 중이므로 처음 설정을 그대로 사용합니다. "
+                        f"(사용: {_format_settings(submitter.settings)}, 무시: {_format_settings(settings)})")
+
+    return submitter
+
+
+def rate_limit_settings(config: dict) -> (float, int, int):
+    """
+    config 파일의 rate_limit 항목
+
+    :param config: 로드한 config 파일 내용
+
+    :return rate: 초당 호출 수
+    :return burst: 한 번에 호출할 수 있는 최대 수
+    :return max_jobs: 계정당 동시 job 수
+    """
+    rate_limit = config.get("rate_limit") or {}
+
+    return (float(rate_limit.get("rate", RATE_LIMIT_RATE)),
+            max(int(rate_limit.get("burst", RATE_LIMIT_BURST)), 1),
+            int(rate_limit.get("max_jobs", MAX_CONCURRENT_JOBS)))
+
+
+def _format_settings(settings) -> str:
+    return "rate={}, burst={}, max_jobs={}".format(*settings)
+
+
+class TokenBucket:
+    def __init__(self, rate=RATE_LIMIT_RATE, burst=RATE_LIMIT_BURST):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _try_acquire(self, tokens) -> float:
+        """
+        token을 얻으면 0, 아니면 기다려야 하는 시간(초) 반환
+        """
+        with self._lock:
+            self._refill()
+            now = time.monotonic()
+
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0
+
+            return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens=1) -> None:
+        """
+        token을 얻을 때까지 대기
+
+        :param tokens: 필요한 token 수 (burst보다 크면 burst만큼만 요구)
+        """
+        tokens = min(tokens, self.burst)
+
+        while True:
+            wait = self._try_acquire(tokens)
+            if not wait:
+                return
+
+            await asyncio.sleep(wait)
+
+    def backoff(self, retry_after=None) -> None:
+        """
+        API 속도 제한 응답을 받았을 때 호출 속도를 절반으로 줄이고 잠시 멈춤
+
+        :param retry_after: API가 알려준 재시도 대기 시간(초), 없으면 현재 속도 기준 1회 호출 간격
+        """
+        with self._lock:
+            self.rate = max(self.rate / 2, MIN_RATE)
+            self.tokens = 0.0
+
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):  # 헤더가 없거나 HTTP 날짜 형식인 경우
+                delay = 1 / self.rate
+
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+
+        _LOGGER.warning(f"API 속도 제한 응답 - {delay:.1f}초 대기 후 초당 {self.rate:.2f}회로 호출합니다.")
+
+    def recover(self) -> None:
+        """ 정상 응답을 받을 때마다 설정한 속도까지 조금씩 회복 """
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+
+class JobSlots:
+    """
+    여러 스레드, 이벤트 루프에서 함께 쓰는 동시 job 자리
+
+    asyncio.Semaphore는 이벤트 루프마다 따로 동작하므로 남은 자리 수와 대기열을 lock으로 보호하고,
+    자리가 나면 기다리는 쪽의 이벤트 루프에 call_soon_threadsafe로 알려 깨웁니다.
+    먼저 기다린 순서대로 자리를 주므로 여러 자리가 필요한 대기가 뒤에 온 작은 대기에 밀리지 않습니다.
+    hold(n)으로 여러 자리를 한 번에 잡으면 한 서버의 디스크들이 함께 시작할 수 있습니다.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.free = size
+        self._waiters = deque()  # (필요한 자리 수, 이벤트 루프, future) 대기열
+        self._lock = threading.Lock()
+
+    async def acquire(self, count=1) -> None:
+        """
+        자리 count개를 한 번에 잡을 때까지 대기
+
+        :param count: 필요한 자리 수 (전체 자리 수보다 크면 전체 자리 수만큼만 잡음)
+        """
+        count = min(max(int(count), 1), self.size)
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if not self._waiters and self.free >= count:
+                self.free -= count
+                return
+
+            waiter = (count, loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await waiter[2]
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:  # 자리를 받기 전에 취소
+                    self._waiters.remove(waiter)
+                    self._wake()
+                else:  # 자리를 받은 뒤 깨어나기 전에 취소되었으면 반환
+                    self.free = min(self.size, self.free + count)
+                    self._wake()
+            raise
+
+    def release(self, count=1) -> None:
+        """ 잡았던 자리 count개 반환 """
+        with self._lock:
+            self.free = min(self.size, self.free + min(max(int(count), 1), self.size))
+            self._wake()
+
+    def _wake(self) -> None:
+        """ 대기열 앞에서부터 자리가 되는 만큼 자리를 주고 깨움 (lock 안에서 호출) """
+        while self._waiters and self.free >= self._waiters[0][0]:
+            count, loop, future = self._waiters.popleft()
+            self.free -= count
+
+            try:
+                loop.call_soon_threadsafe(_set_waiter_done, future)
+            except RuntimeError:  # 이벤트 루프가 이미 닫힌 대기는 건너뛰고 자리를 되돌림
+                self.free += count
+
+    def hold(self, count=1) -> "_HeldSlots":
+        """
+        자리 count개를 한 번에 잡는 async context manager
+
+        :param count: 필요한 자리 수 (전체 자리 수보다 크면 전체 자리 수만큼만 잡음)
+        """
+        return _HeldSlots(self, count)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def _set_waiter_done(future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _HeldSlots:
+    def __init__(self, slots, count):
+        self.slots = slots
+        self.count = count
+
+    async def __aenter__(self):
+        await self.slots.acquire(self.count)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.slots.release(self.count)
+
+
+class RateLimitedSubmitter:
+    """
+    token bucket과 동시 job 제한 안에서 비동기 API 호출을 제출
+    """
+
+    def __init__(self, rate=RATE_LIMIT_RATE, burst=RATE_LIMIT_BURST, max_jobs=MAX_CONCURRENT_JOBS):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_jobs = int(max_jobs)
+        self.job_slots = JobSlots(self.max_jobs)  # job이 끝날 때까지 차지하는 자리
+        self.settings = (self.bucket.max_rate, self.bucket.burst, self.max_jobs)
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        config 파일의 rate_limit 항목으로 생성
+
+        :param config: 로드한 config 파일 내용
+        """
+        return cls(*rate_limit_settings(config))
+
+    async def submit(self, func, *args):
+        """
+        동시 job 제한과 속도 제한을 지키며 API 호출
+
+        job 완료까지 자리를 잡아두려면 job_slots 안에서 call을 사용합니다.
+
+        :param func: AsyncGPlatformApi 메서드
+        :param args: 메서드 인자
+
+        :return: HTTP API 응답
+        """
+        async with self.job_slots:
+            return await self.call(func, *args)
+
+    async def call(self, func, *args, acquired=False):
+        """
+        속도 제한을 지키며 API 호출
+
+        속도 제한 응답은 GPlatformApi가 재시도하면서 on_throttle(bucket.backoff)로 호출 속도를 줄이므로
+        여기서는 다시 호출하지 않습니다.
+
+        :param func: AsyncGPlatformApi 메서드
+        :param args: 메서드 인자
+        :param acquired: token을 이미 받았는지 여부 (call_group)
+
+        :return: HTTP API 응답
+        """
+        if not acquired:
+            await self.bucket.acquire()
+
+        res = await func(*args)
+        self.bucket.recover()
+
+        return res
+
+    async def call_group(self, func, args_list) -> list:
+        """
+        여러 호출에 필요한 token을 한 번에 받아 동시에 호출 (한 서버의 디스크 스냅샷을 최대한 같은 시점에 생성)
+
+        호출 수가 burst보다 많으면 burst 단위로 token을 받는 즉시 호출합니다.
+
+        :param func: AsyncGPlatformApi 메서드
+        :param args_list: 호출마다의 메서드 인자 튜플 리스트
+
+        :return: 호출 순서대로 HTTP API 응답 또는 발생한 예외 리스트
+        """
+        tasks = []
+        for start in range(0, len(args_list), self.bucket.burst):
+            chunk = args_list[start:start + self.bucket.burst]
+            await self.bucket.acquire(len(chunk))
+
+            tasks += [asyncio.ensure_future(self.call(func, *args, acquired=True)) for args in chunk]
+
+        return await asyncio.gather(*tasks, return_exceptions=True)
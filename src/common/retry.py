@@ -0,0 +1,225 @@
+"""
+API 호출 재시도, circuit breaker
+===
+
+일시적인 오류(연결 실패, 타임아웃, 429, 5xx)는 지수 backoff(jitter 포함)로 같은 실행 안에서 다시 시도합니다.
+
+- 생성, 삭제처럼 같은 요청을 두 번 보내면 안 되는 API는 요청이 서버에 닿지 않았거나(연결 실패)
+  서버가 처리하지 않았다고 알려준 경우(429, 503)에만 다시 시도합니다.
+- 실행마다 재시도 예산(budget)을 두어 API 장애 때 재시도가 끝없이 쌓이지 않도록 합니다.
+- 연속으로 실패하면 circuit breaker가 열려 잠시 호출을 멈추고, 시간이 지나면 한 번 시험 호출 후 다시 닫힙니다.
+"""
+
+import logging
+import random
+import threading
+import time
+
+import requests
+import urllib3
+from requests import HTTPError
+
+from src.common.config import RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY, RETRY_BUDGET, \
+    BREAKER_THRESHOLD, BREAKER_RESET_TIMEOUT, BREAKER_MAX_WAIT
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+SAFE_COMMANDS = ("listVolumes", "listSnapshots", "queryAsyncJobResult")  # 다시 보내도 결과가 같은 API
+NOT_PROCESSED_STATUS_CODES = (429, 503)  # 서버가 요청을 처리하지 않은 응답
+SERVER_ERROR_STATUS_CODES = (500, 502, 503, 504)
+
+_BREAKERS = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+class CircuitOpenError(HTTPError):
+    """ circuit breaker가 열려 있어 호출하지 않음 """
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY,
+                 budget=RETRY_BUDGET, breaker_threshold=BREAKER_THRESHOLD, breaker_reset=BREAKER_RESET_TIMEOUT,
+                 breaker_max_wait=BREAKER_MAX_WAIT):
+        self.max_attempts = max(int(max_attempts), 1)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.budget = int(budget)
+        self.breaker_threshold = int(breaker_threshold)
+        self.breaker_reset = float(breaker_reset)
+        self.breaker_max_wait = float(breaker_max_wait)
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        config 파일의 retry 항목으로 생성
+
+        :param config: 로드한 config 파일 내용
+        """
+        retry = config.get("retry") or {}
+
+        return cls(max_attempts=retry.get("max_attempts", RETRY_MAX_ATTEMPTS),
+                   base_delay=retry.get("base_delay", RETRY_BASE_DELAY),
+                   max_delay=retry.get("max_delay", RETRY_MAX_DELAY),
+                   budget=retry.get("budget", RETRY_BUDGET),
+                   breaker_threshold=retry.get("breaker_threshold", BREAKER_THRESHOLD),
+                   breaker_reset=retry.get("breaker_reset", BREAKER_RESET_TIMEOUT),
+                   breaker_max_wait=retry.get("breaker_max_wait", BREAKER_MAX_WAIT))
+
+    def delay(self, attempt, retry_after=None) -> float:
+        """
+        attempt번째 재시도 전 대기 시간 (full jitter), API가 Retry-After를 주면 그 이상 대기
+
+        :param attempt: 0부터 시작하는 재시도 횟수
+        :param retry_after: Retry-After 헤더 값
+
+        :return: 대기 시간(초)
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+        try:
+            return max(delay, float(retry_after))
+        except (TypeError, ValueError):  # 헤더가 없거나 HTTP 날짜 형식인 경우
+            return delay
+
+
+class RetryBudget:
+    """ 실행 하나에서 쓸 수 있는 재시도 횟수 (여러 스레드에서 함께 사용, 실행마다 새로 만듦) """
+
+    def __init__(self, budget=RETRY_BUDGET):
+        self.budget = int(budget)
+        self.remaining = self.budget
+        self._lock = threading.Lock()
+
+    def spend(self) -> bool:
+        """ 재시도 한 번을 쓸 수 있으면 차감 후 True """
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+
+            self.remaining -= 1
+            return True
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT,
+                 max_wait=BREAKER_MAX_WAIT):
+        self.name = name
+        self.threshold = max(int(threshold), 1)
+        self.reset_timeout = float(reset_timeout)
+        self.max_wait = float(max_wait)
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def _wait_time(self) -> float:
+        """ 지금 호출해도 되면 0, 아니면 기다려야 하는 시간(초) """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0
+
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0:
+                return remaining
+
+            # 열린 뒤 reset_timeout이 지나면 한 번만 시험 호출
+            if not self._probing:
+                self.state = self.HALF_OPEN
+                self._probing = True
+                return 0
+
+            return min(self.reset_timeout, 1.0)
+
+    def before_call(self) -> None:
+        """ circuit이 열려 있으면 닫히거나 시험 호출 차례가 될 때까지 대기, max_wait를 넘으면 CircuitOpenError """
+        waited = 0.0
+
+        while True:
+            wait = self._wait_time()
+            if not wait:
+                return
+
+            if waited + wait > self.max_wait:
+                raise CircuitOpenError(f"API 장애로 호출을 멈춘 상태입니다. ({self.name})")
+
+            time.sleep(wait)
+            waited += wait
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                _LOGGER.info(f"API가 다시 응답하여 호출을 재개합니다. ({self.name})")
+
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    _LOGGER.warning(f"API 호출이 연속 {self.failures}번 실패하여 {self.reset_timeout:.0f}초 동안 "
+                                    f"호출을 멈춥니다. ({self.name})")
+
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+def get_breaker(name, policy: RetryPolicy) -> CircuitBreaker:
+    """
+    API 엔드포인트마다 공유하는 CircuitBreaker 반환
+
+    :param name: 엔드포인트 URL
+    :param policy: 처음 만들 때 사용할 RetryPolicy
+    """
+    with _BREAKERS_LOCK:
+        if name not in _BREAKERS:
+            _BREAKERS[name] = CircuitBreaker(name, policy.breaker_threshold, policy.breaker_reset,
+                                             policy.breaker_max_wait)
+
+        return _BREAKERS[name]
+
+
+def classify(error, command) -> (bool, bool):
+    """
+    API 호출 오류 분류
+
+    :param error: _request에서 발생한 예외
+    :param command: API command (e.g. createSnapshot)
+
+    :return retryable: 같은 요청을 다시 보내도 되는지 여부
+    :return unhealthy: API 장애로 볼 수 있는 오류인지 여부 (circuit breaker 집계)
+    """
+    safe = command in SAFE_COMMANDS
+
+    if isinstance(error, CircuitOpenError):
+        return False, False
+
+    if isinstance(error, HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status in NOT_PROCESSED_STATUS_CODES:
+            return True, status != 429
+        if status in SERVER_ERROR_STATUS_CODES:
+            return safe, True
+        return False, False  # 요청 자체가 잘못된 4xx
+
+    if isinstance(error, requests.ConnectTimeout):  # 요청이 서버에 닿지 않음
+        return True, True
+    if isinstance(error, requests.Timeout):  # 서버가 처리했을 수 있으므로 조회 API만 재시도
+        return safe, True
+    if isinstance(error, requests.ConnectionError):
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        connect_failed = isinstance(reason, urllib3.exceptions.NewConnectionError)  # 연결 자체가 안 된 경우
+        return safe or connect_failed, True
+
+    return False, False
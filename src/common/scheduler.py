@@ -0,0 +1,190 @@
+"""
+마감 시각 기반 스케줄러
+===
+
+다음에 실행할 작업의 예약 시각(deadline)을 heap으로 관리하고, 가장 가까운 예약 시각까지 정확히 대기합니다.
+
+- 같은 작업이 아직 실행 중이면 다음 예약은 건너뛰어 중복 실행을 막습니다.
+- 작업이 끝난 예약 시각을 파일에 남겨, 프로세스가 멈춘 동안 놓친 실행을 재시작 후 처리합니다.
+  catch_up 정책: once(놓친 실행을 한 번만 바로 실행), skip(놓친 실행은 건너뛰고 다음 예약 시각에 실행)
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from src.common.config import RESULT_DIR
+from src.common.metrics import SCHEDULE_LAG
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+SCHEDULER_STATE_PATH = os.path.join(RESULT_DIR, "scheduler_state.json")  # ./result/scheduler_state.json
+
+CATCH_UP_ONCE = "once"
+CATCH_UP_SKIP = "skip"
+
+
+class ScheduledTask:
+    def __init__(self, name, func, interval=None, catch_up=CATCH_UP_ONCE, persist=True):
+        self.name = name
+        self.func = func
+        self.interval = interval  # timedelta, None이면 한 번만 실행
+        self.catch_up = catch_up
+        self.persist = persist  # 실행 기록 저장 여부
+        self.running = False
+
+
+class DeadlineScheduler:
+    def __init__(self, state_path=SCHEDULER_STATE_PATH, max_workers=4):
+        self.state_path = state_path
+
+        self._heap = []  # (실행 시각, 순번, 작업, 예약 시각, 다음 예약 등록 여부)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+        self._stopped = False
+        self._tasks = {}  # 작업 이름 -> 현재 등록된 작업
+
+        self._state = self._load_state()  # 작업 이름 -> 마지막으로 끝낸 예약 시각
+
+    def add(self, name, func, start, interval=None, catch_up=CATCH_UP_ONCE, persist=True) -> ScheduledTask:
+        """
+        start부터 interval마다 func 실행 예약, 같은 이름의 작업이 있으면 교체
+
+        :param name: 작업 이름 (중복 실행 방지, 실행 기록 key)
+        :param func: 실행할 함수
+        :param start: 첫 예약 시각 (datetime)
+        :param interval: 실행 주기 (timedelta), None이면 start에 한 번만 실행
+        :param catch_up: 놓친 실행 처리 정책 (once, skip)
+        :param persist: 실행 기록 저장 여부 (짧은 주기의 내부 작업은 저장하지 않음)
+
+        :return task: 등록한 작업
+        """
+        task = ScheduledTask(name, func, interval, catch_up, persist)
+        now = datetime.now()
+
+        with self._cond:
+            previous = self._tasks.get(name)
+            if previous:  # 실행 중인 이전 작업이 끝나기 전에는 새 작업도 실행하지 않음
+                task.running = previous.running
+            self._tasks[name] = task
+
+        if interval and start <= now:
+            # 지금까지 지나간 마지막 예약 시각과 다음 예약 시각 계산
+            last_slot = start + interval * ((now - start) // interval)
+            self._push(last_slot + interval, task, last_slot + interval, True)
+
+            last_done = self._state.get(name)
+            if catch_up == CATCH_UP_ONCE and (last_done is None or last_done < last_slot):
+                _LOGGER.info(f"[{name}] 놓친 실행({last_slot})을 지금 실행합니다.")
+                self._push(now, task, last_slot, False)
+
+        else:
+            self._push(start, task, start, bool(interval))
+
+        return task
+
+    def remove(self, name) -> None:
+        """ 작업 예약 취소 (남은 예약은 실행 시각에 버림) """
+        with self._cond:
+            self._tasks.pop(name, None)
+
+    def _push(self, run_at, task, slot, reschedule) -> None:
+        with self._cond:
+            heapq.heappush(self._heap, (run_at, next(self._seq), task, slot, reschedule))
+            self._cond.notify()
+
+    def next_run(self):
+        """ 가장 가까운 예약 시각 """
+        with self._cond:
+            return self._heap[0][0] if self._heap else None
+
+    def run_forever(self) -> None:
+        """ 가장 가까운 예약 시각까지 대기 후 실행을 반복 (stop 호출 시 종료) """
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                run_at, _, task, slot, reschedule = self._heap[0]
+                delay = (run_at - datetime.now()).total_seconds()
+
+                if delay > 0:
+                    self._cond.wait(timeout=delay)  # 새 작업이 추가되면 깨어나 다시 계산
+                    continue
+
+                heapq.heappop(self._heap)
+
+                if self._tasks.get(task.name) is not task:  # 교체된 작업의 예약은 버림
+                    continue
+
+                if reschedule:
+                    heapq.heappush(self._heap, (slot + task.interval, next(self._seq), task, slot + task.interval, True))
+
+                self._dispatch(task, slot)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+        self._executor.shutdown(wait=False)
+
+    def _dispatch(self, task, slot) -> None:
+        if task.running:
+            _LOGGER.warning(f"[{task.name}] 이전 실행이 끝나지 않아 {slot} 실행을 건너뜁니다.")
+            return
+
+        task.running = True
+        SCHEDULE_LAG.set((datetime.now() - slot).total_seconds(), task=task.name)
+
+        self._executor.submit(self._run, task, slot)
+
+    def _run(self, task, slot) -> None:
+        _LOGGER.info(f"[{task.name}] {slot} 예약 작업 실행")
+
+        try:
+            task.func()
+        except BaseException as e:  # 작업 안의 sys.exit도 스케줄러를 멈추지 않도록 함
+            _LOGGER.error(f"[{task.name}] 작업 실행 중 오류 발생: {e!r}")
+        finally:
+            with self._cond:
+                task.running = False
+                current = self._tasks.get(task.name)
+                if current is not None:
+                    current.running = False
+
+                if task.persist and slot > self._state.get(task.name, datetime.min):
+                    self._state[task.name] = slot
+                    self._save_state()
+
+    def _load_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {}
+
+        try:
+            with open(self.state_path, "r") as f:
+                return {name: datetime.fromisoformat(slot) for name, slot in json.load(f).items()}
+
+        except Exception as e:
+            _LOGGER.warning(f"스케줄러 실행 기록을 읽을 수 없습니다: {e}")
+            return {}
+
+    def _save_state(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({name: slot.isoformat() for name, slot in self._state.items()}, f)
+            os.replace(tmp_path, self.state_path)
+
+        except Exception as e:
+            _LOGGER.error(f"스케줄러 실행 기록 저장 중 오류 발생: {e}")
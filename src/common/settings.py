@@ -0,0 +1,206 @@
+"""
+설정 파일 로드
+===
+
+config 파일과 디스크 리스트 파일을 한 번만 읽어 프로세스 전체에서 공유합니다.
+
+- 읽은 내용은 수정할 수 없는 객체(MappingProxyType, tuple)로 만들어 여러 스레드에서 그대로 공유합니다.
+- 파일의 수정 시각(mtime)이 바뀌면 다음 조회 때 다시 읽어 통째로 교체합니다. (재시작 불필요)
+- 다시 읽은 내용이 잘못되었으면 오류를 기록하고 이전 내용을 계속 사용합니다.
+"""
+
+import logging
+import os
+import sys
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import NamedTuple
+
+from src.common.config import CONFIG_PATH, DISK_LIST_PATH, REPORT_TIME
+from src.common.scheduler import CATCH_UP_ONCE, CATCH_UP_SKIP
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+
+class ConfigError(Exception):
+    pass
+
+
+class Schedule(NamedTuple):
+    cycle: int  # 실행 주기(일)
+    start_date: datetime
+    create_time: str  # HH:MM
+    delete_time: str  # HH:MM
+    report_time: str  # HH:MM
+    catch_up: str  # 중단된 동안 놓친 실행 처리 정책 (once, skip)
+
+
+def parse_schedule(config) -> Schedule:
+    """
+    config 파일의 time 항목 검증
+
+    :param config: 로드한 config 파일 내용
+
+    :return schedule: 실행 주기, 시각
+    """
+    time_config = config["time"]
+
+    cycle = str(time_config["cycle"])
+    del_cycle = str(time_config["del_cycle"])
+    start_date = str(time_config["start_date"])
+    create_time = str(time_config["create_time"])
+    delete_time = str(time_config["delete_time"])
+    report_time = str(time_config.get("report_time", REPORT_TIME))
+    catch_up = str(time_config.get("catch_up", CATCH_UP_ONCE))
+
+    if not (cycle[-1] == "d" and del_cycle[-1] == "d" and cycle[:-1].isdigit()):
+        raise ConfigError(f"config 파일의 time._cycle 포맷이 숫자d 형태가 아닙니다. (e.g. 3d) cycle: {cycle}")
+
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d")
+    except ValueError:
+        raise ConfigError(f"config 파일의 time.start_date 포맷이 YYYY-MM-DD형태가 아닙니다. (e.g. 2024-10-21) "
+                          f"start_date: {start_date}")
+
+    try:
+        for at_time in (create_time, delete_time, report_time):
+            datetime.strptime(at_time, "%H:%M")
+    except ValueError:
+        raise ConfigError(f"config 파일의 time._time 포맷이 HH:MM 형태가 아닙니다. (e.g. 09:30) "
+                          f"create_time: {create_time}, delete_time: {delete_time}, report_time: {report_time}")
+
+    if catch_up not in (CATCH_UP_ONCE, CATCH_UP_SKIP):
+        raise ConfigError(f"config 파일의 time.catch_up은 {CATCH_UP_ONCE}, {CATCH_UP_SKIP} 중 하나여야 합니다. "
+                          f"catch_up: {catch_up}")
+
+    return Schedule(int(cycle[:-1]), start, create_time, delete_time, report_time, catch_up)
+
+
+def freeze(value):
+    """
+    dict, list를 수정할 수 없는 MappingProxyType, tuple로 변환
+
+    :param value: yaml에서 읽은 값
+
+    :return: 수정할 수 없는 값
+    """
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def _load_config(file) -> tuple:
+    # yaml은 config 파일을 처음 읽을 때만 로드 (cli의 --help, 인자 오류 등 config를 읽지 않는 경로의 시작 시간 단축)
+    import yaml
+
+    config = yaml.safe_load(file)
+    return freeze(config), parse_schedule(config)
+
+
+def _load_disk_list(file) -> tuple:
+    # e.g. (("disk_name1", "server_name"), ("disk_name2", "server_name"))
+    return tuple(tuple(name.strip() for name in line.split(",")) for line in file if line.strip())
+
+
+class WatchedFile:
+    def __init__(self, path, loader):
+        self.path = path
+        self.loader = loader
+
+        self._lock = threading.Lock()
+        self._stamp = None  # (mtime, size)
+        self._value = None
+
+    def get(self):
+        """
+        파일 내용 반환, 마지막으로 읽은 뒤 파일이 바뀌었으면 다시 읽음
+
+        :return: loader가 반환한 값
+        """
+        try:
+            stat = os.stat(self.path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            stamp = None
+            if self._value is None:
+                _LOGGER.error(f"파일을 찾을 수 없습니다: {self.path}")
+                sys.exit()
+            _LOGGER.error(f"파일을 확인할 수 없어 이전 내용을 사용합니다: {e}")
+
+        if stamp is None or stamp == self._stamp:
+            return self._value
+
+        with self._lock:
+            if stamp != self._stamp:
+                self._reload(stamp)
+
+        return self._value
+
+    def _reload(self, stamp) -> None:
+        try:
+            with open(self.path, "r") as file:
+                value = self.loader(file)
+
+        except Exception as e:
+            if self._value is None:
+                _LOGGER.error(f"파일을 로드하는 중 오류가 발생했습니다: {e}")
+                sys.exit()
+
+            _LOGGER.error(f"변경된 파일을 로드하는 중 오류가 발생해 이전 내용을 사용합니다: {self.path} {e}")
+            self._stamp = stamp  # 파일이 다시 바뀔 때까지 재시도하지 않음
+            return
+
+        if self._value is not None:
+            _LOGGER.info(f"변경된 파일을 다시 읽었습니다: {self.path}")
+
+        self._value, self._stamp = value, stamp
+
+
+_WATCHED = {}
+_WATCHED_LOCK = threading.Lock()
+
+
+def _watch(path, loader) -> WatchedFile:
+    key = (os.path.abspath(path), loader)
+
+    with _WATCHED_LOCK:
+        if key not in _WATCHED:
+            _WATCHED[key] = WatchedFile(path, loader)
+        return _WATCHED[key]
+
+
+def load_config(path=CONFIG_PATH):
+    """
+    config 파일 내용 (수정할 수 없는 MappingProxyType)
+
+    :param path: config 파일 경로
+
+    :return config: 로드한 config 파일 내용
+    """
+    return _watch(path, _load_config).get()[0]
+
+
+def load_schedule(path=CONFIG_PATH) -> Schedule:
+    """
+    config 파일의 time 항목
+
+    :param path: config 파일 경로
+
+    :return schedule: 검증한 실행 주기, 시각
+    """
+    return _watch(path, _load_config).get()[1]
+
+
+def load_disk_list(path=DISK_LIST_PATH) -> tuple:
+    """
+    스냅샷 대상 디스크 파일 내용
+
+    :param path: 디스크 리스트 파일 경로
+
+    :return disk_list: e.g. (("disk_name1", "server_name"), ("disk_name2", "server_name"))
+    """
+    return _watch(path, _load_disk_list).get()
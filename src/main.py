@@ -1,85 +1,148 @@
 import logging
-import sys
-
-import schedule
-import time
-from datetime import datetime
-
-import yaml
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
 
 from src.common.base import BaseManager
-from src.common.config import CONFIG_PATH
+from src.common.config import CONFIG_PATH, METRICS_PORT, ACCOUNT_WORKERS, CONFIG_CHECK_INTERVAL
+from src.common.metrics import start_metrics_server
+from src.common.scheduler import DeadlineScheduler, CATCH_UP_SKIP
+from src.common.settings import load_config, load_schedule
 from src.manager.create_snapshot import CreateSnapshotManager
 from src.manager.delete_snapshot import DeleteSnapshotManager
+from src.manager.pipeline import SnapshotPipeline
+from src.manager.telegram import TelegramManager
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 _LOGGER = logging.getLogger(__name__)
 
-CYCLE = 0
-START_DATE = None
-CREATE_TIME = None
-DELETE_TIME = None
+CONFIG_FILE = CONFIG_PATH
+SCHEDULE = None
+PIPELINE = False  # 생성, 삭제를 create_time에 파이프라인으로 함께 실행
+METRICS = {}
+EXECUTOR = None
+SCHEDULER = None
+
 
+def init(config_path=CONFIG_PATH):
+    global CONFIG_FILE, SCHEDULE, PIPELINE, METRICS, EXECUTOR, SCHEDULER
 
-class ConfigError(Exception):
-    pass
+    CONFIG_FILE = config_path
 
+    # config 파일은 여기서 한 번 읽고 검증, 이후에는 파일이 바뀌었을 때만 다시 읽음 (잘못된 파일이면 종료)
+    config = load_config(config_path)
+    SCHEDULE = load_schedule(config_path)
+    PIPELINE = pipeline_enabled(config)
+    METRICS = config.get("metrics") or {}
 
-def init(config_path=CONFIG_PATH):
-    global CYCLE, START_DATE, CREATE_TIME, DELETE_TIME
+    # 계정, zone 단위 작업을 하나의 worker pool에서 동시에 실행
+    EXECUTOR = ThreadPoolExecutor(max_workers=int(config.get("workers", ACCOUNT_WORKERS)),
+                                  thread_name_prefix="account")
+    SCHEDULER = DeadlineScheduler()
+
+
+def first_run(at_time, days=0) -> datetime:
+    """
+    time.start_date(+days)의 at_time 시각
+
+    :param at_time: 실행 시각 (HH:MM)
+    :param days: start_date로부터 지난 일 수
+
+    :return: 첫 예약 시각
+    """
+    at_time = datetime.strptime(at_time, "%H:%M").time()
+    return datetime.combine(SCHEDULE.start_date.date() + timedelta(days=days), at_time)
+
+
+def register_tasks() -> None:
+    """
+    SCHEDULE에 맞춰 생성, 삭제, 리포트 작업 예약 (이미 있으면 교체)
+    """
+    interval = timedelta(days=SCHEDULE.cycle)
+
+    if PIPELINE:
+        SCHEDULER.remove("create")
+        SCHEDULER.remove("delete")
+        SCHEDULER.add("pipeline", lambda: fan_out("pipeline", pipeline), first_run(SCHEDULE.create_time),
+                      interval, SCHEDULE.catch_up)
+    else:
+        SCHEDULER.remove("pipeline")
+        SCHEDULER.add("create", lambda: fan_out("create", create), first_run(SCHEDULE.create_time),
+                      interval, SCHEDULE.catch_up)
+        SCHEDULER.add("delete", lambda: fan_out("delete", delete), first_run(SCHEDULE.delete_time),
+                      interval, SCHEDULE.catch_up)
 
-    config = BaseManager.load_file(config_path, yaml.safe_load)
+    # 삭제 다음 날 리포트 전송
+    SCHEDULER.add("report", lambda: fan_out("report", report), first_run(SCHEDULE.report_time, days=1),
+                  interval, SCHEDULE.catch_up)
 
-    cycle = str(config["time"]["cycle"])
-    del_cycle = str(config["time"]["del_cycle"])
-    start_date = str(config["time"]["start_date"])
-    create_time = str(config["time"]["create_time"])
-    delete_time = str(config["time"]["delete_time"])
 
-    try:
+def check_config() -> None:
+    """
+    config 파일의 time, pipeline 항목이 바뀌었으면 작업을 다시 예약
+    """
+    global SCHEDULE, PIPELINE
 
-        if cycle[-1] == "d" and del_cycle[-1] == "d":
-            CYCLE = int(cycle[:-1])
-        else:
-            raise ConfigError(f"config 파일의 time._cycle 포맷이 숫자d 형태가 아닙니다. (e.g. 3d) cycle: {cycle}")
+    schedule = load_schedule(CONFIG_FILE)
+    enabled = pipeline_enabled(load_config(CONFIG_FILE))
+    if schedule != SCHEDULE or enabled != PIPELINE:
+        _LOGGER.info(f"실행 주기, 시각이 바뀌어 작업을 다시 예약합니다: {schedule} (파이프라인: {enabled})")
+        SCHEDULE, PIPELINE = schedule, enabled
+        register_tasks()
 
-        START_DATE = datetime.strptime(start_date, "%Y-%m-%d")
 
-        if datetime.strptime(create_time, "%H:%M") and datetime.strptime(delete_time, "%H:%M"):
-            CREATE_TIME = create_time
-            DELETE_TIME = delete_time
-        else:
-            raise ConfigError(f"config 파일의 time._time 포맷이 HH:MM 형태가 아닙니다. (e.g. 09:30) "
-                              f"create_time: {create_time}, delete_time: {delete_time}")
+def pipeline_enabled(config) -> bool:
+    """ config 파일의 pipeline.enabled 값 """
+    return bool((config.get("pipeline") or {}).get("enabled", False))
 
-    except ConfigError as e:
-        _LOGGER.error(e)
-        sys.exit()
-    except ValueError as e:
-        _LOGGER.error(f"config 파일의 time.start_date 포맷이 YYYY-MM-DD형태가 아닙니다. (e.g. 2024-10-21) start_date: {start_date}")
-        sys.exit()
 
+def create(account):
+    CreateSnapshotManager(CONFIG_FILE, account=account).create_snapshot()
 
-def wait_until_start_date(start_date):
-    _LOGGER.info(f"{start_date}에 스냅샷 생성을 시작합니다.")
-    now = datetime.now()
-    while now < start_date:
-        time_to_wait = (start_date - now).total_seconds()
-        time.sleep(min(time_to_wait, 3600))  # 남은 시간 혹은 1시간 단위로 대기
-        now = datetime.now()
+
+def delete(account):
+    DeleteSnapshotManager(CONFIG_FILE, account=account).delete_snapshot()
+
+
+def pipeline(account):
+    SnapshotPipeline(CONFIG_FILE, account=account).run()
+
+
+def report(account):
+    TelegramManager(CONFIG_FILE, account=account).telegram()
+
+
+def fan_out(task, func) -> None:
+    """
+    계정마다 func(account)를 worker pool에 제출하고 모두 끝날 때까지 대기
+    (스케줄러가 같은 작업을 겹쳐 실행하지 않도록 작업이 끝날 때까지 반환하지 않음)
+
+    :param task: 로그용 작업 이름
+    :param func: 계정 딕셔너리를 인자로 받는 함수
+    """
+    futures = []
+    for account in BaseManager.list_accounts(load_config(CONFIG_FILE)):  # 바뀐 계정 목록은 다음 실행부터 적용
+        future = EXECUTOR.submit(func, account)
+        future.add_done_callback(lambda f, name=account["account_name"]: _log_failure(task, name, f))
+        futures.append(future)
+
+    wait(futures)
+
+
+def _log_failure(task, account_name, future) -> None:
+    error = future.exception()
+    if error:
+        _LOGGER.error(f"[{account_name}] {task} 실행 중 오류 발생: {error!r}")
 
 
 if __name__ == "__main__":
     init()
 
-    wait_until_start_date(START_DATE)
-
-    schedule.every(CYCLE).days.at(CREATE_TIME).do(lambda: CreateSnapshotManager().create_snapshot())
-    schedule.every(CYCLE).days.at(DELETE_TIME).do(lambda: DeleteSnapshotManager().delete_snapshot())
+    if METRICS.get("enabled", True):
+        start_metrics_server(int(METRICS.get("port", METRICS_PORT)))
 
-    CreateSnapshotManager().create_snapshot()
-    DeleteSnapshotManager().delete_snapshot()
+    register_tasks()
+    SCHEDULER.add("config", check_config, datetime.now() + timedelta(seconds=CONFIG_CHECK_INTERVAL),
+                  timedelta(seconds=CONFIG_CHECK_INTERVAL), CATCH_UP_SKIP, persist=False)
 
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    _LOGGER.info(f"{SCHEDULER.next_run()}에 다음 작업을 실행합니다.")
+    SCHEDULER.run_forever()
@@ -2,28 +2,97 @@
 KT Cloud의 G 플랫폼 API 모듈
 """
 
+import asyncio
 import base64
 import hashlib
 import hmac
 import logging
+import os
+import threading
+import time
 import warnings
-from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, quote_plus, parse_qs
 
 import requests
 import urllib3
 from requests import HTTPError
+from requests.adapters import HTTPAdapter
+
+from src.common.config import API_ENDPOINT, HTTP_POOL_SIZE, HTTP_TIMEOUT, LIST_PAGE_SIZE, STREAM_CHUNK_SIZE
+from src.common.metrics import API_REQUEST_DURATION, API_REQUEST_ERRORS, API_REQUEST_RETRIES
+from src.common.retry import RetryPolicy, RetryBudget, get_breaker, classify, NOT_PROCESSED_STATUS_CODES
+from src.manager.model import Volume, Snapshot
+from src.manager.stream import iter_records
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 _LOGGER = logging.getLogger(__name__)
 
 warnings.simplefilter('ignore', urllib3.exceptions.InsecureRequestWarning)
 
+_SESSION = None
+_SESSION_PID = None
+_SESSION_POOL_SIZE = HTTP_POOL_SIZE
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session(pool_size=HTTP_POOL_SIZE) -> requests.Session:
+    """
+    프로세스 단위로 공유하는 keep-alive HTTP 세션 반환
+
+    최초 호출 시 커넥션 풀을 가진 세션을 만들고, 이후에는 같은 세션을 재사용하여
+    API 호출마다 TCP/TLS 핸드셰이크가 발생하지 않도록 합니다.
+    fork 등으로 프로세스가 바뀐 경우 소켓을 공유하지 않도록 새 세션을 만듭니다.
+    세션은 인증서를 검증하며, 검증을 생략하는 G 플랫폼 API 호출만 요청마다 verify=False를 지정합니다.
+
+    :param pool_size: 호스트당 유지할 커넥션 수 (세션 생성 시에만 적용)
+
+    :return session: 공유 세션
+    """
+    global _SESSION, _SESSION_PID, _SESSION_POOL_SIZE
+
+    with _SESSION_LOCK:
+        if _SESSION is None or _SESSION_PID != os.getpid():
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["Connection"] = "keep-alive"
+
+            _SESSION = session
+            _SESSION_PID = os.getpid()
+            _SESSION_POOL_SIZE = pool_size
+
+        return _SESSION
+
+
+def session_pool_size(session) -> int:
+    """
+    세션의 호스트당 커넥션 수 (동시 요청 수를 이 이상으로 늘려도 커넥션을 기다리거나 새로 맺기만 함)
+
+    :param session: requests 세션
+
+    :return pool_size: get_session으로 만든 공유 세션이면 생성 시 지정한 크기, 아니면 기본값
+    """
+    return _SESSION_POOL_SIZE if session is _SESSION else HTTP_POOL_SIZE
+
 
 class GPlatformApi:
-    def __init__(self, api_key, secret_key, zone="v2"):
+    def __init__(self, api_key, secret_key, zone="v2", session=None, timeout=HTTP_TIMEOUT, endpoint=API_ENDPOINT,
+                 zone_id=None, retry_policy=None):
         self.api_key = api_key
         self.secret_key = secret_key
         self.zone = zone
+        self.zone_id = zone_id  # 지정하면 리스트 API를 해당 zone으로 한정
+        self.endpoint = endpoint
+        self.session = session or get_session()
+        self.pool_size = session_pool_size(self.session)
+        self.timeout = timeout
+
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = RetryBudget(self.retry_policy.budget)  # 객체(실행) 단위 재시도 예산
+        self.breaker = get_breaker(endpoint, self.retry_policy)  # 엔드포인트 단위로 공유
+        self.on_throttle = None  # 속도 제한(429, 503) 응답을 받으면 호출 (e.g. TokenBucket.backoff)
 
     def create_url(self, endpoint, path) -> str:
         """
@@ -67,45 +136,216 @@ class GPlatformApi:
 
         return signature
 
-    def _request(self, endpoint, path) -> str:
+    def _request(self, endpoint, path, parse=None) -> str:
         """
-        실제 API 호출 함수
+        실제 API 호출 함수, 일시적인 오류는 재시도 예산 안에서 backoff 후 다시 호출
 
         :param endpoint:
         :param path:
+        :param parse: 응답 본문을 스트리밍으로 읽어 변환하는 함수 (Response -> 결과), None이면 res.json()
 
         :return res.json(): HTTP API 응답
         """
         url = self.create_url(endpoint, path)
+        command = parse_qs(path.lstrip("?")).get("command", ["unknown"])[0]  # 메트릭 label
+
+        attempt = 0
+        while True:
+            self.breaker.before_call()  # API 장애로 멈춘 상태면 재개될 때까지 대기
+
+            try:
+                res = self._send(url, command, parse)
+
+            except requests.RequestException as e:
+                retryable, unhealthy = classify(e, command)
+                if unhealthy:
+                    self.breaker.record_failure()
+                else:  # 4xx처럼 API가 정상적으로 응답한 오류
+                    self.breaker.record_success()
+
+                response = getattr(e, "response", None)
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                if response is not None and response.status_code in NOT_PROCESSED_STATUS_CODES and self.on_throttle:
+                    self.on_throttle(retry_after)
+
+                if not retryable or attempt + 1 >= self.retry_policy.max_attempts or not self.retry_budget.spend():
+                    raise
 
+                delay = self.retry_policy.delay(attempt, retry_after)
+                API_REQUEST_RETRIES.inc(command=command)
+                _LOGGER.warning(f"{command} API 호출 실패, {delay:.1f}초 후 다시 시도합니다. "
+                                f"({attempt + 1}/{self.retry_policy.max_attempts - 1}) {e!r}")
+
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self.breaker.record_success()
+            return res
+
+    def _send(self, url, command, parse=None) -> str:
+        """
+        API 한 번 호출, 응답 코드가 400 이상이면 HTTPError
+
+        :param url: 서명까지 붙은 URL
+        :param command: API command (메트릭 label)
+        :param parse: 응답 본문을 스트리밍으로 읽어 변환하는 함수, None이면 res.json()
+
+        :return res.json(): HTTP API 응답
+        """
         # _LOGGER.info(f"[HTTP Request] {url}")
 
-        res = requests.get(url, verify=False)
+        started = time.monotonic()
+        try:
+            res = self.session.get(url, timeout=self.timeout, stream=parse is not None, verify=False)
+
+            if parse is not None and res.status_code < 400:
+                with res:  # 다 읽지 못하고 실패해도 커넥션을 풀에 돌려줌
+                    return parse(res)
+
+        except requests.RequestException as e:
+            API_REQUEST_ERRORS.inc(command=command, status=type(e).__name__)
+            raise
+        finally:
+            API_REQUEST_DURATION.observe(time.monotonic() - started, command=command)
 
         if res.status_code >= 400:
+            API_REQUEST_ERRORS.inc(command=command, status=res.status_code)
             _LOGGER.error(f"API 호출 에러 - URL: {url}, status code: {res.status_code}, body: {res.text}")
-            raise HTTPError(f"Request Fail - {res.status_code} \n{res.json()}")
+            raise HTTPError(f"Request Fail - {res.status_code} \n{res.text}", response=res)
 
         return res.json()
 
-    def list_disk(self):
-        """ 디스크 리스트 API 호출 """
-        endpoint = "https://api.ucloudbiz.olleh.com/server/v1/client/api"
+    def _zone_param(self) -> str:
+        """ zone_id가 지정된 경우 리스트 API에 붙일 zoneid 파라미터 """
+        return f"&zoneid={self.zone_id}" if self.zone_id else ""
+
+    @staticmethod
+    def _filter_params(filters) -> str:
+        """
+        리스트 API 필터 파라미터 (서명에 함께 포함됨)
+
+        :param filters: API 파라미터 이름 -> 값 (e.g. {"keyword": "2024-10-21", "snapshottype": "MANUAL"}), None인 값은 제외
+
+        :return: e.g. &keyword=2024-10-21&snapshottype=MANUAL
+        """
+        return "".join(f"&{key}={quote(str(value), safe='')}"
+                       for key, value in sorted(filters.items()) if value is not None)
+
+    def list_disk(self, **filters):
+        """
+        디스크 리스트 API 호출
+
+        :param filters: listVolumes 필터 (e.g. keyword, name, type, virtualmachineid)
+        """
+        endpoint = self.endpoint
 
-        path = f"?apiKey={self.api_key}&command=listVolumes&response=json"
+        path = (f"?apiKey={self.api_key}&command=listVolumes&response=json" + self._zone_param()
+                + self._filter_params(filters))
 
         return self._request(endpoint, path)
 
-    def list_disk_snapshot(self):
-        """ 디스크 스냅샷 리스트 API 호출 """
-        endpoint = "https://api.ucloudbiz.olleh.com/server/v1/client/api"
-        path = f"?apiKey={self.api_key}&command=listSnapshots&response=json"
+    def list_disk_snapshot(self, **filters):
+        """
+        디스크 스냅샷 리스트 API 호출
+
+        :param filters: listSnapshots 필터 (e.g. keyword, name, volumeid, snapshottype)
+        """
+        endpoint = self.endpoint
+        path = (f"?apiKey={self.api_key}&command=listSnapshots&response=json" + self._zone_param()
+                + self._filter_params(filters))
 
         return self._request(endpoint, path)
 
+    def iter_disk(self, page_size=LIST_PAGE_SIZE, **filters):
+        """
+        디스크 리스트를 페이지 단위로 가져오며 Volume 레코드 반환
+
+        :param page_size: 한 번에 가져올 디스크 수
+        :param filters: listVolumes 필터 (e.g. keyword, name, type, virtualmachineid)
+        """
+        return self._iter_pages("listVolumes", "listvolumesresponse", "volume", Volume.from_response, page_size,
+                                filters)
+
+    def iter_disk_snapshot(self, page_size=LIST_PAGE_SIZE, **filters):
+        """
+        디스크 스냅샷 리스트를 페이지 단위로 가져오며 Snapshot 레코드 반환
+
+        :param page_size: 한 번에 가져올 스냅샷 수
+        :param filters: listSnapshots 필터 (e.g. keyword, name, volumeid, snapshottype)
+        """
+        return self._iter_pages("listSnapshots", "listsnapshotsresponse", "snapshot", Snapshot.from_response,
+                                page_size, filters)
+
+    def _iter_pages(self, command, response_key, item_key, to_record, page_size, filters=None):
+        """
+        리스트 API를 page, pagesize 파라미터로 나눠 호출하는 generator
+
+        현재 페이지를 처리하는 동안 다음 페이지를 백그라운드 스레드에서 미리 가져오므로
+        메모리에는 최대 두 페이지의 레코드만 올라갑니다.
+        서버가 pagesize를 더 작게 제한할 수 있으므로, 응답에 count가 있으면 받은 개수가 count에 이를 때까지,
+        없으면 지금까지 받은 가장 큰 페이지보다 작은 페이지가 올 때까지 호출하고, 빈 페이지를 받으면 멈춥니다.
+
+        :param command: API command (e.g. listVolumes)
+        :param response_key: 응답 최상위 key (e.g. listvolumesresponse)
+        :param item_key: 리스트가 담긴 key (e.g. volume)
+        :param to_record: 응답 원소를 레코드로 변환하는 함수
+        :param page_size: 페이지 크기
+        :param filters: 리스트 API 필터
+        """
+        endpoint = self.endpoint
+        filter_params = self._filter_params(filters or {})
+
+        def parse(res):
+            # 응답 전체를 dict로 만들지 않고 원소 하나씩 레코드로 변환
+            meta = {}
+            records = list(iter_records(res.iter_content(STREAM_CHUNK_SIZE), response_key, item_key, to_record,
+                                        meta))
+            return records, meta.get("count")
+
+        def fetch(page):
+            path = (f"?apiKey={self.api_key}"
+                    f"&command={command}"
+                    f"&page={page}"
+                    f"&pagesize={page_size}"
+                    f"&response=json") + self._zone_param() + filter_params
+
+            return self._request(endpoint, path, parse)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 1
+            future = executor.submit(fetch, page)
+            received = 0
+            largest = 0  # 서버가 실제로 주는 페이지 크기
+
+            while True:
+                records, count = future.result()
+                received += len(records)
+                largest = max(largest, len(records))
+
+                if not records:  # 빈 페이지
+                    last = True
+                elif count is not None:
+                    last = received >= count
+                else:
+                    last = len(records) < largest
+
+                if last:
+                    future = None
+                else:
+                    page += 1
+                    future = executor.submit(fetch, page)
+
+                yield from records
+
+                del records
+
+                if future is None:
+                    return
+
     def create_disk_snapshot(self, disk_id, snapshot_name):
         """ 디스크 스냅샷 생성 API 호출 """
-        endpoint = "https://api.ucloudbiz.olleh.com/server/v1/client/api"
+        endpoint = self.endpoint
         path = (f"?apiKey={self.api_key}"
                 f"&command=createSnapshot"
                 f"&volumeid={disk_id}"
@@ -116,7 +356,7 @@ class GPlatformApi:
 
     def delete_disk_snapshot(self, snapshot_id):
         """ 디스크 스냅샷 삭제 API 호출 """
-        endpoint = "https://api.ucloudbiz.olleh.com/server/v1/client/api"
+        endpoint = self.endpoint
         path = (f"?apiKey={self.api_key}"
                 f"&command=deleteSnapshot"
                 f"&id={snapshot_id}"
@@ -126,10 +366,87 @@ class GPlatformApi:
 
     def check_job(self, job_id):
         """ job 성공 확인 API 호출 """
-        endpoint = "https://api.ucloudbiz.olleh.com/server/v1/client/api"
+        endpoint = self.endpoint
         path = (f"?apiKey={self.api_key}"
                 f"&command=queryAsyncJobResult"
                 f"&jobid={job_id}"
                 f"&response=json")
 
         return self._request(endpoint, path)
+
+
+class AsyncGPlatformApi:
+    """
+    GPlatformApi의 asyncio 버전
+
+    서명(create_url, create_signature)과 요청은 GPlatformApi를 그대로 사용하고,
+    블로킹 호출을 스레드에서 실행하여 여러 API 호출을 동시에 보낼 수 있도록 합니다.
+    동시에 진행 중인 요청 수는 semaphore로 세션의 커넥션 풀 크기 이하로 제한합니다.
+    제한 시간이 지나 기다리지 않게 된 호출도 스레드의 요청이 끝날 때까지 자리를 차지합니다.
+    """
+
+    def __init__(self, api_key=None, secret_key=None, zone="v2", max_concurrency=None, g_platform_api=None,
+                 call_timeout=None, **kwargs):
+        """
+        :param max_concurrency: 동시 요청 수, None이면 세션의 커넥션 풀 크기 (풀 크기보다 크면 풀 크기로 제한)
+        :param call_timeout: 호출 하나의 제한 시간(초), 대기열에서 기다린 시간은 포함하지 않음
+        """
+        self.api = g_platform_api or GPlatformApi(api_key, secret_key, zone=zone, **kwargs)
+        self.max_concurrency = max(min(max_concurrency or self.api.pool_size, self.api.pool_size), 1)
+        self.call_timeout = call_timeout
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """ 이벤트 루프 안에서 처음 사용할 때 semaphore 생성 (asyncio.run 마다 새 루프가 만들어지므로) """
+        if self._semaphore is None or self._semaphore_loop is not asyncio.get_running_loop():
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = asyncio.get_running_loop()
+
+        return self._semaphore
+
+    async def _call(self, func, *args, **kwargs):
+        """
+        동시 요청 수 제한 안에서 블로킹 API 함수를 스레드로 실행
+
+        :param func: GPlatformApi 메서드
+        :param args: 메서드 인자
+        :param kwargs: 메서드 키워드 인자
+
+        :return: HTTP API 응답
+        """
+        semaphore = self.semaphore
+        await semaphore.acquire()
+
+        # 스레드는 취소할 수 없으므로 제한 시간이 지나도 요청이 끝날 때까지 자리를 반환하지 않음
+        # (asyncio.run은 끝나기 전에 남은 스레드를 모두 기다리므로 루프마다 semaphore를 따로 두어도 됨)
+        def release(task):
+            semaphore.release()
+            if not task.cancelled():
+                task.exception()  # 기다리지 않게 된 호출의 예외는 로그에 남기지 않음
+
+        task = asyncio.ensure_future(asyncio.to_thread(func, *args, **kwargs))
+        task.add_done_callback(release)
+
+        return await asyncio.wait_for(asyncio.shield(task), timeout=self.call_timeout)
+
+    async def list_disk(self, **filters):
+        """ 디스크 리스트 API 호출 """
+        return await self._call(self.api.list_disk, **filters)
+
+    async def list_disk_snapshot(self, **filters):
+        """ 디스크 스냅샷 리스트 API 호출 """
+        return await self._call(self.api.list_disk_snapshot, **filters)
+
+    async def create_disk_snapshot(self, disk_id, snapshot_name):
+        """ 디스크 스냅샷 생성 API 호출 """
+        return await self._call(self.api.create_disk_snapshot, disk_id, snapshot_name)
+
+    async def delete_disk_snapshot(self, snapshot_id):
+        """ 디스크 스냅샷 삭제 API 호출 """
+        return await self._call(self.api.delete_disk_snapshot, snapshot_id)
+
+    async def check_job(self, job_id):
+        """ job 성공 확인 API 호출 """
+        return await self._call(self.api.check_job, job_id)
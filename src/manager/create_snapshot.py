@@ -1,37 +1,28 @@
 """
 스냅샷 생성
 """
-import os
-import sys
 from datetime import datetime
 import logging
 import time
 
-import yaml
 from requests import HTTPError
 
 from src.common.config import CONFIG_PATH, DISK_LIST_PATH
-from src.manager.api import GPlatformApi
-from src.common.base import BaseManager
+from src.common.metrics import JOB_QUEUE_DEPTH, GROUP_SKEW
+from src.manager.job_tracker import JOB_PROCESSING, JOB_SUCCESS
+from src.manager.model import Snapshot, Submitted
+from src.manager.snapshot_manager import SnapshotManager
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 _LOGGER = logging.getLogger(__name__)
 
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-JOB_FILE_PATH = os.path.join(CURRENT_DIR, "result", "create_job_list")  # ./result/create_job_list
-WAIT_TIME = 60 * 5  # API 호출 주기
 
+class CreateSnapshotManager(SnapshotManager):
+    OPERATION = "create"
+    OPERATION_NAME = "생성"
 
-class CreateSnapshotManager(BaseManager):
-    def __init__(self, config_file=CONFIG_PATH, disk_snapshot_list=DISK_LIST_PATH, **arg):
-        super().__init__()
-        self.config = self.load_file(config_file, yaml.safe_load)  # 설정 파일 로드
-
-        self.api_key = self.config["kt_cloud"]["api_key"]
-        self.secret_key = self.config["kt_cloud"]["secret_key"]
-        self.g_platform_api = GPlatformApi(api_key=self.api_key, secret_key=self.secret_key)
-
-        self.disk_list_path = disk_snapshot_list
+    def __init__(self, config_file=CONFIG_PATH, disk_snapshot_list=DISK_LIST_PATH, account=None, **arg):
+        super().__init__(config_file, disk_snapshot_list, account)
 
     def create_snapshot(self) -> None:
         """
@@ -41,6 +32,21 @@ class CreateSnapshotManager(BaseManager):
 
         _LOGGER.info(f"==={today} 스냅샷 생성 시작===")
 
+        # 속도 제한 안에서 스냅샷 생성 API 동시 호출 (sharding 설정 시 다른 worker와 서버 단위로 나눠 처리)
+        if self.run(today):
+            _LOGGER.info(f"==={today} 스냅샷 생성 완료===")
+
+    def select(self, today, previous_jobs) -> (list, list, int):
+        """
+        스냅샷 생성할 디스크 선택
+
+        :param today: 실행 날짜 (YYYY-MM-DD)
+        :param previous_jobs: 디스크 아이디 -> 오늘 제출한 마지막 job 기록
+
+        :return targets: (디스크 이름, 서버 이름, 디스크 아이디, 스냅샷 이름) 튜플 리스트
+        :return resumed: 진행 중으로 남은 이전 job (job 아이디, 디스크 이름, 디스크 아이디) 튜플 리스트
+        :return done: 오늘 이미 스냅샷을 만든 디스크 수
+        """
         # disk 정보 가져옴
         # e.g. disk_info = {"disk_name1":{"server_name1":"disk_id1"}", "disk_name2":{"server_name":"disk_id2"}}
         disk_info = self.get_disk_info()
@@ -49,10 +55,14 @@ class CreateSnapshotManager(BaseManager):
         # e.g. disk_list = [("disk_name1", "server_name"), ("disk_name2", "server_name")]
         disk_list = self.read_disk_list()
 
-        # job file clear
-        with open(JOB_FILE_PATH, "w") as f:
-            f.truncate(0)
+        # 이름에 오늘 날짜가 들어간 스냅샷만 조회하여 캐시에 반영 (전체 스냅샷 리스트를 다시 받지 않음)
+        existing = {snapshot.name for snapshot in self.inventory.fetch("snapshots", keyword=today)}
 
+        # 스냅샷 생성할 디스크 목록
+        # e.g. targets = [("disk_name1", "server_name", "disk_id1", "disk_name1-2024-10-21")]
+        targets = []
+        resumed = []  # 진행 중으로 남은 이전 job (job 아이디, 디스크 이름, 디스크 아이디)
+        done = 0
         for disk_name, server_name in disk_list:
             if disk_name in disk_info:
                 try:
@@ -64,44 +74,117 @@ class CreateSnapshotManager(BaseManager):
                     else:
                         snapshot_name = f"{disk_name}-{today}"
 
-                    res = self.g_platform_api.create_disk_snapshot(disk_id, snapshot_name)  # 스냅샷 생성 API 호출
-
-                    job_id = res["createsnapshotresponse"]["jobid"]
-                    content = job_id + ", " + disk_name
-                    self.write_job_file(content, JOB_FILE_PATH)
-
-                    _LOGGER.info(f"{disk_name}({server_name}) 스냅샷 생성 API 호출 완료")
-
-                    time.sleep(WAIT_TIME)  # wait_time만큼 대기 후 다시 스냅샷 생성
+                    job = previous_jobs.get(disk_id)
+                    if job and job["status"] == JOB_PROCESSING:  # 스냅샷이 보이더라도 job 완료까지 확인
+                        resumed.append((job["job_id"], disk_name, disk_id))
+                    elif snapshot_name in existing or (job and job["status"] == JOB_SUCCESS):
+                        done += 1
+                    else:
+                        targets.append((disk_name, server_name, disk_id, snapshot_name))
 
-                except HTTPError as e:  # API 응답이 200이 아닐 시 API 에러 발생
-                    _LOGGER.error(f"{disk_name} 스냅샷 생성 API 오류 발생 \n {e}")
                 except KeyError as e:
                     _LOGGER.error(f"disk_info에 해당하는 key 값이 없습니다. 디스크가 서버에 연결되어 있는지 확인해주세요."
                                   f" disk_name: {disk_name}, server_name: {server_name}"
                                   f", disk_info[{disk_name}]: {disk_info.get(disk_name)}")
-                except Exception as e:
-                    _LOGGER.error(f"{disk_name} 스냅샷 생성 중 오류 발생 \n {e}")
 
             else:
                 _LOGGER.error(f"디스크 이름: {disk_name}은 존재하지 않는 디스크입니다.")
 
-        _LOGGER.info(f"==={today} 스냅샷 생성 완료===")
+        return targets, resumed, done
 
-    def read_disk_list(self):
-        """
-        :return disk_list: key가 디스크 이름, value가 서버명: 디스크 아이디인 딕셔너리 반환
+    def unit_key(self, target) -> str:
+        """ 같은 서버의 디스크를 한 번에 제출 (서버 이름) """
+        return target[1]
+
+    def resource_id(self, target) -> str:
+        """ 디스크 아이디 """
+        return target[2]
+
+    def load_resource_sizes(self) -> dict:
+        """ 디스크 아이디 -> 디스크 크기 """
+        return {volume.id: volume.size for volume in self.inventory.volumes()}
+
+    async def submit(self, server_name, group, lease, expected=None) -> Submitted:
         """
-        
-        disk_name_list = self.load_file(self.disk_list_path, lambda f: [line.strip() for line in f])
+        서버 하나에 연결된 디스크들의 스냅샷 생성 API를 한 번에 호출 후 job 기록
+
+        디스크 사이의 스냅샷 시점 차이를 줄이기 위해 그룹 전체의 job 자리와 token을 먼저 확보한 뒤 동시에 호출합니다.
+        잡은 job 자리는 track에서 모든 job이 끝난 뒤 반환합니다.
+        다른 worker에게서 가져온 lease면 기록된 job은 다시 생성하지 않고 이어받고,
+        그 사이 만들어진 스냅샷이 있는지 다시 조회합니다.
 
-        disk_list = []
-        for disk_name in disk_name_list:
-            if disk_name.strip():
-                disk_server = disk_name.split(",")
-                disk_list.append(tuple(name.strip() for name in disk_server))
+        :param server_name: 서버 이름
+        :param group: 서버에 연결된 (디스크 이름, 서버 이름, 디스크 아이디, 스냅샷 이름) 튜플 리스트
+        :param lease: LeaseManager.claim 결과
+        :param expected: 디스크 아이디 -> 예상 소요 시간(초)
 
-        return disk_list
+        :return submitted: 완료까지 확인할 job
+        """
+        resumed = ()
+        if lease.taken_over:
+            recorded = {disk_id for _, _, disk_id in lease.jobs}
+            existing = {snapshot.name for snapshot in self.inventory.fetch("snapshots", keyword=self.today)}
+
+            group = [target for target in group if target[2] not in recorded and target[3] not in existing]
+            resumed = [(job_id, disk_name, disk_id, None, self.adopt(job_id, disk_name, disk_id))
+                       for job_id, disk_name, disk_id in lease.jobs]
+
+        count = len(group) + len(resumed)
+        JOB_QUEUE_DEPTH.inc(count, operation="create")
+        await self.submitter.job_slots.acquire(count)  # job이 끝날 때까지 동시 job 자리를 차지
+        JOB_QUEUE_DEPTH.dec(count, operation="create")
+
+        jobs = list(resumed)
+        if not group:
+            return Submitted(server_name, count, tuple(jobs), 0)
+
+        responded_at = []
+        submitted_at = {}  # 디스크 아이디 -> API 응답을 받은 시각 (job 소요 시간 기준)
+
+        async def create(disk_id, snapshot_name):
+            res = await self.async_api.create_disk_snapshot(disk_id, snapshot_name)
+            responded_at.append(time.monotonic())
+            submitted_at[disk_id] = datetime.now()
+            return res
+
+        # 스냅샷 생성 API 호출
+        res_list = await self.submitter.call_group(create, [(disk_id, snapshot_name)
+                                                            for _, _, disk_id, snapshot_name in group])
+
+        if len(responded_at) > 1:
+            skew = max(responded_at) - min(responded_at)
+            GROUP_SKEW.observe(skew)
+            _LOGGER.info(f"{server_name} 디스크 {len(group)}개 스냅샷 생성 API 호출 완료 (시점 차이 {skew:.2f}초)")
+
+        failed = 0
+        for (disk_name, _, disk_id, _), res in zip(group, res_list):
+            try:
+                if isinstance(res, BaseException):
+                    raise res
+
+                job_id = res["createsnapshotresponse"]["jobid"]
+                recorded_at = self.record_job(job_id, disk_name, disk_id, submitted_at.get(disk_id))
+                await self.leases.record(server_name, job_id, disk_name, disk_id)
+                jobs.append((job_id, disk_name, disk_id, (expected or {}).get(disk_id), recorded_at))
+
+                _LOGGER.info(f"{disk_name}({server_name}) 스냅샷 생성 API 호출 완료")
+                continue
+
+            except HTTPError as e:  # API 응답이 200이 아닐 시 API 에러 발생
+                _LOGGER.error(f"{disk_name} 스냅샷 생성 API 오류 발생 \n {e}")
+            except KeyError as e:
+                _LOGGER.error(f"API 응답에 createsnapshotresponse 또는 jobid가 없습니다: {e}")
+            except Exception as e:
+                _LOGGER.error(f"{disk_name} 스냅샷 생성 중 오류 발생 \n {e}")
+
+            failed += 1
+
+        return Submitted(server_name, count, tuple(jobs), failed)
+
+    def on_success(self, job, disk_id) -> None:
+        """ 생성된 스냅샷을 인벤토리 캐시에 반영 """
+        if job["result"].get("snapshot"):
+            self.inventory.add_snapshot(Snapshot.from_response(job["result"]["snapshot"]))
 
     def get_disk_info(self) -> dict:
         """
@@ -113,13 +196,11 @@ class CreateSnapshotManager(BaseManager):
         _LOGGER.info("디스크 리스트 API 호출")
 
         try:
-            res = self.g_platform_api.list_disk()
-            disk_list = res["listvolumesresponse"]["volume"]
-
+            # 인벤토리 캐시(만료 시 페이지 단위로 다시 호출)로 디스크 인덱스 생성
             disk_info = {}
-            for disk in disk_list:
-                if disk.get("vmdisplayname", None):
-                    disk_info.setdefault(disk["name"], {})[disk["vmdisplayname"]] = disk["id"]
+            for disk in self.inventory.volumes():
+                if disk.vmdisplayname:
+                    disk_info.setdefault(disk.name, {})[disk.vmdisplayname] = disk.id
 
             return disk_info
 
@@ -1,58 +1,36 @@
 """
 스냅샷 삭제
 """
-import os
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 import logging
-import time
-from threading import Timer
 
-import yaml
 from requests import HTTPError
 
-from src.common.config import CONFIG_PATH
-from src.manager.api import GPlatformApi
-from src.common.base import BaseManager
-from src.manager.telegram import TelegramManager
+from src.common.config import CONFIG_PATH, DISK_LIST_PATH
+from src.common.metrics import JOB_QUEUE_DEPTH
+from src.manager.job_tracker import JOB_PROCESSING, JOB_SUCCESS
+from src.manager.model import Submitted
+from src.manager.retention import RetentionPolicy, SnapshotIndex
+from src.manager.snapshot_manager import SnapshotManager
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 _LOGGER = logging.getLogger(__name__)
 
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-JOB_FILE_PATH = os.path.join(CURRENT_DIR, "result", "delete_job_list")  # ./result/delete_job_list
-WAIT_TIME = 60 * 5  # API 호출 주기
 
+class DeleteSnapshotManager(SnapshotManager):
+    OPERATION = "delete"
+    OPERATION_NAME = "삭제"
 
-class DeleteSnapshotManager(BaseManager):
-    def __init__(self, config_file=CONFIG_PATH, **arg):
-        super().__init__()
+    def __init__(self, config_file=CONFIG_PATH, disk_snapshot_list=DISK_LIST_PATH, account=None, **arg):
+        super().__init__(config_file, disk_snapshot_list, account)
         self.config_path = config_file
-        self.config = self.load_file(config_file, yaml.safe_load)  # 설정 파일 로드
 
-        self.api_key = self.config["kt_cloud"]["api_key"]
-        self.secret_key = self.config["kt_cloud"]["secret_key"]
-        self.g_platform_api = GPlatformApi(api_key=self.api_key, secret_key=self.secret_key)
-
-        self.del_date = self.calculate_del_date(self.config["time"]["del_cycle"])
-
-    @staticmethod
-    def calculate_del_date(del_cycle: str) -> str:
-        """
-        del_date 인자 체크
-
-        :param del_cycle: 오늘부터 며칠 전의 스냅샷을 삭제할지 지정
-
-        :return del_date: 삭제 진행할 날짜
-        """
         try:
-            if del_cycle[-1] == "d":
-                del_day = int(del_cycle[:-1])
-                return (datetime.now() - timedelta(days=del_day)).strftime("%Y-%m-%d")
-            else:
-                raise ValueError
-
+            self.retention_policy = RetentionPolicy.from_config(self.config)  # 스냅샷 보존 정책
         except ValueError as e:
-            _LOGGER.error(f"config파일의 time.delete_cycle 형식이 잘못되었습니다. 13d와 같이 숫자+d로 작성해주세요: {del_cycle}")
+            _LOGGER.error(e)
+            sys.exit()
 
     def delete_snapshot(self) -> None:
         """
@@ -61,70 +39,125 @@ class DeleteSnapshotManager(BaseManager):
         :return: X 
         """
 
-        _LOGGER.info(f"==={self.del_date}일자 스냅샷 삭제 시작===")
+        today = datetime.now().strftime("%Y-%m-%d")
 
-        self.send_telegram_in_next_day()
+        _LOGGER.info(f"==={today} 스냅샷 삭제 시작 (보존 정책: {self.retention_policy})===")
 
-        # 삭제할 디스크 스냅샷 리스트 가져옴
-        del_snapshot_list = self.get_del_snapshot_list(self.del_date)
+        # 속도 제한 안에서 스냅샷 삭제 API 동시 호출 (sharding 설정 시 다른 worker와 스냅샷 단위로 나눠 처리)
+        if self.run(today):
+            _LOGGER.info(f"==={today} 스냅샷 삭제 완료===")
 
-        # job file clear
-        with open(JOB_FILE_PATH, "w") as f:
-            f.truncate(0)
+    def select(self, today, previous_jobs) -> (list, list, int):
+        """
+        보존 정책으로 삭제할 스냅샷 선택
+
+        :param today: 실행 날짜 (YYYY-MM-DD)
+        :param previous_jobs: 스냅샷 아이디 -> 오늘 제출한 마지막 job 기록
 
-        for snapshot_name, snapshot_id in del_snapshot_list:
-            try:
-                res = self.g_platform_api.delete_disk_snapshot(snapshot_id)
+        :return targets: (스냅샷 이름, 스냅샷 아이디) 튜플 리스트
+        :return resumed: 진행 중으로 남은 이전 job (job 아이디, 스냅샷 이름, 스냅샷 아이디) 튜플 리스트
+        :return done: 오늘 이미 삭제한 스냅샷 수
+        """
+        # 삭제할 디스크 스냅샷 리스트 가져옴
+        del_snapshot_list = self.get_del_snapshot_list()
+
+        # 오늘 이미 삭제했거나 삭제 job이 진행 중인 스냅샷은 다시 삭제하지 않음
+        targets = []
+        resumed = []
+        done = 0
+        for snapshot_name, snapshot_id in del_snapshot_list or []:
+            job = previous_jobs.get(snapshot_id)
+            if job and job["status"] == JOB_SUCCESS:
+                self.inventory.remove_snapshot(snapshot_id)
+                done += 1
+            elif job and job["status"] == JOB_PROCESSING:
+                resumed.append((job["job_id"], snapshot_name, snapshot_id))
+            else:
+                targets.append((snapshot_name, snapshot_id))
 
-                job_id = res["deletesnapshotresponse"]["jobid"]
-                content = job_id + ", " + snapshot_name
-                self.write_job_file(content, JOB_FILE_PATH)
+        return targets, resumed, done
 
-                _LOGGER.info(f"{snapshot_name} 스냅샷 삭제 API 호출 완료")
+    def unit_key(self, target) -> str:
+        """ 스냅샷마다 따로 제출 (스냅샷 아이디) """
+        return target[1]
 
-                time.sleep(WAIT_TIME)  # wait_time만큼 대기 후 다시 스냅샷 삭제
+    def resource_id(self, target) -> str:
+        """ 스냅샷 아이디 """
+        return target[1]
 
-            except HTTPError as e:  # API 응답이 200이 아닐 시 API 에러 발생
-                _LOGGER.error(f"{snapshot_name} 스냅샷 생성 API 오류 발생 \n {e}")
+    def load_resource_sizes(self) -> dict:
+        """ 스냅샷 아이디 -> 원본 디스크 크기 """
+        volume_sizes = {volume.id: volume.size for volume in self.inventory.volumes()}
+        return {snapshot.id: volume_sizes.get(snapshot.volumeid) for snapshot in self.inventory.snapshots()}
 
-            except KeyError as e:
-                _LOGGER.error(f"API 응답에 deletesnapshotresponse 또는 jobid가 없습니다: {e}")
+    async def submit(self, snapshot_id, unit, lease, expected=None) -> Submitted:
+        """
+        스냅샷 하나의 삭제 API 호출 후 job 기록 (잡은 job 자리는 track에서 job이 끝난 뒤 반환)
+        다른 worker에게서 가져온 lease에 기록된 job이 있으면 다시 삭제하지 않고 이어받음
 
-        _LOGGER.info(f"==={self.del_date} 스냅샷 삭제 완료===")
+        :param snapshot_id: 스냅샷 아이디
+        :param unit: [(스냅샷 이름, 스냅샷 아이디)]
+        :param lease: LeaseManager.claim 결과
+        :param expected: 스냅샷 아이디 -> 예상 소요 시간(초)
 
-    def get_del_snapshot_list(self, del_date) -> list:
+        :return submitted: 완료까지 확인할 job
         """
-        삭제할 스냅샷 아이디 리스트 반환
+        (snapshot_name, _), = unit
 
-        :param del_date: 삭제 기준 날짜
+        if lease.taken_over and lease.jobs:
+            return await self.resume(lease.jobs[-1][0], snapshot_name, snapshot_id, key=snapshot_id)
 
-        :return del_snapshot_list: (디스크이름, 스냅샷명)을 원소로 가지는 리스트
+        JOB_QUEUE_DEPTH.inc(operation="delete")
+        await self.submitter.job_slots.acquire()  # job이 끝날 때까지 동시 job 자리를 차지
+        JOB_QUEUE_DEPTH.dec(operation="delete")
+
+        try:
+            res = await self.submitter.call(self.async_api.delete_disk_snapshot, snapshot_id)
+
+            job_id = res["deletesnapshotresponse"]["jobid"]
+            submitted_at = self.record_job(job_id, snapshot_name, snapshot_id)
+            await self.leases.record(snapshot_id, job_id, snapshot_name, snapshot_id)
+
+            _LOGGER.info(f"{snapshot_name} 스냅샷 삭제 API 호출 완료")
+
+        except HTTPError as e:  # API 응답이 200이 아닐 시 API 에러 발생
+            _LOGGER.error(f"{snapshot_name} 스냅샷 삭제 API 오류 발생 \n {e}")
+            return Submitted(snapshot_id, 1, (), 1)
+
+        except KeyError as e:
+            _LOGGER.error(f"API 응답에 deletesnapshotresponse 또는 jobid가 없습니다: {e}")
+            return Submitted(snapshot_id, 1, (), 1)
+
+        except Exception as e:  # 연결 실패, timeout 등 (잡은 job 자리는 track에서 반환)
+            _LOGGER.error(f"{snapshot_name} 스냅샷 삭제 중 오류 발생 \n {e!r}")
+            return Submitted(snapshot_id, 1, (), 1)
+
+        job = (job_id, snapshot_name, snapshot_id, (expected or {}).get(snapshot_id), submitted_at)
+        return Submitted(snapshot_id, 1, (job,), 0)
+
+    def on_success(self, job, snapshot_id) -> None:
+        """ 삭제된 스냅샷을 인벤토리 캐시에서 제거 """
+        self.inventory.remove_snapshot(snapshot_id)
+
+    def get_del_snapshot_list(self) -> list:
         """
-        
+        보존 정책에 따라 삭제할 스냅샷 리스트 반환
+
+        :return del_snapshot_list: (스냅샷 이름, 스냅샷 아이디)를 원소로 가지는 리스트
+        """
+
         _LOGGER.info("스냅샷 리스트 호출")
 
         try:
-            res = self.g_platform_api.list_disk_snapshot()
-            snapshot_list = res["listsnapshotsresponse"]["snapshot"]
-
-            del_snapshot_list = []
-            for snapshot in snapshot_list:
-                if self.del_date in snapshot["name"]:
-                    del_snapshot_list.append((snapshot["name"], snapshot["id"]))
+            # 인벤토리 캐시(만료 시 페이지 단위로 다시 호출)로 (디스크 이름, 서버 이름)별 날짜 인덱스 생성
+            snapshot_index = SnapshotIndex(self.read_disk_list())
+            for snapshot in self.inventory.snapshots():
+                snapshot_index.add(snapshot)
 
-            return del_snapshot_list
+            return [(snapshot.name, snapshot.id) for snapshot in snapshot_index.expired(self.retention_policy)]
 
         except HTTPError as e:
             _LOGGER.error(f"디스크 스냅샷 API 응답 코드가 200이 아닙니다: {e}")
 
         except KeyError as e:
             _LOGGER.error(f"디스크 스냅샷 API 응답에 listsnapshotsresponse 또는 snapshot이 없습니다. \n {e}")
-
-    def send_telegram_in_next_day(self):
-        now = datetime.now()
-        next_day = now + timedelta(days=1)
-        telegram_time = datetime.combine(next_day, datetime.strptime("09:30", "%H:%M").time())
-        delay = (telegram_time - now).total_seconds()
-
-        _LOGGER.info(f"텔레그램 메세지가 {telegram_time}에 전송됩니다.")
-        Timer(delay, TelegramManager(self.config_path).telegram).start()
@@ -0,0 +1,220 @@
+"""
+디스크, 스냅샷 인벤토리 캐시
+===
+
+GPlatformApi 리스트 API 결과를 TTL 동안 메모리에 보관하고 result 디렉토리에 파일로도 남겨
+프로세스가 재시작되어도 바로 사용할 수 있도록 합니다.
+스냅샷 생성, 삭제 job이 끝나면 그 결과로 캐시를 갱신하므로 TTL 안에서는 전체 리스트를 다시 호출하지 않습니다.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from src.common.config import INVENTORY_TTL, RESULT_DIR
+from src.manager.model import Volume, Snapshot
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+_INVENTORIES = {}
+_INVENTORIES_LOCK = threading.Lock()
+
+
+def get_inventory(g_platform_api, ttl=INVENTORY_TTL, filters=None):
+    """
+    계정, zone별로 공유하는 InventoryCache 반환
+
+    :param g_platform_api: GPlatformApi 객체
+    :param ttl: 캐시 유효 시간(초)
+    :param filters: 캐시 종류 -> 리스트 API 필터 (e.g. {"snapshots": {"snapshottype": "MANUAL"}})
+
+    :return inventory: InventoryCache 객체
+    """
+    key = (g_platform_api.api_key, g_platform_api.zone_id)
+
+    with _INVENTORIES_LOCK:
+        inventory = _INVENTORIES.get(key)
+
+        if inventory is None:
+            inventory = InventoryCache(g_platform_api, ttl, filters=filters)
+            _INVENTORIES[key] = inventory
+
+        inventory.g_platform_api = g_platform_api
+        inventory.set_filters(filters)
+        return inventory
+
+
+def inventory_from_config(g_platform_api, config: dict, read_only=False):
+    """
+    config 파일의 inventory 항목(ttl, volume_filters, snapshot_filters)으로 InventoryCache 반환
+
+    :param g_platform_api: GPlatformApi 객체
+    :param config: 로드한 config 파일 내용
+    :param read_only: True면 공유하지 않고 캐시 파일을 읽기만 하는 InventoryCache 생성 (e.g. cli plan)
+
+    :return inventory: InventoryCache 객체
+    """
+    inventory = config.get("inventory") or {}
+    ttl = inventory.get("ttl", INVENTORY_TTL)
+    filters = {"volumes": inventory.get("volume_filters"), "snapshots": inventory.get("snapshot_filters")}
+
+    if read_only:
+        return InventoryCache(g_platform_api, ttl, filters=filters, read_only=True)
+
+    return get_inventory(g_platform_api, ttl, filters)
+
+
+class InventoryCache:
+    # 캐시 종류 -> (레코드 타입, 리스트 API generator 이름)
+    KINDS = {
+        "volumes": (Volume, "iter_disk"),
+        "snapshots": (Snapshot, "iter_disk_snapshot"),
+    }
+
+    def __init__(self, g_platform_api, ttl=INVENTORY_TTL, cache_path=None, filters=None, read_only=False):
+        self.g_platform_api = g_platform_api
+        self.ttl = ttl
+        self.read_only = read_only  # True면 갱신한 캐시를 파일로 저장하지 않음
+        self.filters = self._normalize(filters)  # 캐시 종류 -> 리스트 API 필터 (서버에서 걸러서 받음)
+
+        # 계정, zone별 캐시 파일, 파일 이름에 API 키가 드러나지 않도록 해시 사용
+        account_key = f"{g_platform_api.api_key}:{g_platform_api.zone_id or ''}"
+        account_hash = hashlib.sha1(account_key.encode()).hexdigest()[:12]
+        self.cache_path = cache_path or os.path.join(RESULT_DIR, f"inventory_{account_hash}.json")
+
+        self._lock = threading.RLock()
+        self._items = {kind: {} for kind in self.KINDS}  # 종류 -> {아이디: 레코드}
+        self._fetched_at = {kind: 0.0 for kind in self.KINDS}
+
+        self._load()
+
+    def volumes(self) -> list:
+        """ 디스크 리스트 (캐시가 만료되었으면 다시 호출) """
+        return self._get("volumes")
+
+    def snapshots(self) -> list:
+        """ 스냅샷 리스트 (캐시가 만료되었으면 다시 호출) """
+        return self._get("snapshots")
+
+    def expired(self, kind) -> bool:
+        """ 캐시가 만료되어 다음 조회 때 리스트 API를 호출하는지 여부 """
+        with self._lock:
+            return time.time() - self._fetched_at[kind] >= self.ttl
+
+    def _get(self, kind) -> list:
+        with self._lock:
+            if self.expired(kind):
+                self.refresh(kind)
+
+            return list(self._items[kind].values())
+
+    def refresh(self, kind) -> None:
+        """
+        리스트 API를 호출하여 캐시 전체 갱신
+
+        :param kind: volumes 또는 snapshots
+        """
+        _, iter_name = self.KINDS[kind]
+
+        with self._lock:
+            _LOGGER.info(f"인벤토리 캐시 갱신: {kind}")
+
+            records = getattr(self.g_platform_api, iter_name)(**self.filters[kind])
+            self._items[kind] = {record.id: record for record in records}
+            self._fetched_at[kind] = time.time()
+
+            self.save()
+
+    def fetch(self, kind, **filters) -> list:
+        """
+        필터에 맞는 레코드만 리스트 API로 가져와 캐시에 반영 (전체 리스트를 다시 받지 않음)
+
+        :param kind: volumes 또는 snapshots
+        :param filters: 리스트 API 필터 (e.g. keyword="2024-10-21"), 캐시의 기본 필터와 함께 적용
+
+        :return: 가져온 레코드 리스트
+        """
+        _, iter_name = self.KINDS[kind]
+
+        records = list(getattr(self.g_platform_api, iter_name)(**dict(self.filters[kind], **filters)))
+
+        with self._lock:
+            for record in records:
+                self._items[kind][record.id] = record
+
+        return records
+
+    def set_filters(self, filters) -> None:
+        """ 캐시의 기본 필터 변경, 바뀐 종류의 캐시는 만료 """
+        filters = self._normalize(filters)
+
+        with self._lock:
+            for kind in self.KINDS:
+                if filters[kind] != self.filters[kind]:
+                    self._fetched_at[kind] = 0.0
+
+            self.filters = filters
+
+    def _normalize(self, filters) -> dict:
+        return {kind: dict((filters or {}).get(kind) or {}) for kind in self.KINDS}
+
+    def invalidate(self) -> None:
+        """ 다음 조회 때 전체 리스트를 다시 호출하도록 캐시 만료 """
+        with self._lock:
+            self._fetched_at = {kind: 0.0 for kind in self.KINDS}
+
+    def add_snapshot(self, snapshot: Snapshot) -> None:
+        """ 생성 완료된 스냅샷을 캐시에 추가 """
+        with self._lock:
+            self._items["snapshots"][snapshot.id] = snapshot
+
+    def remove_snapshot(self, snapshot_id) -> None:
+        """ 삭제 완료된 스냅샷을 캐시에서 제거 """
+        with self._lock:
+            self._items["snapshots"].pop(snapshot_id, None)
+
+    def save(self) -> None:
+        """ 캐시를 파일로 저장 (임시 파일에 쓴 뒤 교체하여 중간에 멈춰도 깨진 파일이 남지 않도록 함) """
+        if self.read_only:
+            return
+
+        with self._lock:
+            data = {kind: {"fetched_at": self._fetched_at[kind], "filters": self.filters[kind],
+                           "items": list(self._items[kind].values())}
+                    for kind in self.KINDS}
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+
+        except Exception as e:
+            _LOGGER.error(f"인벤토리 캐시 파일 저장 중 오류 발생: {e}")
+
+    def _load(self) -> None:
+        """ 저장된 캐시 파일이 있으면 불러옴 """
+        if not os.path.exists(self.cache_path):
+            return
+
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+
+            for kind, (record_type, _) in self.KINDS.items():
+                items = data.get(kind, {})
+                self._items[kind] = {item[0]: record_type(*item) for item in items.get("items", [])}
+                self._fetched_at[kind] = float(items.get("fetched_at", 0.0))
+
+                if items.get("filters", {}) != self.filters[kind]:  # 다른 필터로 받은 캐시는 만료
+                    self._fetched_at[kind] = 0.0
+
+        except Exception as e:
+            _LOGGER.warning(f"인벤토리 캐시 파일을 읽을 수 없어 새로 호출합니다: {e}")
+            self._items = {kind: {} for kind in self.KINDS}
+            self._fetched_at = {kind: 0.0 for kind in self.KINDS}
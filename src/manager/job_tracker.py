@@ -0,0 +1,166 @@
+"""
+job 완료 확인
+===
+
+queryAsyncJobResult API로 job 상태를 확인합니다.
+확인 간격은 지수적으로 늘리고(jitter 포함), job이 끝나는 즉시 완료 시각을 기록합니다.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+
+from requests import RequestException
+
+from src.common.config import JOB_POLL_INTERVAL, JOB_MAX_POLL_INTERVAL, JOB_TRACK_TIMEOUT
+from src.common.metrics import JOB_IN_FLIGHT, JOB_DURATION
+from src.common.retry import CircuitOpenError, classify
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+JOB_PROCESSING = 0
+JOB_SUCCESS = 1
+JOB_FAIL = 2
+
+FIRST_POLL_RATIO = 0.8  # 예상 소요 시간이 있으면 그 비율만큼 지난 뒤부터 상태 확인
+
+
+class JobTracker:
+    def __init__(self, async_api, submitter=None, poll_interval=JOB_POLL_INTERVAL,
+                 max_poll_interval=JOB_MAX_POLL_INTERVAL, timeout=JOB_TRACK_TIMEOUT):
+        self.async_api = async_api
+        self.submitter = submitter  # 있으면 job 상태 확인도 같은 속도 제한 안에서 호출
+        self.poll_interval = float(poll_interval)
+        self.max_poll_interval = float(max_poll_interval)
+        self.timeout = float(timeout)
+
+    @classmethod
+    def from_config(cls, config: dict, async_api, submitter=None):
+        """
+        config 파일의 job_tracker 항목으로 생성
+
+        :param config: 로드한 config 파일 내용
+        :param async_api: AsyncGPlatformApi 객체
+        :param submitter: RateLimitedSubmitter 객체
+        """
+        job_tracker = config.get("job_tracker") or {}
+
+        return cls(async_api, submitter,
+                   poll_interval=job_tracker.get("poll_interval", JOB_POLL_INTERVAL),
+                   max_poll_interval=job_tracker.get("max_poll_interval", JOB_MAX_POLL_INTERVAL),
+                   timeout=job_tracker.get("timeout", JOB_TRACK_TIMEOUT))
+
+    async def _check_job(self, job_id) -> dict:
+        if self.submitter:
+            return await self.submitter.call(self.async_api.check_job, job_id)
+
+        return await self.async_api.check_job(job_id)
+
+    async def track(self, job_id, name, operation="", expected=None, submitted_at=None) -> dict:
+        """
+        job이 끝날 때까지 상태 확인
+
+        :param job_id: 확인할 job 아이디
+        :param name: 디스크 또는 스냅샷 이름 (로그용)
+        :param operation: create 또는 delete (메트릭 label)
+        :param expected: 예상 소요 시간(초), 있으면 거의 끝날 때까지 상태 확인을 미룸
+        :param submitted_at: job을 제출한 시각 (소요 시간 기준), None이면 지금
+
+        :return job: job 상태, 제출/완료 시각, 에러 메세지가 담긴 딕셔너리
+        """
+        job = {
+            "job_id": job_id,
+            "name": name,
+            "status": JOB_PROCESSING,
+            "submitted_at": submitted_at or datetime.now(),
+            "completed_at": None,
+            "error_text": None,
+            "result": None,
+        }
+
+        JOB_IN_FLIGHT.inc(operation=operation)
+        try:
+            job = await self._poll(job, expected)
+        finally:
+            JOB_IN_FLIGHT.dec(operation=operation)
+
+        if job["completed_at"]:
+            JOB_DURATION.observe((job["completed_at"] - job["submitted_at"]).total_seconds(),
+                                 operation=operation, status="success" if job["status"] == JOB_SUCCESS else "fail")
+
+        return job
+
+    async def _poll(self, job, expected=None) -> dict:
+        """ 간격을 늘려가며 job 상태를 확인하고 결과를 job 딕셔너리에 기록 """
+        job_id, name = job["job_id"], job["name"]
+
+        started = time.monotonic()
+        delay = self.poll_interval
+
+        if expected:
+            await asyncio.sleep(min(expected * FIRST_POLL_RATIO, self.timeout / 2))
+
+        while time.monotonic() - started < self.timeout:
+            # 확인 간격을 지수적으로 늘리고 jitter를 주어 여러 job의 확인 요청이 한꺼번에 몰리지 않도록 함
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+            delay = min(delay * 2, self.max_poll_interval)
+
+            try:
+                res = await self._check_job(job_id)
+            except RequestException as e:
+                retryable, _ = classify(e, "queryAsyncJobResult")
+                if retryable or isinstance(e, CircuitOpenError):  # 연결 실패, timeout, 5xx는 제한 시간까지 다시 확인
+                    _LOGGER.warning(f"job 상태 확인 API 오류 발생 - job_id: {job_id}, 이름: {name} \n {e!r}")
+                    continue
+
+                # 4xx처럼 다시 확인해도 같은 오류가 나는 경우 기다리지 않고 실패로 기록
+                job["status"] = JOB_FAIL
+                job["error_text"] = f"job 상태 확인 실패: {e}"
+                _LOGGER.error(f"job 상태 확인 API 오류로 추적을 중단합니다. - job_id: {job_id}, 이름: {name} \n {e!r}")
+                return job
+
+            result = res.get("queryasyncjobresultresponse", {})
+            status = result.get("jobstatus", JOB_FAIL)
+
+            if status == JOB_PROCESSING:
+                continue
+
+            job["status"] = status
+            job["completed_at"] = datetime.now()
+            job["result"] = result.get("jobresult", {})
+
+            elapsed = (job["completed_at"] - job["submitted_at"]).total_seconds()
+            if status == JOB_SUCCESS:
+                _LOGGER.info(f"{name} job 완료 ({elapsed:.0f}초 소요)")
+            else:
+                job["error_text"] = job["result"].get("errortext", None)
+                command = result.get("cmd", "").split(".")[-1]  # 스냅샷 생성, 삭제 command 확인
+
+                _LOGGER.error(f"스냅샷 API 실패 - 명령어: {command}, 디스크 또는 스냅샷 이름: {name}, "
+                              f"에러 메세지: {job['error_text']}")
+
+            return job
+
+        _LOGGER.warning(f"{name} job이 {self.timeout:.0f}초 안에 끝나지 않아 추적을 중단합니다. (job_id: {job_id})")
+        return job
+
+    @staticmethod
+    def summarize(job_list) -> (int, int, int):
+        """
+        job 결과 집계
+
+        :param job_list: track 결과 리스트 (None은 API 호출 실패로 job이 없는 경우)
+
+        :return success: 성공 job 수
+        :return fail: 실패 job 수
+        :return processing: 아직 진행 중인 job 수
+        """
+        job_list = [job for job in job_list if job]
+
+        success = sum(1 for job in job_list if job["status"] == JOB_SUCCESS)
+        processing = sum(1 for job in job_list if job["status"] == JOB_PROCESSING)
+
+        return success, len(job_list) - success - processing, processing
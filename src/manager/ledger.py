@@ -0,0 +1,261 @@
+"""
+job 기록 (SQLite)
+===
+
+스냅샷 생성, 삭제 실행(run)과 job을 SQLite(WAL 모드)에 기록합니다.
+실행마다 파일을 비우지 않으므로 기록이 다음 주기까지 남고,
+리포트, 재시도, 재시작 후 이어서 실행할 때 인덱스로 조회할 수 있습니다.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from src.common.config import RESULT_DIR
+from src.manager.job_tracker import JOB_SUCCESS
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+LEDGER_PATH = os.path.join(RESULT_DIR, "job_ledger.db")  # ./result/job_ledger.db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    account     TEXT NOT NULL,
+    operation   TEXT NOT NULL,
+    started_at  TEXT NOT NULL,
+    finished_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id       TEXT PRIMARY KEY,
+    run_id       INTEGER NOT NULL REFERENCES runs (id),
+    resource     TEXT NOT NULL,
+    resource_id  TEXT,
+    operation    TEXT NOT NULL,
+    submitted_at TEXT NOT NULL,
+    status       INTEGER NOT NULL DEFAULT 0,
+    completed_at TEXT,
+    error_text   TEXT,
+    size         INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_runs_account_operation ON runs (account, operation, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_run_id ON jobs (run_id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+"""
+
+# 이전 버전에서 만든 파일에 없는 컬럼 (컬럼 이름, 타입)
+MIGRATIONS = [
+    ("size", "INTEGER"),
+]
+
+_LEDGERS = {}
+_LEDGERS_LOCK = threading.Lock()
+
+
+def get_ledger(path=LEDGER_PATH, read_only=False):
+    """
+    프로세스 안에서 공유하는 JobLedger 반환
+
+    :param path: SQLite 파일 경로
+    :param read_only: True면 파일을 만들거나 쓰지 않고 읽기만 함 (e.g. cli plan)
+
+    :return ledger: JobLedger 객체
+    """
+    with _LEDGERS_LOCK:
+        if (path, read_only) not in _LEDGERS:
+            _LEDGERS[(path, read_only)] = JobLedger(path, read_only)
+
+        return _LEDGERS[(path, read_only)]
+
+
+class JobLedger:
+    def __init__(self, path=LEDGER_PATH, read_only=False):
+        self.path = path
+        self.read_only = read_only
+        self._lock = threading.Lock()
+
+        if read_only:
+            self._open_read_only()
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _open_read_only(self) -> None:
+        """ 기록 파일을 읽기 전용으로 열고, 파일이 없으면 빈 메모리 DB 사용 (파일을 만들지 않음) """
+        if os.path.exists(self.path):
+            self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, timeout=30,
+                                        check_same_thread=False, isolation_level=None)
+        else:
+            _LOGGER.info(f"job 기록 파일이 없어 빈 기록으로 조회합니다: {self.path}")
+            self.conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+            self.conn.executescript(SCHEMA)
+
+        self.conn.row_factory = sqlite3.Row
+
+    def _migrate(self) -> None:
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in MIGRATIONS:
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+
+    def _execute(self, query, params=()) -> sqlite3.Cursor:
+        with self._lock:
+            return self.conn.execute(query, params)
+
+    def _fetchall(self, query, params=()) -> list:
+        with self._lock:
+            return self.conn.execute(query, params).fetchall()
+
+    def start_run(self, account, operation) -> int:
+        """
+        실행 기록 시작
+
+        :param account: 계정 이름
+        :param operation: create 또는 delete
+
+        :return run_id: 실행 아이디
+        """
+        cursor = self._execute("INSERT INTO runs (account, operation, started_at) VALUES (?, ?, ?)",
+                               (account, operation, datetime.now().isoformat()))
+
+        return cursor.lastrowid
+
+    def finish_run(self, run_id) -> None:
+        """ 실행 종료 시각 기록 """
+        self._execute("UPDATE runs SET finished_at = ? WHERE id = ?", (datetime.now().isoformat(), run_id))
+
+    def add_job(self, run_id, job_id, resource, operation, resource_id=None, size=None, submitted_at=None) -> None:
+        """
+        제출한 job 기록
+
+        :param run_id: 실행 아이디
+        :param job_id: job 아이디
+        :param resource: 디스크 또는 스냅샷 이름
+        :param operation: create 또는 delete
+        :param resource_id: 디스크 또는 스냅샷 아이디
+        :param size: 디스크 크기 (소요 시간 예측용)
+        :param submitted_at: 제출 시각 (datetime), None이면 지금
+        """
+        submitted_at = submitted_at or datetime.now()
+
+        try:
+            self._execute("INSERT OR REPLACE INTO jobs"
+                          " (job_id, run_id, resource, resource_id, operation, submitted_at, size)"
+                          " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          (job_id, run_id, resource, resource_id, operation, submitted_at.isoformat(), size))
+
+        except sqlite3.Error as e:
+            _LOGGER.error(f"Job ID({job_id}) 기록 중 오류 발생: {e}")
+
+    def update_job(self, job_id, status, completed_at=None, error_text=None) -> None:
+        """
+        job 상태 기록
+
+        :param job_id: job 아이디
+        :param status: 0(진행 중), 1(성공), 2(실패)
+        :param completed_at: 완료 시각 (datetime)
+        :param error_text: 실패 시 에러 메세지
+        """
+        try:
+            self._execute("UPDATE jobs SET status = ?, completed_at = ?, error_text = ? WHERE job_id = ?",
+                          (status, completed_at.isoformat() if completed_at else None, error_text, job_id))
+
+        except sqlite3.Error as e:
+            _LOGGER.error(f"Job ID({job_id}) 상태 기록 중 오류 발생: {e}")
+
+    def latest_run(self, account, operation):
+        """
+        계정의 가장 최근 실행 반환
+
+        :return run: runs 테이블 row, 없으면 None
+        """
+        rows = self._fetchall("SELECT * FROM runs WHERE account = ? AND operation = ? ORDER BY id DESC LIMIT 1",
+                              (account, operation))
+
+        return rows[0] if rows else None
+
+    def run_jobs(self, run_id, status=None) -> list:
+        """
+        실행에 속한 job 리스트 반환
+
+        :param run_id: 실행 아이디
+        :param status: 지정하면 해당 상태의 job만 반환
+
+        :return: jobs 테이블 row 리스트
+        """
+        if status is None:
+            return self._fetchall("SELECT * FROM jobs WHERE run_id = ? ORDER BY submitted_at", (run_id,))
+
+        return self._fetchall("SELECT * FROM jobs WHERE run_id = ? AND status = ? ORDER BY submitted_at",
+                              (run_id, status))
+
+    def unfinished_run(self, account, operation, since):
+        """
+        since 이후 시작했지만 끝나지 않은 (중간에 멈춘) 가장 최근 실행 반환
+
+        :param account: 계정 이름
+        :param operation: create 또는 delete
+        :param since: 기준 시각 (ISO 형식 문자열, e.g. 2024-10-21)
+
+        :return run: runs 테이블 row, 없으면 None
+        """
+        rows = self._fetchall("SELECT * FROM runs WHERE account = ? AND operation = ? AND started_at >= ?"
+                              " ORDER BY id DESC LIMIT 1", (account, operation, since))
+
+        return rows[0] if rows and rows[0]["finished_at"] is None else None
+
+    def resource_jobs(self, account, operation, since) -> dict:
+        """
+        since 이후 시작한 실행에서 디스크 또는 스냅샷마다 가장 최근에 제출한 job 반환
+
+        :param account: 계정 이름
+        :param operation: create 또는 delete
+        :param since: 기준 시각 (ISO 형식 문자열, e.g. 2024-10-21)
+
+        :return: 디스크 또는 스냅샷 아이디 -> jobs 테이블 row
+        """
+        rows = self._fetchall("SELECT jobs.* FROM jobs JOIN runs ON jobs.run_id = runs.id"
+                              " WHERE runs.account = ? AND runs.operation = ? AND runs.started_at >= ?"
+                              " ORDER BY jobs.submitted_at", (account, operation, since))
+
+        return {row["resource_id"]: row for row in rows}
+
+    def adopt_job(self, job_id, run_id):
+        """
+        이전 실행에서 진행 중으로 남은 job을 현재 실행으로 옮김
+
+        :return submitted_at: 기록된 제출 시각 (datetime), 기록에 없는 job이면 None
+        """
+        rows = self._fetchall("SELECT submitted_at FROM jobs WHERE job_id = ?", (job_id,))
+        if not rows:
+            return None
+
+        self._execute("UPDATE jobs SET run_id = ? WHERE job_id = ?", (run_id, job_id))
+        return datetime.fromisoformat(rows[0]["submitted_at"])
+
+    def job_durations(self, operation, limit) -> list:
+        """
+        최근 성공한 job의 소요 시간 반환
+
+        :param operation: create 또는 delete
+        :param limit: 조회할 최근 job 수
+
+        :return: (디스크 또는 스냅샷 아이디, 크기, 소요 시간(초)) 튜플 리스트, 오래된 순
+        """
+        rows = self._fetchall("SELECT resource_id, size,"
+                              " (julianday(completed_at) - julianday(submitted_at)) * 86400 AS seconds"
+                              " FROM jobs WHERE operation = ? AND status = ? AND completed_at IS NOT NULL"
+                              " ORDER BY completed_at DESC LIMIT ?", (operation, JOB_SUCCESS, limit))
+
+        return [(row["resource_id"], row["size"], row["seconds"]) for row in reversed(rows)]
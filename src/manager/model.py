@@ -0,0 +1,38 @@
+"""
+G 플랫폼 API 응답 레코드
+===
+
+리스트 API 응답에서 Manager가 사용하는 필드만 남긴 가벼운 레코드와, 제출한 job 묶음 레코드입니다.
+"""
+
+from typing import NamedTuple, Optional
+
+
+class Volume(NamedTuple):
+    id: str
+    name: str
+    vmdisplayname: Optional[str]  # 연결된 서버 이름, 서버에 연결되지 않은 디스크는 None
+    size: Optional[int]  # 디스크 크기 (byte)
+
+    @classmethod
+    def from_response(cls, volume: dict):
+        return cls(volume["id"], volume["name"], volume.get("vmdisplayname"), volume.get("size"))
+
+
+class Snapshot(NamedTuple):
+    id: str
+    name: str
+    volumeid: Optional[str]
+    created: Optional[str]
+
+    @classmethod
+    def from_response(cls, snapshot: dict):
+        return cls(snapshot["id"], snapshot["name"], snapshot.get("volumeid"), snapshot.get("created"))
+
+
+class Submitted(NamedTuple):
+    key: Optional[str]  # lease key (서버 이름 또는 스냅샷 아이디), 이전 실행에서 이어받은 job이면 None
+    slots: int  # job이 끝날 때까지 차지한 동시 job 자리 수
+    # 완료까지 확인할 job (job 아이디, 디스크 또는 스냅샷 이름, 디스크 또는 스냅샷 아이디, 예상 소요 시간, 제출 시각)
+    jobs: tuple
+    failed: int  # API 호출에 실패한 수
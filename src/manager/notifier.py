@@ -0,0 +1,358 @@
+"""
+텔레그램 알림 큐
+===
+
+리포트, 실패 알림을 바로 보내지 않고 프로세스 하나에 하나뿐인 큐에 넣으면 백그라운드 스레드 하나가 모아서 전송합니다.
+
+- 큐에 넣기만 하므로 텔레그램이 느리거나 실패해도 스냅샷 작업(worker)을 막지 않습니다.
+  큐가 가득 차면 기다리지 않고 메세지를 버립니다.
+- 첫 메세지가 들어온 뒤 batch_window 동안 새 메세지가 없을 때까지(최대 max_delay) 기다렸다가
+  같은 채팅방으로 가는 메세지(여러 계정의 리포트, 생성, 삭제 실패 알림)를 합쳐 한 번에 보냅니다.
+  텔레그램 메세지 길이 제한(4096자)을 넘으면 나눠서 보냅니다.
+- 429 응답은 retry_after만큼, 연결 실패나 5xx는 지수 backoff로 기다린 뒤 다시 보냅니다.
+- 공유 HTTP 세션(get_session)의 keep-alive 커넥션을 사용하며, G 플랫폼 API와 달리 인증서를 검증합니다.
+- 프로세스가 끝날 때 큐에 남은 메세지를 flush_timeout 동안 보내고 종료합니다.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import NamedTuple
+
+import requests
+
+from src.common.config import TELEGRAM_API_URL, HTTP_TIMEOUT, NOTIFY_QUEUE_SIZE, NOTIFY_BATCH_WINDOW, \
+    NOTIFY_MAX_DELAY, NOTIFY_MAX_ATTEMPTS, NOTIFY_FLUSH_TIMEOUT, NOTIFY_FAILURES
+from src.common.metrics import NOTIFY_QUEUE_DEPTH, NOTIFY_MESSAGES
+from src.common.retry import RetryPolicy, SERVER_ERROR_STATUS_CODES
+from src.manager.api import get_session
+from src.manager.job_tracker import JOB_PROCESSING, JOB_SUCCESS
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+MESSAGE_MAX_LENGTH = 4096  # 텔레그램 메세지 하나의 최대 길이
+MESSAGE_SEPARATOR = "\n\n"
+FAILURE_DETAIL_COUNT = 10  # 실패 알림에 이름을 적을 최대 job 수
+_FLUSH = object()  # 기다리지 않고 바로 보내라는 표시
+
+_NOTIFIER = None
+_NOTIFIER_LOCK = threading.Lock()
+
+
+class Channel(NamedTuple):
+    api_url: str
+    bot_token: str
+    chat_id: str
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        config 파일의 telegram 항목으로 생성
+
+        :param config: 로드한 config 파일 내용
+        """
+        telegram = config["telegram"]
+        return cls(telegram.get("api_url", TELEGRAM_API_URL), str(telegram["bot_token"]), str(telegram["chat_id"]))
+
+
+def get_notifier(config: dict):
+    """
+    프로세스 단위로 공유하는 Notifier 반환
+
+    :param config: 로드한 config 파일 내용 (처음 만들 때만 사용)
+
+    :return notifier: Notifier 객체
+    """
+    global _NOTIFIER
+
+    with _NOTIFIER_LOCK:
+        if _NOTIFIER is None:
+            _NOTIFIER = Notifier.from_config(config)
+            atexit.register(_NOTIFIER.flush)
+
+        return _NOTIFIER
+
+
+def notify(config: dict, message) -> bool:
+    """
+    config 파일의 텔레그램 채팅방으로 보낼 메세지를 큐에 넣음 (전송을 기다리지 않음)
+
+    :param config: 로드한 config 파일 내용
+    :param message: 보낼 메세지 내용
+
+    :return: 큐에 넣었으면 True, 큐가 가득 차 버렸으면 False
+    """
+    return get_notifier(config).put(Channel.from_config(config), message)
+
+
+def notify_failures(config: dict, title, job_list) -> None:
+    """
+    실패한 job이 있고 notify.failures가 켜져 있으면 실패 알림을 큐에 넣음
+
+    :param config: 로드한 config 파일 내용
+    :param title: 알림 제목 (e.g. [account] 2024-10-21 스냅샷 생성)
+    :param job_list: JobTracker.track 결과 리스트 (None은 API 호출에 실패한 경우)
+    """
+    if not (config.get("notify") or {}).get("failures", NOTIFY_FAILURES):
+        return
+
+    failed = [job for job in job_list if job and job["status"] not in (JOB_SUCCESS, JOB_PROCESSING)]
+    not_submitted = sum(1 for job in job_list if not job)
+    if not failed and not not_submitted:
+        return
+
+    lines = [f"{title} 실패 {len(failed)}건, API 호출 실패 {not_submitted}건 / 전체 {len(job_list)}건"]
+    lines += [f"- {job['name']}: {job['error_text']}" for job in failed[:FAILURE_DETAIL_COUNT]]
+    if len(failed) > FAILURE_DETAIL_COUNT:
+        lines.append(f"... 외 {len(failed) - FAILURE_DETAIL_COUNT}건")
+
+    notify(config, "\n".join(lines))
+
+
+class Notifier:
+    def __init__(self, queue_size=NOTIFY_QUEUE_SIZE, batch_window=NOTIFY_BATCH_WINDOW, max_delay=NOTIFY_MAX_DELAY,
+                 max_attempts=NOTIFY_MAX_ATTEMPTS, flush_timeout=NOTIFY_FLUSH_TIMEOUT, timeout=HTTP_TIMEOUT,
+                 retry=None):
+        """
+        :param queue_size: 큐에 쌓아둘 수 있는 최대 메세지 수
+        :param batch_window: 마지막 메세지 이후 더 합칠 메세지를 기다리는 시간(초)
+        :param max_delay: 첫 메세지를 보내기까지 기다리는 최대 시간(초)
+        :param max_attempts: 메세지 하나를 보내는 최대 횟수
+        :param flush_timeout: 종료할 때 남은 메세지를 보내기를 기다리는 최대 시간(초)
+        :param timeout: 텔레그램 API 호출 timeout (connect, read)
+        :param retry: 재시도 대기 시간을 계산할 RetryPolicy
+        """
+        self.queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self.batch_window = float(batch_window)
+        self.max_delay = float(max_delay)
+        self.max_attempts = max(int(max_attempts), 1)
+        self.flush_timeout = float(flush_timeout)
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        config 파일의 notify 항목으로 생성
+
+        :param config: 로드한 config 파일 내용
+        """
+        notify_config = config.get("notify") or {}
+        timeout = (config.get("http") or {}).get("timeout", HTTP_TIMEOUT)
+        if isinstance(timeout, (list, tuple)):  # yaml에서는 [connect, read] 리스트로 작성
+            timeout = tuple(timeout)
+
+        return cls(queue_size=notify_config.get("queue_size", NOTIFY_QUEUE_SIZE),
+                   batch_window=notify_config.get("batch_window", NOTIFY_BATCH_WINDOW),
+                   max_delay=notify_config.get("max_delay", NOTIFY_MAX_DELAY),
+                   max_attempts=notify_config.get("max_attempts", NOTIFY_MAX_ATTEMPTS),
+                   flush_timeout=notify_config.get("flush_timeout", NOTIFY_FLUSH_TIMEOUT),
+                   timeout=timeout,
+                   retry=RetryPolicy.from_config(config))
+
+    def put(self, channel: Channel, message) -> bool:
+        """
+        메세지를 큐에 넣음, 큐가 가득 차면 기다리지 않고 버림
+
+        :param channel: 보낼 채팅방
+        :param message: 보낼 메세지 내용
+
+        :return: 큐에 넣었으면 True
+        """
+        self._start()
+
+        try:
+            self.queue.put_nowait((channel, message))
+        except queue.Full:
+            _LOGGER.error(f"텔레그램 알림 큐가 가득 차 메세지를 버립니다: {message[:100]!r}")
+            NOTIFY_MESSAGES.inc(status="dropped")
+            return False
+
+        NOTIFY_QUEUE_DEPTH.set(self.queue.qsize())
+        return True
+
+    def flush(self, timeout=None) -> bool:
+        """
+        큐에 남은 메세지를 기다리지 않고 바로 보내고, 모두 보낼 때까지 대기
+
+        :param timeout: 최대 대기 시간(초), None이면 flush_timeout
+
+        :return: 모두 보냈으면 True
+        """
+        if self._thread is None:
+            return True
+
+        try:
+            self.queue.put_nowait(_FLUSH)
+        except queue.Full:  # 가득 차 있으면 모으는 중이 아니라 보내는 중
+            pass
+
+        timeout = self.flush_timeout if timeout is None else timeout
+        with self.queue.all_tasks_done:
+            done = self.queue.all_tasks_done.wait_for(lambda: not self.queue.unfinished_tasks, timeout)
+
+        if not done:
+            _LOGGER.warning(f"텔레그램 메세지 {self.queue.unfinished_tasks}개를 보내지 못하고 종료합니다.")
+
+        return done
+
+    def _start(self) -> None:
+        """ 처음 메세지를 넣을 때 전송 스레드 시작 """
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="telegram-notifier", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+
+            try:
+                self._deliver([item for item in batch if item is not _FLUSH])
+            except Exception as e:
+                _LOGGER.error(f"텔레그램 메세지 전송 중 오류 발생: {e!r}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+                NOTIFY_QUEUE_DEPTH.set(self.queue.qsize())
+
+    def _collect(self) -> list:
+        """
+        첫 메세지를 받은 뒤 batch_window 동안 새 메세지가 없을 때까지(최대 max_delay) 모음
+
+        :return batch: 큐에서 꺼낸 (Channel, 메세지) 리스트 (flush 표시 포함)
+        """
+        batch = [self.queue.get()]
+        started = last = time.monotonic()
+
+        while batch[-1] is not _FLUSH:
+            timeout = min(last + self.batch_window, started + self.max_delay) - time.monotonic()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+            last = time.monotonic()
+
+        # flush 요청이면 남아 있는 메세지도 함께 보냄
+        if batch[-1] is _FLUSH:
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+        return batch
+
+    def _deliver(self, batch) -> None:
+        """
+        채팅방마다 메세지를 합쳐서 전송 (같은 내용은 한 번만)
+
+        :param batch: (Channel, 메세지) 리스트
+        """
+        messages = {}
+        for channel, message in batch:
+            messages.setdefault(channel, {})[message] = None  # 순서를 유지하며 중복 제거
+
+        for channel, texts in messages.items():
+            chunks = self._merge(list(texts))
+            if len(batch) > 1:
+                _LOGGER.info(f"텔레그램 메세지 {len(texts)}개를 {len(chunks)}개로 합쳐 전송합니다.")
+
+            for chunk in chunks:
+                self._send(channel, chunk)
+
+    @staticmethod
+    def _merge(texts) -> list:
+        """
+        메세지를 MESSAGE_MAX_LENGTH를 넘지 않는 만큼씩 이어 붙임 (한 메세지가 넘으면 잘라서 나눔)
+
+        :return chunks: 보낼 메세지 리스트
+        """
+        chunks = []
+        current = ""
+
+        for text in texts:
+            if len(text) > MESSAGE_MAX_LENGTH:
+                if current:
+                    chunks.append(current)
+                    current = ""
+
+                while len(text) > MESSAGE_MAX_LENGTH:
+                    chunks.append(text[:MESSAGE_MAX_LENGTH])
+                    text = text[MESSAGE_MAX_LENGTH:]
+
+            if current and len(current) + len(MESSAGE_SEPARATOR) + len(text) > MESSAGE_MAX_LENGTH:
+                chunks.append(current)
+                current = ""
+
+            current = f"{current}{MESSAGE_SEPARATOR}{text}" if current else text
+
+        if current:
+            chunks.append(current)
+
+        return chunks
+
+    def _send(self, channel: Channel, message) -> bool:
+        """
+        텔레그램 메세지 하나 전송, 429는 retry_after만큼, 연결 실패나 5xx는 backoff 후 다시 시도
+
+        :return: 전송에 성공했으면 True
+        """
+        url = f"{channel.api_url}/bot{channel.bot_token}/sendMessage"
+        headers = {
+            'User-Agent': 'Telegram Bot SDK - (https://github.com/irazasyed/telegram-bot-sdk)',
+            'accept': 'application/json',
+            'content-type': 'application/json'
+        }
+        data = {
+            "chat_id": channel.chat_id,
+            "text": message,
+            "disable_web_page_preview": False,
+            "disable_notification": False,
+            "reply_to_message_id": None
+        }
+
+        for attempt in range(self.max_attempts):
+            retry_after = None
+
+            try:
+                res = get_session().post(url, headers=headers, json=data, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = repr(e)
+            else:
+                if res.status_code == 200:
+                    _LOGGER.info("===텔레그램 메세지 전송 성공===")
+                    NOTIFY_MESSAGES.inc(status="sent")
+                    return True
+
+                error = f"status code: {res.status_code}"
+                if res.status_code == 429:
+                    retry_after = self._retry_after(res)
+                elif res.status_code not in SERVER_ERROR_STATUS_CODES:
+                    break
+
+            if attempt + 1 < self.max_attempts:
+                delay = self.retry.delay(attempt, retry_after)
+                _LOGGER.warning(f"텔레그램 메세지 전송 실패 ({error}), {delay:.1f}초 후 다시 시도합니다.")
+                time.sleep(delay)
+
+        _LOGGER.error(f"텔레그램 메세지 전송 실패 ({error})")
+        NOTIFY_MESSAGES.inc(status="failed")
+        return False
+
+    @staticmethod
+    def _retry_after(res):
+        """ 429 응답의 parameters.retry_after (없으면 Retry-After 헤더) """
+        try:
+            return res.json()["parameters"]["retry_after"]
+        except (ValueError, KeyError, TypeError):
+            return res.headers.get("Retry-After")
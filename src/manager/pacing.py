@@ -0,0 +1,191 @@
+"""
+job 소요 시간 예측
+===
+
+job 기록(ledger)에 남은 지난 job의 소요 시간으로 이번 job의 소요 시간을 예측합니다.
+
+- 같은 디스크의 기록이 있으면 최근 기록에 가중치를 둔 평균(EWMA)을 사용합니다.
+- 없으면 디스크 크기당 소요 시간(중앙값)에 크기를 곱하고, 크기도 모르면 전체 중앙값을 사용합니다.
+
+예측한 시간으로 오래 걸리는 job부터 제출하고(LPT),
+백업 창(backup window) 안에 끝낼 수 있는 가장 적은 동시 job 수를 정합니다.
+"""
+
+import heapq
+import logging
+from statistics import median
+
+from src.common.config import DEFAULT_JOB_DURATION, PACING_HISTORY, BACKUP_WINDOW
+from src.manager.retention import parse_days
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+EWMA_ALPHA = 0.5  # 최근 기록의 가중치
+
+
+def parse_window(value):
+    """
+    백업 창 설정을 초 단위로 변환
+
+    :param value: 초(숫자) 혹은 "4h", "30m", "1d" 형태의 문자열, None 또는 빈 문자열이면 제한 없음
+
+    :return seconds: 초, 제한이 없으면 None
+    """
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    if not value:  # e.g. create_window: ""
+        return None
+
+    units = {"s": 1, "m": 60, "h": 60 * 60}
+
+    if value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    if value[-1] == "d":
+        return parse_days(value) * 24 * 60 * 60
+
+    return float(value)
+
+
+def makespan(durations, slots) -> float:
+    """
+    주어진 순서대로 빈 자리에 job을 넣을 때 모든 job이 끝나는 시간
+
+    :param durations: 제출 순서대로 job의 예상 소요 시간(초) 리스트
+    :param slots: 동시 job 수
+
+    :return: 예상 전체 소요 시간(초)
+    """
+    finish = [0.0] * max(int(slots), 1)
+    for duration in durations:
+        heapq.heappush(finish, heapq.heappop(finish) + duration)
+
+    return max(finish)
+
+
+def plan_slots(durations, max_slots, window) -> (int, float):
+    """
+    백업 창 안에 끝낼 수 있는 가장 적은 동시 job 수 계산
+
+    :param durations: 제출 순서대로 job의 예상 소요 시간(초) 리스트
+    :param max_slots: 최대 동시 job 수
+    :param window: 백업 창(초), None이면 max_slots 그대로 사용
+
+    :return slots: 동시 job 수
+    :return estimate: 해당 동시 job 수의 예상 전체 소요 시간(초)
+    """
+    max_slots = max(int(max_slots), 1)
+    if window is None or not durations:
+        return max_slots, makespan(durations, max_slots)
+
+    # 동시 job 수가 늘수록 전체 소요 시간은 줄어드므로 이분 탐색
+    low, high = 1, max_slots
+    while low < high:
+        middle = (low + high) // 2
+        if makespan(durations, middle) <= window:
+            high = middle
+        else:
+            low = middle + 1
+
+    return low, makespan(durations, low)
+
+
+class DurationModel:
+    def __init__(self, history=(), default=DEFAULT_JOB_DURATION):
+        """
+        :param history: (디스크 또는 스냅샷 아이디, 크기, 소요 시간(초)) 튜플 리스트, 오래된 순
+        :param default: 기록이 없을 때 예상 소요 시간(초)
+        """
+        self.by_resource = {}  # 아이디 -> 소요 시간 EWMA
+        per_size = []
+        durations = []
+
+        for resource_id, size, seconds in history:
+            if seconds is None or seconds < 0:
+                continue
+
+            previous = self.by_resource.get(resource_id)
+            self.by_resource[resource_id] = seconds if previous is None \
+                else EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * previous
+
+            durations.append(seconds)
+            if size:
+                per_size.append(seconds / size)
+
+        self.seconds_per_size = median(per_size) if per_size else None
+        self.default = median(durations) if durations else float(default)
+        self.has_history = bool(durations)  # 기록 없이 기본값으로 예측하는지 여부
+
+    @classmethod
+    def from_ledger(cls, ledger, operation, config: dict):
+        """
+        job 기록과 config 파일의 pacing 항목으로 생성
+
+        :param ledger: JobLedger 객체
+        :param operation: create 또는 delete
+        :param config: 로드한 config 파일 내용
+        """
+        pacing = config.get("pacing") or {}
+
+        history = ledger.job_durations(operation, int(pacing.get("history", PACING_HISTORY)))
+        return cls(history, float(pacing.get("default_duration", DEFAULT_JOB_DURATION)))
+
+    def predict(self, resource_id=None, size=None) -> float:
+        """
+        job 예상 소요 시간(초)
+
+        :param resource_id: 디스크 또는 스냅샷 아이디
+        :param size: 디스크 크기
+
+        :return: 예상 소요 시간(초)
+        """
+        if resource_id in self.by_resource:
+            return self.by_resource[resource_id]
+
+        if size and self.seconds_per_size is not None:
+            return size * self.seconds_per_size
+
+        return self.default
+
+
+def backup_window(config: dict, operation):
+    """
+    config 파일의 pacing.<operation>_window 값(초)
+
+    :param config: 로드한 config 파일 내용
+    :param operation: create 또는 delete
+
+    :return: 백업 창(초), 설정이 없으면 None
+    """
+    pacing = config.get("pacing") or {}
+
+    try:
+        return parse_window(pacing.get(f"{operation}_window", BACKUP_WINDOW))
+    except ValueError:
+        _LOGGER.error(f"config 파일의 pacing.{operation}_window 포맷이 잘못되었습니다. (e.g. 4h) "
+                      f"{operation}_window: {pacing.get(f'{operation}_window')}")
+        return None
+
+
+def log_plan(operation, jobs, slots, estimate, window) -> None:
+    """
+    예상 소요 시간 로그, 백업 창을 넘을 것으로 예상되면 경고
+
+    :param operation: create 또는 delete
+    :param jobs: 제출할 job 수
+    :param slots: 동시 job 수
+    :param estimate: 예상 전체 소요 시간(초)
+    :param window: 백업 창(초)
+    """
+    if not jobs:
+        return
+
+    message = f"{operation} job {jobs}개 예상 소요 시간: {estimate:.0f}초 (동시 job {slots}개"
+    message += f", 백업 창 {window:.0f}초)" if window else ")"
+
+    if window and estimate > window:
+        _LOGGER.warning(f"{message} - 백업 창 안에 끝나지 않을 수 있습니다.")
+    else:
+        _LOGGER.info(message)
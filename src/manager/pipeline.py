@@ -0,0 +1,258 @@
+"""
+스냅샷 생성, 삭제 파이프라인
+===
+
+생성과 삭제를 따로 실행하지 않고, 한 이벤트 루프에서 단계별로 겹쳐 실행합니다.
+
+    인벤토리 -> 계획 -> [큐] -> 제출(생성, 삭제) -> [큐] -> 완료 확인 -> [큐] -> 결과
+
+- 단계 사이는 크기가 정해진 큐로 연결하여 앞 단계가 너무 앞서가지 않도록 합니다.
+- 생성, 삭제, job 상태 확인 모두 계정의 같은 RateLimitedSubmitter(token bucket, 동시 job 자리)를 사용하므로
+  API 호출 한도 하나를 함께 나눠 쓰고, 한쪽이 끝나기를 기다리지 않습니다.
+- 생성 그룹과 삭제 스냅샷을 예상 소요 시간이 긴 것부터 섞어서 제출하여(LPT) 전체 소요 시간을 줄입니다.
+- 백업 창(pacing)이 있으면 생성, 삭제 중 짧은 백업 창 안에 끝낼 수 있는 가장 적은 동시 job 수로 제출합니다.
+- 작업 하나의 제출, 완료 확인이 실패해도 실패로 기록하고 나머지 작업은 계속 진행합니다.
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from contextlib import ExitStack
+from datetime import datetime
+from functools import partial
+from typing import NamedTuple, Callable
+
+from src.common.config import CONFIG_PATH, DISK_LIST_PATH, PIPELINE_SUBMIT_WORKERS
+from src.common.metrics import RUN_DURATION, RUN_LAST_SUCCESS
+from src.manager.create_snapshot import CreateSnapshotManager
+from src.manager.delete_snapshot import DeleteSnapshotManager
+from src.common.rate_limit import JobSlots
+from src.manager.pacing import backup_window, plan_slots, log_plan
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+
+class WorkItem(NamedTuple):
+    expected: float  # 예상 소요 시간(초), 긴 것부터 제출
+    operation: str  # create 또는 delete
+    key: str  # lease key (서버 이름 또는 스냅샷 아이디)
+    durations: tuple  # job마다 예상 소요 시간(초) (생성은 그룹의 디스크 수만큼)
+    submit: Callable  # lease를 받아 Submitted를 반환하는 coroutine 함수
+
+
+class SnapshotPipeline:
+    def __init__(self, config_file=CONFIG_PATH, disk_snapshot_list=DISK_LIST_PATH, account=None):
+        self.managers = {
+            "create": CreateSnapshotManager(config_file, disk_snapshot_list, account=account),
+            "delete": DeleteSnapshotManager(config_file, disk_snapshot_list, account=account),
+        }
+        self.config = self.managers["create"].config
+        self.submitter = self.managers["create"].submitter  # 같은 계정이면 생성, 삭제가 같은 객체를 사용
+
+        pipeline = self.config.get("pipeline") or {}
+        self.submit_workers = max(int(pipeline.get("submit_workers", PIPELINE_SUBMIT_WORKERS)), 1)
+        self.queue_size = max(int(pipeline.get("queue_size", self.submitter.max_jobs)), 1)
+
+    def run(self) -> None:
+        """
+        스냅샷 생성, 삭제를 한 번에 실행
+        """
+        started = time.monotonic()
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        _LOGGER.info(f"==={today} 스냅샷 생성, 삭제 파이프라인 시작===")
+
+        asyncio.run(self._run(today))
+
+        RUN_DURATION.set(time.monotonic() - started, operation="pipeline")
+        RUN_LAST_SUCCESS.set(time.time(), operation="pipeline")
+
+        _LOGGER.info(f"==={today} 스냅샷 생성, 삭제 파이프라인 완료 ({time.monotonic() - started:.1f}초)===")
+
+    async def _run(self, today) -> None:
+        creator, deleter = self.managers["create"], self.managers["delete"]
+
+        # 1. 인벤토리: 디스크, 스냅샷 리스트를 동시에 갱신 (만료된 경우에만 호출)
+        await asyncio.gather(asyncio.to_thread(creator.inventory.volumes),
+                             asyncio.to_thread(creator.inventory.snapshots))
+
+        # 2. 계획: 생성할 디스크, 보존 정책으로 삭제할 스냅샷
+        plans = dict(zip(self.managers, await asyncio.gather(asyncio.to_thread(creator.plan, today),
+                                                             asyncio.to_thread(deleter.plan, today))))
+        plans = {operation: plan for operation, plan in plans.items() if plan is not None}
+        if not plans:
+            return
+
+        items, resumed = self._work_items(plans)
+        _LOGGER.info(f"파이프라인 작업 - 생성 그룹: {sum(item.operation == 'create' for item in items)}, "
+                     f"삭제: {sum(item.operation == 'delete' for item in items)}, 이어서 확인: {len(resumed)}")
+
+        # 생성, 삭제 중 짧은 백업 창 안에 끝낼 수 있는 가장 적은 동시 job 수로 제출
+        windows = [window for window in (backup_window(self.config, operation) for operation in plans)
+                   if window is not None]
+        window = min(windows) if windows else None
+        durations = [duration for item in items for duration in item.durations]
+        slots, estimate = plan_slots(durations, self.submitter.max_jobs, window)
+        log_plan("pipeline", len(durations), slots, estimate, window)
+
+        with ExitStack() as stack:
+            for operation in plans:
+                stack.enter_context(self.managers[operation].leases)
+
+            results = await self._stages(items, resumed, slots)
+
+        for operation in plans:
+            self.managers[operation].finish(results[operation])
+
+    def _work_items(self, plans) -> (list, list):
+        """
+        계획을 제출 단위(생성은 서버 그룹, 삭제는 스냅샷)로 나눠 예상 소요 시간이 긴 것부터 섞음
+
+        :param plans: create, delete -> SnapshotManager.plan 결과
+
+        :return items: WorkItem 리스트
+        :return resumed: 이전 실행에서 이어받을 (operation, job) 튜플 리스트
+        """
+        streams = []
+        resumed = []
+
+        for operation, (targets, operation_resumed) in plans.items():
+            manager = self.managers[operation]
+            ordered, expected, has_history = manager.order(targets)
+
+            stream = []
+            for key, unit in ordered:
+                durations = tuple(expected[manager.resource_id(target)] for target in unit)
+                # 기록이 없어 기본값으로 예측한 경우에는 상태 확인을 미루지 않음
+                stream.append(WorkItem(max(durations), operation, key, durations,
+                                       partial(manager.submit, key, unit, expected=expected if has_history else None)))
+
+            streams.append(stream)
+            resumed += [(operation, job) for job in operation_resumed]
+
+        # 각 리스트는 이미 긴 것부터 정렬되어 있으므로 병합만 함
+        return list(heapq.merge(*streams, key=lambda item: -item.expected)), resumed
+
+    async def _stages(self, items, resumed, slots) -> dict:
+        """
+        제출, 완료 확인, 결과 단계를 큐로 연결하여 동시에 실행
+
+        :param slots: 동시 job 수 (plan_slots 결과)
+
+        :return results: create, delete -> JobTracker.track 결과 리스트
+        """
+        submit_queue = asyncio.Queue(maxsize=self.queue_size)
+        track_queue = asyncio.Queue(maxsize=self.queue_size)
+        result_queue = asyncio.Queue()
+        run_slots = JobSlots(slots)
+        skipped = {operation: {} for operation in self.managers}  # 다른 worker가 가져간 key -> WorkItem
+
+        async def submit(item, lease=None):
+            """ 동시 job 자리를 잡고 작업 하나 제출, 완료 확인 단계로 넘길 (operation, Submitted, 자리 수) 반환 """
+            count = min(len(item.durations), slots)
+            await run_slots.acquire(count)
+
+            try:
+                lease = lease or self.managers[item.operation].leases.claim(item.key)
+                if lease is None:  # 다른 worker가 처리 중이거나 이미 끝낸 작업
+                    run_slots.release(count)
+                    skipped[item.operation][item.key] = item
+                    return None
+
+                return item.operation, await item.submit(lease), count
+
+            except Exception as e:
+                run_slots.release(count)
+                _LOGGER.error(f"파이프라인 {item.operation} 작업({item.key}) 제출 중 오류 발생 \n {e!r}")
+                result_queue.put_nowait((item.operation, [None] * len(item.durations)))
+                return None
+
+        async def track(operation, submitted, count=0):
+            """ 제출한 job 완료까지 확인 후 결과 단계로 넘김, 실패하면 job마다 None으로 기록 """
+            try:
+                job_list = await self.managers[operation].track(submitted)
+            except Exception as e:
+                _LOGGER.error(f"파이프라인 {operation} job 완료 확인 중 오류 발생 \n {e!r}")
+                job_list = [None] * (len(submitted.jobs) + submitted.failed)
+            finally:
+                if count:
+                    run_slots.release(count)
+
+            result_queue.put_nowait((operation, job_list))
+            return job_list
+
+        async def plan_stage():
+            # 이전 실행에서 진행 중으로 남은 job은 다시 제출하지 않고 바로 완료 확인 단계로
+            for operation, job in resumed:
+                try:
+                    await track_queue.put((operation, await self.managers[operation].resume(*job)))
+                except Exception as e:
+                    _LOGGER.error(f"파이프라인 {operation} 이전 job({job[0]}) 이어받기 중 오류 발생 \n {e!r}")
+                    result_queue.put_nowait((operation, [None]))
+
+            for item in items:
+                await submit_queue.put(item)
+
+            for _ in range(self.submit_workers):
+                await submit_queue.put(None)
+
+        async def submit_stage():
+            # 동시 job 자리가 없으면 여기서 기다리므로 앞 단계도 큐가 차면 멈춤
+            while True:
+                item = await submit_queue.get()
+                try:
+                    if item is None:
+                        return
+                    entry = await submit(item)
+                finally:
+                    submit_queue.task_done()
+
+                if entry is not None:
+                    await track_queue.put(entry)
+
+        async def track_stage():
+            tracking = []
+
+            while (entry := await track_queue.get()) is not None:
+                tracking.append(asyncio.ensure_future(track(*entry)))
+
+            for result in await asyncio.gather(*tracking, return_exceptions=True):
+                if isinstance(result, BaseException):
+                    _LOGGER.error(f"파이프라인 job 완료 확인 중 오류 발생 \n {result!r}")
+
+        async def result_stage():
+            results = {operation: [] for operation in self.managers}
+            finished = 0
+
+            while (entry := await result_queue.get()) is not None:
+                operation, job_list = entry
+                results[operation].extend(job_list)
+
+                finished += 1
+                if finished % 100 == 0:
+                    _LOGGER.info(f"파이프라인 진행 - 생성 {len(results['create'])}, 삭제 {len(results['delete'])} 완료")
+
+            return results
+
+        submitters = [asyncio.ensure_future(submit_stage()) for _ in range(self.submit_workers)]
+        tracker = asyncio.ensure_future(track_stage())
+        reporter = asyncio.ensure_future(result_stage())
+
+        await plan_stage()
+        await asyncio.gather(*submitters)
+        await track_queue.put(None)
+        await tracker
+
+        # 멈춘 worker가 남긴 작업은 lease가 만료되면 가져와서 처리
+        async def take_over(operation, key, lease):
+            entry = await submit(skipped[operation][key], lease)
+            return await track(*entry) if entry is not None else []
+
+        await asyncio.gather(*(self.managers[operation].leases.sweep(
+            list(keys), lambda key, lease, operation=operation: take_over(operation, key, lease))
+            for operation, keys in skipped.items() if keys))
+
+        await result_queue.put(None)
+        return await reporter
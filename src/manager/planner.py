@@ -0,0 +1,292 @@
+"""
+스냅샷 생성, 삭제 미리보기 (dry-run)
+===
+
+API를 호출하여 스냅샷을 만들거나 지우지 않고, 실행했을 때 호출할 createSnapshot, deleteSnapshot과 예상 소요 시간을 계산합니다.
+
+- 디스크, 스냅샷 리스트는 종류마다 한 번만 가져옵니다. (인벤토리 캐시가 유효하면 호출하지 않음)
+- 디스크 리스트 파일과 디스크, 스냅샷 리스트를 이름, 아이디 해시 인덱스로 한 번에 대조합니다.
+    디스크 이름 -> 서버 이름 -> 디스크, 스냅샷 이름 집합, (디스크 이름, 서버 이름) -> 날짜별 스냅샷(SnapshotIndex)
+- 삭제 대상은 그날 새로 만들 스냅샷까지 포함하여 보존 정책을 적용합니다. (keep_last 등이 실제 실행과 같도록)
+- 예상 소요 시간은 job 기록으로 만든 DurationModel과 동시 job 수, 백업 창(pacing)으로 계산합니다.
+- job 기록(ledger)은 읽기 전용으로 열고(파일이 없으면 빈 기록), 새로 받은 리스트도 캐시 파일에 저장하지 않습니다.
+  실행 기록, lease, 인벤토리 캐시 파일 등 아무것도 쓰지 않습니다.
+"""
+
+import logging
+from datetime import datetime
+from typing import NamedTuple
+
+from src.common.config import CONFIG_PATH, DISK_LIST_PATH
+from src.common.base import BaseManager
+from src.common.rate_limit import get_submitter
+from src.common.settings import load_config
+from src.manager.inventory import inventory_from_config
+from src.manager.job_tracker import JOB_PROCESSING, JOB_SUCCESS
+from src.manager.ledger import get_ledger
+from src.manager.model import Snapshot
+from src.manager.pacing import DurationModel, backup_window, plan_slots
+from src.manager.retention import RetentionPolicy, SnapshotIndex
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+
+class PlannedCreate(NamedTuple):
+    disk_name: str
+    server_name: str
+    disk_id: str
+    snapshot_name: str
+    expected: float  # 예상 소요 시간(초)
+
+
+class PlannedDelete(NamedTuple):
+    snapshot_name: str
+    snapshot_id: str
+    expected: float  # 예상 소요 시간(초)
+
+
+class Estimate(NamedTuple):
+    jobs: int  # 제출할 job 수
+    slots: int  # 동시 job 수
+    seconds: float  # 예상 전체 소요 시간(초)
+    window: float  # 백업 창(초), 설정이 없으면 None
+    has_history: bool  # job 기록으로 예측했는지 여부 (False면 기본값으로 예측)
+
+
+class DryRun(NamedTuple):
+    account_name: str
+    date: str  # 실행 날짜 (YYYY-MM-DD)
+    creates: list  # PlannedCreate 리스트, 제출 순서(오래 걸리는 서버부터)
+    deletes: list  # PlannedDelete 리스트, 제출 순서(오래 걸리는 스냅샷부터)
+    missing: list  # 존재하지 않는 디스크 (디스크 이름, 서버 이름) 리스트
+    detached: list  # 이름은 있지만 해당 서버에 연결되지 않은 디스크 (디스크 이름, 서버 이름, 연결된 서버 리스트) 리스트
+    ambiguous: list  # 여러 서버에 같은 이름이 있는 디스크 (디스크 이름, 서버 리스트) 리스트
+    duplicated: list  # 같은 서버에 같은 이름이 여러 개인 디스크 (디스크 이름, 서버 이름, 디스크 아이디 리스트) 리스트
+    done: dict  # create, delete -> 이미 스냅샷이 있거나 삭제가 끝난 수
+    resumed: dict  # create, delete -> 이전 실행에서 진행 중으로 남아 완료만 확인할 job 수
+    create_estimate: Estimate
+    delete_estimate: Estimate
+    api_calls: dict  # 리스트 API 종류 -> 호출 여부 (캐시를 사용했으면 False)
+
+
+class SnapshotPlanner(BaseManager):
+    def __init__(self, config_file=CONFIG_PATH, disk_snapshot_list=DISK_LIST_PATH, account=None, **arg):
+        super().__init__()
+        self.config = load_config(config_file)  # 설정 파일 로드 (바뀌었을 때만 다시 읽음)
+        self.config = self.apply_account(self.config, account)  # 여러 계정 중 하나를 실행하는 경우
+        self.account = account
+
+        self.account_name = self.config["kt_cloud"]["account_name"]
+        self.api_key = self.config["kt_cloud"]["api_key"]
+        self.g_platform_api = self.create_g_platform_api(self.config)  # 공유 커넥션 풀 사용
+        self.submitter = get_submitter(self.api_key, self.config)  # 동시 job 수
+        self.inventory = inventory_from_config(self.g_platform_api, self.config, read_only=True)  # 캐시 파일 저장 안 함
+        self.ledger = get_ledger(read_only=True)  # job 기록 (읽기 전용)
+        self.retention_policy = RetentionPolicy.from_config(self.config)
+
+        self.disk_list_path = (account or {}).get("disk_list", disk_snapshot_list)  # 계정별 디스크 리스트
+
+    def build(self, date=None, refresh=False) -> DryRun:
+        """
+        디스크 리스트와 디스크, 스냅샷 리스트를 대조하여 실행 계획 생성
+
+        :param date: 실행 날짜 (YYYY-MM-DD), 없으면 오늘
+        :param refresh: True면 인벤토리 캐시를 무시하고 리스트 API를 다시 호출
+
+        :return dry_run: DryRun
+        """
+        date = date or datetime.now().strftime("%Y-%m-%d")
+
+        if refresh:
+            self.inventory.invalidate()
+        api_calls = {kind: self.inventory.expired(kind) for kind in ("volumes", "snapshots")}
+
+        volumes = self.inventory.volumes()  # 리스트 API는 종류마다 한 번 (캐시가 유효하면 호출하지 않음)
+        snapshots = self.inventory.snapshots()
+
+        disk_list = self.read_disk_list()
+
+        # 해시 인덱스: 디스크 이름 -> 서버 이름 -> 디스크 아이디, 디스크 아이디 -> 크기, 스냅샷 이름 집합
+        disk_info = {}
+        duplicated = {}
+        disk_sizes = {}
+        for volume in volumes:
+            disk_sizes[volume.id] = volume.size
+            if not volume.vmdisplayname:
+                continue
+
+            servers = disk_info.setdefault(volume.name, {})
+            if volume.vmdisplayname in servers:  # 실제 실행에서는 나중에 받은 디스크만 사용됨
+                duplicated.setdefault((volume.name, volume.vmdisplayname), [servers[volume.vmdisplayname]]) \
+                    .append(volume.id)
+            servers[volume.vmdisplayname] = volume.id
+
+        snapshot_names = {snapshot.name for snapshot in snapshots}
+
+        creates, missing, detached, ambiguous, done, resumed, create_history = self._plan_creates(
+            date, disk_list, disk_info, snapshot_names, disk_sizes)
+
+        # 새로 만들 스냅샷까지 넣은 인덱스로 보존 정책 적용
+        snapshot_index = SnapshotIndex(disk_list)
+        for snapshot in snapshots:
+            snapshot_index.add(snapshot)
+        for create in creates:
+            snapshot_index.add(Snapshot(None, create.snapshot_name, create.disk_id, None))
+
+        volume_ids = {snapshot.id: snapshot.volumeid for snapshot in snapshots}
+        expired = [snapshot for snapshot in snapshot_index.expired(self.retention_policy,
+                                                                   datetime.strptime(date, "%Y-%m-%d").date())
+                   if snapshot.id is not None]
+        deletes, delete_done, delete_resumed, delete_history = self._plan_deletes(date, expired, volume_ids,
+                                                                                   disk_sizes)
+
+        return DryRun(self.account_name, date, creates, deletes, missing, detached, ambiguous,
+                      [(name, server, ids) for (name, server), ids in duplicated.items()],
+                      {"create": done, "delete": delete_done}, {"create": resumed, "delete": delete_resumed},
+                      self._estimate("create", [create.expected for create in creates], create_history),
+                      self._estimate("delete", [delete.expected for delete in deletes], delete_history),
+                      api_calls)
+
+    def _plan_creates(self, date, disk_list, disk_info, snapshot_names, disk_sizes) -> tuple:
+        """
+        CreateSnapshotManager.plan과 같은 규칙으로 생성할 스냅샷 결정
+
+        :return creates: PlannedCreate 리스트 (오래 걸리는 서버부터)
+        :return missing, detached, ambiguous: 확인이 필요한 디스크
+        :return done: 이미 스냅샷이 있는 디스크 수
+        :return resumed: 진행 중인 이전 job 수
+        :return has_history: 기록으로 예측했는지 여부
+        """
+        previous_jobs = self.ledger.resource_jobs(self.account_name, "create", date)
+        model = DurationModel.from_ledger(self.ledger, "create", self.config)
+
+        groups = {}  # 서버 이름 -> PlannedCreate 리스트
+        missing, detached, ambiguous = [], [], {}
+        done = resumed = 0
+
+        for disk_name, server_name in disk_list:
+            servers = disk_info.get(disk_name)
+            if servers is None:
+                missing.append((disk_name, server_name))
+                continue
+
+            if server_name not in servers:
+                detached.append((disk_name, server_name, sorted(servers)))
+                continue
+
+            disk_id = servers[server_name]
+
+            # 스냅샷 이름 규칙: 디스크 이름-날짜, 중복 디스크 이름이 있을 경우 디스크 이름-서버이름-날짜
+            if len(servers) > 1:
+                ambiguous[disk_name] = sorted(servers)
+                snapshot_name = f"{disk_name}-{server_name}-{date}"
+            else:
+                snapshot_name = f"{disk_name}-{date}"
+
+            job = previous_jobs.get(disk_id)
+            if job and job["status"] == JOB_PROCESSING:
+                resumed += 1
+            elif snapshot_name in snapshot_names or (job and job["status"] == JOB_SUCCESS):
+                done += 1
+            else:
+                groups.setdefault(server_name, []).append(
+                    PlannedCreate(disk_name, server_name, disk_id, snapshot_name,
+                                  model.predict(disk_id, disk_sizes.get(disk_id))))
+
+        # 실제 실행과 같이 오래 걸리는 서버부터 제출
+        ordered = sorted(groups.values(), key=lambda group: max(create.expected for create in group), reverse=True)
+        creates = [create for group in ordered for create in group]
+
+        return creates, missing, detached, list(ambiguous.items()), done, resumed, model.has_history
+
+    def _plan_deletes(self, date, expired, volume_ids, disk_sizes) -> tuple:
+        """
+        DeleteSnapshotManager.plan과 같은 규칙으로 삭제할 스냅샷 결정
+
+        :param expired: 보존 정책으로 고른 Snapshot 레코드 리스트
+
+        :return deletes: PlannedDelete 리스트 (오래 걸리는 스냅샷부터)
+        :return done: 이미 삭제한 스냅샷 수
+        :return resumed: 진행 중인 이전 job 수
+        :return has_history: 기록으로 예측했는지 여부
+        """
+        previous_jobs = self.ledger.resource_jobs(self.account_name, "delete", date)
+        model = DurationModel.from_ledger(self.ledger, "delete", self.config)
+
+        deletes = []
+        done = resumed = 0
+        for snapshot in expired:
+            job = previous_jobs.get(snapshot.id)
+            if job and job["status"] == JOB_SUCCESS:
+                done += 1
+            elif job and job["status"] == JOB_PROCESSING:
+                resumed += 1
+            else:
+                deletes.append(PlannedDelete(snapshot.name, snapshot.id,
+                                             model.predict(snapshot.id, disk_sizes.get(volume_ids.get(snapshot.id)))))
+
+        deletes.sort(key=lambda delete: delete.expected, reverse=True)
+        return deletes, done, resumed, model.has_history
+
+    def _estimate(self, operation, durations, has_history) -> Estimate:
+        """ 백업 창 안에 끝낼 수 있는 동시 job 수와 예상 전체 소요 시간 """
+        window = backup_window(self.config, operation)
+        slots, seconds = plan_slots(durations, self.submitter.max_jobs, window)
+
+        return Estimate(len(durations), slots, seconds, window, has_history)
+
+
+def format_duration(seconds) -> str:
+    """ 초를 읽기 쉬운 문자열로 (e.g. 1시간 5분, 45초) """
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}초"
+
+    hours, minutes = divmod(seconds // 60, 60)
+    return f"{hours}시간 {minutes}분" if hours else f"{minutes}분"
+
+
+def format_dry_run(dry_run: DryRun, details=True) -> list:
+    """
+    실행 계획을 출력할 문자열 리스트로 변환
+
+    :param dry_run: SnapshotPlanner.build 결과
+    :param details: True면 호출할 createSnapshot, deleteSnapshot을 모두 출력
+
+    :return lines: 출력할 줄 리스트
+    """
+    called = [kind for kind, call in dry_run.api_calls.items() if call]
+    lines = [f"[{dry_run.account_name}] {dry_run.date} 실행 계획 "
+             f"(리스트 API 호출: {', '.join(called) if called else '없음, 인벤토리 캐시 사용'})"]
+
+    for operation, label, estimate in (("create", "생성", dry_run.create_estimate),
+                                       ("delete", "삭제", dry_run.delete_estimate)):
+        line = (f"  {label} {estimate.jobs}건 (이미 완료 {dry_run.done[operation]}, "
+                f"진행 중 job 확인 {dry_run.resumed[operation]}) - 예상 소요 시간 {format_duration(estimate.seconds)} "
+                f"(동시 job {estimate.slots}개")
+        if estimate.window:
+            line += f", 백업 창 {format_duration(estimate.window)}"
+            if estimate.seconds > estimate.window:
+                line += " 초과"
+        if estimate.jobs and not estimate.has_history:
+            line += ", job 기록이 없어 기본값으로 예측"
+        lines.append(line + ")")
+
+    for disk_name, server_name in dry_run.missing:
+        lines.append(f"  ! 존재하지 않는 디스크: {disk_name} ({server_name})")
+    for disk_name, server_name, servers in dry_run.detached:
+        lines.append(f"  ! 서버에 연결되지 않은 디스크: {disk_name} ({server_name}), 연결된 서버: {', '.join(servers)}")
+    for disk_name, servers in dry_run.ambiguous:
+        lines.append(f"  ! 여러 서버에 같은 이름의 디스크 (스냅샷 이름에 서버 이름 추가): {disk_name} ({', '.join(servers)})")
+    for disk_name, server_name, disk_ids in dry_run.duplicated:
+        lines.append(f"  ! 같은 서버에 같은 이름의 디스크 (하나만 생성됨): {disk_name} ({server_name}), "
+                     f"디스크 아이디: {', '.join(disk_ids)}")
+
+    if details:
+        lines += [f"  createSnapshot {create.disk_name} ({create.server_name}) -> {create.snapshot_name} "
+                  f"~{format_duration(create.expected)}" for create in dry_run.creates]
+        lines += [f"  deleteSnapshot {delete.snapshot_name} ({delete.snapshot_id}) ~{format_duration(delete.expected)}"
+                  for delete in dry_run.deletes]
+
+    return lines
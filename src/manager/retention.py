@@ -0,0 +1,194 @@
+"""
+스냅샷 보존 정책
+===
+
+CreateSnapshotManager가 만드는 스냅샷 이름({디스크 이름}-{날짜} 또는 {디스크 이름}-{서버 이름}-{날짜})을
+한 번만 훑어 (디스크 이름, 서버 이름)별 날짜 인덱스를 만든 뒤, 보존 정책에 따라 삭제할 스냅샷을 고릅니다.
+
+보존 정책
+- keep_last: 최근 N개 보존
+- keep_daily / keep_weekly / keep_monthly: 최근 N일 / N주 / N달 동안 하루 / 한 주 / 한 달에 하나씩 보존 (GFS)
+- max_age: N일이 지난 스냅샷 삭제 (e.g. 13d), 지정하지 않으면 time.del_cycle 사용
+
+여러 정책을 함께 쓰면 하나라도 보존 대상인 스냅샷은 남깁니다.
+특정 날짜 하루만 지우지 않으므로 서비스가 멈춰 삭제하지 못한 날의 스냅샷도 다음 실행에서 함께 지워집니다.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%d"
+DATE_LENGTH = len("YYYY-MM-DD")
+
+
+def parse_days(value) -> int:
+    """
+    13d 형태의 기간을 일 수로 변환
+
+    :param value: 숫자+d 형태의 문자열 또는 숫자
+
+    :return days: 일 수
+    """
+    value = str(value).strip()
+
+    if value.endswith("d"):
+        value = value[:-1]
+
+    return int(value)
+
+
+def parse_snapshot_name(name: str):
+    """
+    스냅샷 이름을 (접두어, 날짜)로 분리
+
+    :param name: 스냅샷 이름 e.g. disk_name1-server_name-2024-10-21
+
+    :return: (접두어, date) 튜플, 날짜로 끝나지 않는 이름이면 None
+    """
+    if len(name) <= DATE_LENGTH + 1 or name[-DATE_LENGTH - 1] != "-":
+        return None
+
+    try:
+        date = datetime.strptime(name[-DATE_LENGTH:], DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+    return name[:-DATE_LENGTH - 1], date
+
+
+class RetentionPolicy:
+    def __init__(self, keep_last=None, keep_daily=None, keep_weekly=None, keep_monthly=None, max_age=None):
+        self.keep_last = keep_last
+        self.keep_daily = keep_daily
+        self.keep_weekly = keep_weekly
+        self.keep_monthly = keep_monthly
+        self.max_age = max_age
+
+    @classmethod
+    def from_config(cls, config: dict):
+        """
+        config 파일의 retention 항목으로 생성, 없으면 time.del_cycle을 max_age로 사용
+
+        :param config: 로드한 config 파일 내용
+        """
+        retention = config.get("retention") or {"max_age": config["time"]["del_cycle"]}
+
+        try:
+            return cls(keep_last=retention.get("keep_last"),
+                       keep_daily=retention.get("keep_daily"),
+                       keep_weekly=retention.get("keep_weekly"),
+                       keep_monthly=retention.get("keep_monthly"),
+                       max_age=parse_days(retention["max_age"]) if retention.get("max_age") is not None else None)
+
+        except ValueError:
+            raise ValueError(f"config파일의 보존 기간 형식이 잘못되었습니다. 13d와 같이 숫자+d로 작성해주세요: {retention}")
+
+    def __str__(self):
+        rules = {"keep_last": self.keep_last, "keep_daily": self.keep_daily, "keep_weekly": self.keep_weekly,
+                 "keep_monthly": self.keep_monthly, "max_age": f"{self.max_age}d" if self.max_age is not None else None}
+
+        return ", ".join(f"{key}={value}" for key, value in rules.items() if value is not None)
+
+    def select_delete(self, snapshots, today) -> list:
+        """
+        한 디스크의 스냅샷 중 삭제할 스냅샷 선택
+
+        :param snapshots: 최신순으로 정렬된 (날짜, 스냅샷) 리스트
+        :param today: 기준 날짜
+
+        :return: 삭제할 스냅샷 리스트
+        """
+        if self.max_age is None and not any((self.keep_last, self.keep_daily, self.keep_weekly, self.keep_monthly)):
+            return []  # 정책이 없으면 모두 보존
+
+        keep = set()
+
+        if self.keep_last:
+            keep.update(range(min(self.keep_last, len(snapshots))))
+
+        for count, period in ((self.keep_daily, lambda d: d),
+                              (self.keep_weekly, lambda d: d.isocalendar()[:2]),
+                              (self.keep_monthly, lambda d: (d.year, d.month))):
+            if not count:
+                continue
+
+            seen = set()
+            for i, (date, _) in enumerate(snapshots):
+                key = period(date)
+                if key not in seen:
+                    if len(seen) == count:
+                        break
+                    seen.add(key)
+                    keep.add(i)  # 기간별 가장 최신 스냅샷 보존
+
+        if self.max_age is not None:
+            cutoff = today - timedelta(days=self.max_age)
+            keep.update(i for i, (date, _) in enumerate(snapshots) if date > cutoff)
+
+        return [snapshot for i, (_, snapshot) in enumerate(snapshots) if i not in keep]
+
+
+class SnapshotIndex:
+    """
+    (디스크 이름, 서버 이름) -> [(날짜, 스냅샷)] 인덱스
+    """
+
+    def __init__(self, disk_list=()):
+        # 스냅샷 이름 접두어 -> (디스크 이름, 서버 이름)
+        self.prefix_map = {}
+
+        disk_count = {}
+        for disk_name, server_name in disk_list:
+            disk_count[disk_name] = disk_count.get(disk_name, 0) + 1
+
+        for disk_name, server_name in disk_list:
+            self.prefix_map[f"{disk_name}-{server_name}"] = (disk_name, server_name)
+            if disk_count[disk_name] == 1:  # 디스크 이름만으로 서버를 알 수 있는 경우
+                self.prefix_map.setdefault(disk_name, (disk_name, server_name))
+
+        self.index = {}
+
+    def add(self, snapshot) -> bool:
+        """
+        스냅샷을 인덱스에 추가
+
+        disk_list에 없는 디스크의 스냅샷은 이 도구가 만든 스냅샷이 아닐 수 있으므로 (e.g. before-upgrade-2023-05-01)
+        인덱스에 넣지 않아 삭제 대상에서 제외합니다.
+
+        :param snapshot: Snapshot 레코드
+
+        :return: disk_list의 디스크 스냅샷이라 인덱스에 추가했는지 여부
+        """
+        parsed = parse_snapshot_name(snapshot.name)
+        if parsed is None:
+            return False
+
+        prefix, date = parsed
+        key = self.prefix_map.get(prefix)
+        if key is None:
+            return False
+
+        self.index.setdefault(key, []).append((date, snapshot))
+
+        return True
+
+    def expired(self, policy: RetentionPolicy, today=None) -> list:
+        """
+        보존 정책에 따라 삭제할 스냅샷 리스트 반환
+
+        :param policy: RetentionPolicy 객체
+        :param today: 기준 날짜, 없으면 오늘
+
+        :return: 삭제할 Snapshot 레코드 리스트
+        """
+        today = today or datetime.now().date()
+
+        expired = []
+        for snapshots in self.index.values():
+            snapshots.sort(key=lambda item: item[0], reverse=True)
+            expired.extend(policy.select_delete(snapshots, today))
+
+        return expired
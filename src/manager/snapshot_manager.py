@@ -0,0 +1,338 @@
+"""
+스냅샷 생성, 삭제 Manager의 베이스 클래스
+===
+
+생성과 삭제는 호출하는 API와 대상만 다르고 나머지 흐름은 같습니다.
+
+    계획(plan) -> 제출 단위로 정렬(order) -> 제출(submit) -> 완료 확인(track)
+
+- 제출 단위는 lease key 하나로 묶는 대상입니다. (생성은 같은 서버의 디스크들, 삭제는 스냅샷 하나)
+- submit은 job이 끝날 때까지 동시 job 자리를 차지하고, track이 모든 job의 완료를 확인한 뒤 자리를 반환합니다.
+- 이전 실행에서 진행 중으로 남은 job은 resume으로 다시 제출하지 않고 완료까지 확인합니다.
+- SnapshotPipeline도 같은 order, submit, track, resume으로 생성, 삭제를 섞어서 실행합니다.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+
+from src.common.base import BaseManager
+from src.common.lease import LeaseManager
+from src.common.metrics import RUN_DURATION, RUN_LAST_SUCCESS
+from src.common.rate_limit import JobSlots, get_submitter
+from src.common.settings import load_config
+from src.manager.api import AsyncGPlatformApi
+from src.manager.inventory import inventory_from_config
+from src.manager.job_tracker import JobTracker, JOB_SUCCESS
+from src.manager.ledger import get_ledger
+from src.manager.model import Submitted
+from src.manager.notifier import notify_failures
+from src.manager.pacing import DurationModel, backup_window, plan_slots, log_plan
+
+logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
+_LOGGER = logging.getLogger(__name__)
+
+
+class SnapshotManager(BaseManager):
+    OPERATION = None  # create 또는 delete (job 기록, lease, 메트릭 구분)
+    OPERATION_NAME = None  # 로그, 알림에 쓰는 이름 (생성, 삭제)
+
+    def __init__(self, config_file, disk_snapshot_list, account=None):
+        super().__init__()
+        self.config = load_config(config_file)  # 설정 파일 로드 (바뀌었을 때만 다시 읽음)
+        self.config = self.apply_account(self.config, account)  # 여러 계정 중 하나를 실행하는 경우
+        self.account = account
+
+        self.account_name = self.config["kt_cloud"]["account_name"]
+        self.api_key = self.config["kt_cloud"]["api_key"]
+        self.secret_key = self.config["kt_cloud"]["secret_key"]
+        self.g_platform_api = self.create_g_platform_api(self.config)  # 공유 커넥션 풀 사용
+        self.async_api = AsyncGPlatformApi(g_platform_api=self.g_platform_api)
+        self.submitter = get_submitter(self.api_key, self.config)  # 계정별 API 호출 속도 제한
+        self.g_platform_api.on_throttle = self.submitter.bucket.backoff  # 속도 제한 응답을 받으면 호출 속도를 줄임
+        self.job_tracker = JobTracker.from_config(self.config, self.async_api, self.submitter)
+        self.inventory = inventory_from_config(self.g_platform_api, self.config)
+        self.ledger = get_ledger()  # job 기록
+        self.run_id = None
+        self.today = None
+        self.leases = None  # 여러 worker가 나눠 처리하는 경우 제출 단위 lease
+        self.resource_sizes = {}  # 디스크 또는 스냅샷 아이디 -> 디스크 크기 (소요 시간 예측용)
+
+        self.disk_list_path = (account or {}).get("disk_list", disk_snapshot_list)  # 계정별 디스크 리스트
+
+    def run(self, today) -> bool:
+        """
+        계획한 대상을 모두 제출하고 완료까지 확인 (sharding 설정 시 다른 worker와 제출 단위로 나눠 처리)
+
+        :param today: 실행 날짜 (YYYY-MM-DD)
+
+        :return: 실행했으면 True, 오늘 실행이 이미 끝났으면 False
+        """
+        started = time.monotonic()
+
+        plan = self.plan(today)
+        if plan is None:
+            return False
+
+        with self.leases:
+            asyncio.run(self.run_all(*plan))
+
+        RUN_DURATION.set(time.monotonic() - started, operation=self.OPERATION)
+        RUN_LAST_SUCCESS.set(time.time(), operation=self.OPERATION)
+
+        return True
+
+    def plan(self, today):
+        """
+        제출할 대상을 정하고 실행 기록 시작
+
+        :param today: 실행 날짜 (YYYY-MM-DD)
+
+        :return targets: 새로 제출할 대상 리스트 (형태는 Manager마다 다름, select 참고)
+        :return resumed: 이어서 완료까지 확인할 이전 job (job 아이디, 이름, 디스크 또는 스냅샷 아이디) 튜플 리스트
+                         (오늘 실행이 이미 끝났으면 None 반환)
+        """
+        self.today = today
+
+        # 오늘 멈춘 실행이 있으면 이어서 기록 (이전 실행의 job 기록은 그대로 남김)
+        run = self.ledger.unfinished_run(self.account_name, self.OPERATION, today)
+
+        # 오늘 이미 제출한 job은 다시 제출하지 않음
+        # e.g. previous_jobs = {"disk_id1": <jobs row>}
+        previous_jobs = self.ledger.resource_jobs(self.account_name, self.OPERATION, today)
+
+        targets, resumed, done = self.select(today, previous_jobs)
+
+        if done or resumed:
+            _LOGGER.info(f"이전 실행 이어서 진행 - 이미 완료: {done}, 진행 중 job 확인: {len(resumed)}, "
+                         f"새로 {self.OPERATION_NAME}: {len(targets)}")
+
+        if run is None and done and not (targets or resumed):
+            _LOGGER.info(f"==={today} 스냅샷 {self.OPERATION_NAME} 작업은 이미 완료되었습니다===")
+            return None
+
+        # 새 실행 기록 시작
+        self.run_id = run["id"] if run else self.ledger.start_run(self.account_name, self.OPERATION)
+        self.leases = LeaseManager.from_config(self.config, f"{self.account_name}/{self.OPERATION}/{today}")
+
+        return targets, resumed
+
+    def select(self, today, previous_jobs) -> (list, list, int):
+        """
+        제출할 대상 선택
+
+        :param today: 실행 날짜 (YYYY-MM-DD)
+        :param previous_jobs: 디스크 또는 스냅샷 아이디 -> 오늘 제출한 마지막 job 기록
+
+        :return targets: 새로 제출할 대상 리스트
+        :return resumed: 진행 중으로 남은 이전 job (job 아이디, 이름, 디스크 또는 스냅샷 아이디) 튜플 리스트
+        :return done: 오늘 이미 끝난 대상 수
+        """
+        raise NotImplementedError
+
+    def unit_key(self, target) -> str:
+        """ 대상이 속한 제출 단위의 lease key (e.g. 서버 이름, 스냅샷 아이디) """
+        raise NotImplementedError
+
+    def resource_id(self, target) -> str:
+        """ 대상의 디스크 또는 스냅샷 아이디 (job 기록, 소요 시간 예측 key) """
+        raise NotImplementedError
+
+    def load_resource_sizes(self) -> dict:
+        """ 디스크 또는 스냅샷 아이디 -> 디스크 크기 """
+        raise NotImplementedError
+
+    async def submit(self, key, unit, lease, expected=None) -> Submitted:
+        """
+        제출 단위 하나의 API 호출 후 job 기록 (잡은 job 자리는 track에서 모든 job이 끝난 뒤 반환)
+
+        :param key: lease key
+        :param unit: 제출 단위에 속한 대상 리스트
+        :param lease: LeaseManager.claim 결과
+        :param expected: 디스크 또는 스냅샷 아이디 -> 예상 소요 시간(초), None이면 상태 확인을 미루지 않음
+
+        :return submitted: 완료까지 확인할 job
+        """
+        raise NotImplementedError
+
+    def on_success(self, job, resource_id) -> None:
+        """ 성공한 job 결과를 인벤토리 캐시에 반영 """
+        raise NotImplementedError
+
+    def order(self, targets) -> (list, dict, bool):
+        """
+        대상을 제출 단위로 묶고, 지난 job 소요 시간과 디스크 크기로 예측하여 오래 걸리는 단위부터 정렬
+
+        :param targets: plan이 반환한 대상 리스트
+
+        :return ordered: (lease key, 대상 리스트) 튜플 리스트
+        :return expected: 디스크 또는 스냅샷 아이디 -> 예상 소요 시간(초)
+        :return has_history: 기록으로 예측했는지 여부 (기본값으로 예측한 경우에는 상태 확인을 미루지 않음)
+        """
+        units = {}
+        for target in targets:
+            units.setdefault(self.unit_key(target), []).append(target)
+
+        model = DurationModel.from_ledger(self.ledger, self.OPERATION, self.config)
+        if units:
+            self.resource_sizes = self.load_resource_sizes()
+
+        expected = {}
+        for target in targets:
+            resource_id = self.resource_id(target)
+            expected[resource_id] = model.predict(resource_id, self.resource_sizes.get(resource_id))
+
+        ordered = sorted(units.items(), key=lambda item: max(expected[self.resource_id(target)]
+                                                              for target in item[1]), reverse=True)
+
+        return ordered, expected, model.has_history
+
+    async def run_all(self, targets, resumed=()) -> None:
+        """
+        속도 제한 안에서 제출 단위마다 API 동시 호출 후 완료까지 확인
+
+        :param targets: plan이 반환한 대상 리스트
+        :param resumed: 이어서 완료까지 확인할 이전 job 튜플 리스트
+        """
+        # 지난 job 소요 시간으로 소요 시간 예측 후 오래 걸리는 단위부터 제출
+        ordered, expected, has_history = self.order(targets)
+        units = dict(ordered)
+
+        # 백업 창 안에 끝낼 수 있는 가장 적은 동시 job 수로 제출
+        durations = [expected[self.resource_id(target)] for _, unit in ordered for target in unit]
+        window = backup_window(self.config, self.OPERATION)
+        slots, estimate = plan_slots(durations, self.submitter.max_jobs, window)
+        log_plan(self.OPERATION, len(durations), slots, estimate, window)
+
+        run_slots = JobSlots(slots)
+        tasks = [asyncio.ensure_future(self._resume_one(*job)) for job in resumed]
+        skipped = []  # 다른 worker가 가져간 lease key
+
+        for key, unit in ordered:
+            count = min(len(unit), slots)
+            await run_slots.acquire(count)
+
+            # 제출 직전에 lease를 가져와 빨리 끝낸 worker가 다음 단위를 더 가져가도록 함
+            lease = self.leases.claim(key)
+            if lease is None:  # 다른 worker가 처리 중이거나 이미 끝낸 단위
+                run_slots.release(count)
+                skipped.append(key)
+                continue
+
+            # 기록이 없어 기본값으로 예측한 경우에는 상태 확인을 미루지 않음
+            task = asyncio.ensure_future(self._run_unit(key, unit, lease, expected if has_history else None))
+            task.add_done_callback(lambda _, count=count: run_slots.release(count))
+            tasks.append(task)
+
+        job_list = [job for result in await asyncio.gather(*tasks) for job in result]
+
+        async def take_over(key, lease):
+            async with run_slots.hold(min(len(units[key]), slots)):
+                return await self._run_unit(key, units[key], lease)
+
+        # 멈춘 worker가 남긴 단위는 lease가 만료되면 가져와서 처리
+        job_list.extend(await self.leases.sweep(skipped, take_over))
+
+        self.finish(job_list)
+
+    def finish(self, job_list) -> None:
+        """
+        실행 기록 종료, 인벤토리 캐시 저장 후 결과 로그
+
+        :param job_list: JobTracker.track 결과 리스트 (None은 API 호출에 실패한 대상)
+        """
+        self.inventory.save()
+        self.ledger.finish_run(self.run_id)
+
+        success, fail, processing = JobTracker.summarize(job_list)
+        _LOGGER.info(f"스냅샷 {self.OPERATION_NAME} 결과 - 성공: {success}, 실패: {fail}, 진행 중: {processing}, "
+                     f"전체: {len(job_list)}")
+        notify_failures(self.config, f"[{self.account_name}] {self.today} 스냅샷 {self.OPERATION_NAME}", job_list)
+
+    async def track(self, submitted: Submitted) -> list:
+        """
+        submit, resume으로 제출한 job 모두 완료까지 확인 후 job 자리 반환, lease에 완료 기록
+
+        :return job_list: job마다 JobTracker.track 결과, API 호출에 실패한 대상은 None
+        """
+        try:
+            job_list = await asyncio.gather(*(self._track(*job) for job in submitted.jobs))
+        finally:
+            self.submitter.job_slots.release(submitted.slots)
+
+        if submitted.key is not None:
+            await self.leases.complete(submitted.key)
+
+        return list(job_list) + [None] * submitted.failed
+
+    async def resume(self, job_id, name, resource_id=None, key=None) -> Submitted:
+        """
+        이미 제출된 job을 다시 제출하지 않고 현재 실행으로 옮김 (job 자리 하나를 차지)
+
+        :param job_id: job 아이디
+        :param name: 디스크 또는 스냅샷 이름
+        :param resource_id: 디스크 또는 스냅샷 아이디
+        :param key: 다른 worker에게서 가져온 lease key, 이전 실행에서 이어받은 job이면 None
+
+        :return submitted: 완료까지 확인할 job
+        """
+        submitted_at = self.adopt(job_id, name, resource_id)
+        await self.submitter.job_slots.acquire()
+
+        return Submitted(key, 1, ((job_id, name, resource_id, None, submitted_at),), 0)
+
+    def adopt(self, job_id, name, resource_id=None):
+        """
+        이전 job을 현재 실행으로 옮김, 다른 worker가 제출한 job이면 현재 실행의 job으로 기록
+
+        :return submitted_at: 기록된 제출 시각 (datetime), 기록에 없던 job이면 지금, 기록하지 못하면 None
+        """
+        try:
+            return self.ledger.adopt_job(job_id, self.run_id) or self.record_job(job_id, name, resource_id)
+        except Exception as e:  # 기록하지 못해도 이미 제출된 job이므로 완료까지 확인
+            _LOGGER.error(f"{name} 스냅샷 {self.OPERATION_NAME} job({job_id}) 기록 중 오류 발생 \n {e!r}")
+            return None
+
+    def record_job(self, job_id, name, resource_id, submitted_at=None) -> datetime:
+        """
+        제출한 job을 현재 실행의 job으로 기록
+
+        :param submitted_at: API 응답을 받은 시각, None이면 지금
+
+        :return submitted_at: 기록한 제출 시각
+        """
+        submitted_at = submitted_at or datetime.now()
+        self.ledger.add_job(self.run_id, job_id, name, self.OPERATION, resource_id,
+                            self.resource_sizes.get(resource_id), submitted_at)
+
+        return submitted_at
+
+    async def _run_unit(self, key, unit, lease, expected=None) -> list:
+        """
+        lease를 가져온 제출 단위를 제출 후 모든 job 완료까지 확인
+
+        :return job_list: job마다 JobTracker.track 결과
+        """
+        return await self.track(await self.submit(key, unit, lease, expected))
+
+    async def _resume_one(self, job_id, name, resource_id=None) -> list:
+        """
+        이전 실행에서 진행 중으로 남은 job을 완료까지 확인
+
+        :return job_list: JobTracker.track 결과 하나를 담은 리스트
+        """
+        return await self.track(await self.resume(job_id, name, resource_id))
+
+    async def _track(self, job_id, name, resource_id, expected=None, submitted_at=None) -> dict:
+        """
+        job 완료까지 확인 후 기록, 성공하면 인벤토리 캐시에 반영
+
+        :return job: JobTracker.track 결과
+        """
+        job = await self.job_tracker.track(job_id, name, self.OPERATION, expected, submitted_at)
+        self.ledger.update_job(job_id, job["status"], job["completed_at"], job["error_text"])
+
+        if job["status"] == JOB_SUCCESS:
+            self.on_success(job, resource_id)
+
+        return job
@@ -0,0 +1,76 @@
+"""
+리스트 API 응답 스트리밍 파싱
+===
+
+응답 본문 전체를 dict로 만들지 않고, 조각(chunk) 단위로 읽으면서 리스트 원소를 하나씩 레코드로 변환합니다.
+
+- 메모리에는 읽고 있는 조각과 원소 하나의 dict만 올라가고, 변환한 레코드(Volume, Snapshot)만 남습니다.
+- 리스트 key를 찾지 못하면 응답이 작은 경우(빈 리스트, 오류 응답)이므로 전체를 한 번에 파싱합니다.
+"""
+
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r"[\s,]*")
+_COUNT = re.compile(r'"count"\s*:\s*(\d+)')
+_DECODER = json.JSONDecoder()
+
+
+def iter_records(chunks, response_key, item_key, to_record, meta=None):
+    """
+    리스트 API 응답 조각에서 item_key 리스트의 원소를 레코드로 변환하는 generator
+
+    :param chunks: 응답 본문 조각 (bytes) iterator (e.g. Response.iter_content)
+    :param response_key: 응답 최상위 key (e.g. listsnapshotsresponse)
+    :param item_key: 리스트가 담긴 key (e.g. snapshot)
+    :param to_record: 리스트 원소(dict)를 레코드로 변환하는 함수
+    :param meta: dict를 넘기면 응답의 전체 개수(count)를 meta["count"]에 기록 (리스트보다 앞에 있는 경우만)
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = iter(chunks)
+    start = re.compile(rf'"{re.escape(item_key)}"\s*:\s*\[')
+
+    # 리스트 시작 위치 찾기 (앞부분은 count 정도라 작음)
+    buffer = ""
+    for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        match = start.search(buffer)
+        if match:
+            break
+    else:
+        buffer += decoder.decode(b"", final=True)
+        body = json.loads(buffer)[response_key]
+        if meta is not None and "count" in body:
+            meta["count"] = int(body["count"])
+        yield from map(to_record, body.get(item_key, []))
+        return
+
+    count = _COUNT.search(buffer, 0, match.start())
+    if meta is not None and count:
+        meta["count"] = int(count.group(1))
+
+    buffer, pos, eof = buffer[match.end():], 0, False
+
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+
+        try:
+            if pos >= len(buffer):
+                raise json.JSONDecodeError("리스트 API 응답이 중간에 끊겼습니다.", buffer, pos)
+            item, pos = _DECODER.raw_decode(buffer, pos)
+
+        except json.JSONDecodeError:  # 원소가 다음 조각까지 이어짐
+            if eof:
+                raise
+
+            chunk = next(chunks, None)
+            eof = chunk is None
+            buffer = buffer[pos:] + decoder.decode(chunk or b"", final=eof)
+            pos = 0
+            continue
+
+        yield to_record(item)
@@ -1,36 +1,48 @@
 """
 텔레그램 전송
 """
-import os
+import asyncio
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
-import requests
-import yaml
+from requests import RequestException
 
-from src.common.config import CONFIG_PATH
-from src.manager.api import GPlatformApi
+from src.common.config import CONFIG_PATH, DISK_LIST_PATH, REPORT_WORKERS, REPORT_TIMEOUT
 from src.common.base import BaseManager
+from src.common.settings import load_config
+from src.manager.api import AsyncGPlatformApi
+from src.manager.inventory import inventory_from_config
+from src.manager.job_tracker import JOB_PROCESSING, JOB_SUCCESS, JOB_FAIL
+from src.manager.ledger import get_ledger
+from src.manager.notifier import notify
+from src.manager.retention import SnapshotIndex, parse_days
 
 logging.basicConfig(level=logging.INFO, format="[%(asctime)s] [%(levelname)s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
 _LOGGER = logging.getLogger(__name__)
 
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-
 
 class TelegramManager(BaseManager):
-    def __init__(self, config_file=CONFIG_PATH, **arg):
+    def __init__(self, config_file=CONFIG_PATH, disk_snapshot_list=DISK_LIST_PATH, account=None, **arg):
         super().__init__()
-        self.config = self.load_file(config_file, yaml.safe_load)  # 설정 파일 로드
-
-        self.bot_token = self.config["telegram"]["bot_token"]
-        self.chat_id = self.config["telegram"]["chat_id"]
+        self.config = load_config(config_file)  # 설정 파일 로드 (바뀌었을 때만 다시 읽음)
+        self.config = self.apply_account(self.config, account)  # 여러 계정 중 하나를 실행하는 경우
+        self.account = account
 
         self.account_name = self.config["kt_cloud"]["account_name"]
         self.api_key = self.config["kt_cloud"]["api_key"]
         self.secret_key = self.config["kt_cloud"]["secret_key"]
-        self.g_platform_api = GPlatformApi(api_key=self.api_key, secret_key=self.secret_key)
+        self.g_platform_api = self.create_g_platform_api(self.config)  # 공유 커넥션 풀 사용
+        self.inventory = inventory_from_config(self.g_platform_api, self.config)
+
+        self.ledger = get_ledger()  # job 기록
+
+        report = self.config.get("report") or {}
+        self.async_api = AsyncGPlatformApi(g_platform_api=self.g_platform_api,
+                                           max_concurrency=int(report.get("workers", REPORT_WORKERS)),
+                                           call_timeout=float(report.get("timeout", REPORT_TIMEOUT)))
+
+        self.disk_list_path = (account or {}).get("disk_list", disk_snapshot_list)  # 계정별 디스크 리스트
 
     def telegram(self) -> None:
         """
@@ -41,81 +53,143 @@ class TelegramManager(BaseManager):
 
         _LOGGER.info("===텔레그램 메세지 전송 시작===")
 
-        create_success, create_total, create_processing = self.count_success_job("create_job_list")  # 스냅샷 생성
-        delete_success, delete_total, delete_processing = self.count_success_job("delete_job_list")
+        create_success, create_total, create_processing = self.count_success_job("create")  # 스냅샷 생성
+        delete_success, delete_total, delete_processing = self.count_success_job("delete")
+        backed_up, disk_total = self.count_recent_snapshot()  # 인벤토리와 디스크 리스트 대조
         today = datetime.now().strftime("%Y-%m-%d")
 
         message = (f"[{self.account_name}] {today} 스냅샷 백업 동작 결과\n"
                    f"생성 수량 비교 : {create_success} / {create_total} \n"
                    f"삭제 수량 비교 : {delete_success} / {delete_total} \n"
+                   f"최근 스냅샷 보유 디스크 : {backed_up} / {disk_total} \n"
                    f"** 생성 진행 중({create_processing}), 삭제 진행 중({delete_processing})"
                    )
 
         self.send_message(message)
 
-    def count_success_job(self, file_name) -> (int, int):
+    def count_success_job(self, operation) -> (int, int, int):
         """
-        job_file을 토대로 job이 얼마나 성공했는지 확인
-        
-        :param file_name: job file 경로
-         
+        job 기록을 토대로 가장 최근 실행의 job이 얼마나 성공했는지 확인
+
+        이미 끝난 job은 기록된 상태를 그대로 사용하고, 진행 중으로 남은 job만 API로 동시에 다시 확인합니다.
+
+        :param operation: create 또는 delete
+
         :return success: job 성공 횟수
-        :return len(job_ld_list): 총 job 개수  
+        :return len(job_status): 총 job 개수
+        :return processing: 진행 중인 job 개수
         """
 
-        success = 0
-        processing = 0
+        run = self.ledger.latest_run(self.account_name, operation)
+        if run is None:
+            return 0, 0, 0
 
-        job_file_path = os.path.join(CURRENT_DIR, "result", file_name)  # ./result/{file_name}
+        # 디스크 또는 스냅샷마다 가장 최근 job만 집계 (실패 후 이어서 실행하며 다시 제출한 job은 한 번만 셈)
+        latest = {}
+        for job in self.ledger.run_jobs(run["id"]):
+            latest[job["resource_id"] or job["job_id"]] = job
 
-        with open(job_file_path, 'r') as f:
-            job_list = [line.strip() for line in f]
+        # job 아이디 -> 상태
+        job_status = {}
+        pending = {}  # 진행 중으로 남은 job 아이디 -> 디스크 또는 스냅샷 이름
+        for job in latest.values():
+            job_status[job["job_id"]] = job["status"]
+            if job["status"] == JOB_PROCESSING:
+                pending[job["job_id"]] = job["resource"]
 
-        for job in job_list:
-            job_id = job.split(",")[0].strip()
-            name = job.split(",")[1].strip()
+        if pending:
+            job_status.update(asyncio.run(self._check_jobs(pending)))
 
-            res = self.g_platform_api.check_job(job_id)
-            job_status = res.get("queryasyncjobresultresponse", {}).get("jobstatus", 2)
+        success = sum(1 for status in job_status.values() if status == JOB_SUCCESS)
+        processing = sum(1 for status in job_status.values() if status == JOB_PROCESSING)
 
-            if job_status == 1:
-                success += 1
-            elif job_status == 0:
-                processing += 1
-            else:
-                error_text = res.get("queryasyncjobresultresponse", {}).get("jobresult", {}).get("errortext", None)
-                command = res.get("queryasyncjobresultresponse", {}).get("cmd", "").split(".")[-1]  # 스냅샷 생성, 삭제 command 확인
+        return success, len(job_status), processing
+
+    async def _check_jobs(self, pending) -> dict:
+        """
+        진행 중인 job 상태를 제한된 동시 호출 수 안에서 확인
+
+        :param pending: job 아이디 -> 디스크 또는 스냅샷 이름 딕셔너리
+
+        :return: job 아이디 -> 상태 딕셔너리, 확인하지 못한 job은 진행 중
+        """
+        job_ids = list(pending)
+        status_list = await asyncio.gather(*(self._check_job(job_id, pending[job_id]) for job_id in job_ids),
+                                           return_exceptions=True)
+
+        job_status = {}
+        for job_id, status in zip(job_ids, status_list):
+            if isinstance(status, Exception):
+                _LOGGER.warning(f"job 상태 확인 실패 - job_id: {job_id}, 이름: {pending[job_id]}, 오류: {status!r}")
+                status = JOB_PROCESSING
+            job_status[job_id] = status
+
+        return job_status
 
-                _LOGGER.error(f"스냅샷 API 실패 - 명령어: {command}, 디스크 또는 스냅샷 이름: {name}, 에러 메세지: {error_text}")
+    async def _check_job(self, job_id, name) -> int:
+        """
+        job 하나의 상태 확인 후 끝난 job은 기록 갱신
+
+        :return job_status: 0(진행 중), 1(성공), 2(실패), 응답이 없으면 진행 중으로 처리
+        """
+        try:
+            res = await self.async_api.check_job(job_id)
+        except (asyncio.TimeoutError, RequestException) as e:  # 연결 실패, timeout 포함
+            _LOGGER.warning(f"job 상태 확인 실패 - job_id: {job_id}, 이름: {name}, 오류: {e!r}")
+            return JOB_PROCESSING
+
+        result = res.get("queryasyncjobresultresponse", {})
+        job_status = result.get("jobstatus", JOB_FAIL)
+
+        if job_status != JOB_PROCESSING:
+            error_text = result.get("jobresult", {}).get("errortext", None)
+            self.ledger.update_job(job_id, job_status, datetime.now(), error_text)
+
+            if job_status != JOB_SUCCESS:
+                command = result.get("cmd", "").split(".")[-1]  # 스냅샷 생성, 삭제 command 확인
+                _LOGGER.error(f"스냅샷 API 실패 - 명령어: {command}, 디스크 또는 스냅샷 이름: {name}, "
+                              f"에러 메세지: {error_text}")
+
+        return job_status
+
+    def count_recent_snapshot(self) -> (int, int):
+        """
+        디스크 리스트의 디스크 중 최근 생성 주기(time.cycle) 안에 만든 스냅샷이 있는 디스크 수 확인
+
+        :return backed_up: 최근 스냅샷이 있는 디스크 수
+        :return len(disk_list): 스냅샷 대상 디스크 수
+        """
+        disk_list = self.read_disk_list()
+
+        try:
+            snapshot_index = SnapshotIndex(disk_list)
+            for snapshot in self.inventory.snapshots():
+                snapshot_index.add(snapshot)
+
+            since = datetime.now().date() - timedelta(days=parse_days(self.config["time"]["cycle"]))
+
+        except Exception as e:
+            _LOGGER.error(f"인벤토리 대조 중 오류 발생: {e}")
+            return 0, len(disk_list)
+
+        backed_up = 0
+        for disk in disk_list:
+            dates = [date for date, _ in snapshot_index.index.get(disk, [])]
+            if dates and max(dates) >= since:
+                backed_up += 1
+            else:
+                _LOGGER.warning(f"최근 스냅샷이 없는 디스크: {disk[0]}({disk[1]})")
 
-        return success, len(job_list), processing
+        return backed_up, len(disk_list)
 
     def send_message(self, message) -> None:
         """
-        텔레그램 메세지 전송
+        텔레그램 메세지를 알림 큐에 넣음 (백그라운드 스레드가 다른 리포트와 합쳐 전송하며, 전송을 기다리지 않음)
         
         :param message: 보낼 메세지 내용
         
         :return: X 
         """
 
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-        headers = {
-            'User-Agent': 'Telegram Bot SDK - (https://github.com/irazasyed/telegram-bot-sdk)',
-            'accept': 'application/json',
-            'content-type': 'application/json'
-        }
-        data = {
-            "chat_id": self.chat_id,
-            "text": message,
-            "disable_web_page_preview": False,
-            "disable_notification": False,
-            "reply_to_message_id": None
-        }
-
-        res = requests.post(url, headers=headers, json=data)
-
-        if res.status_code == 200:
-            _LOGGER.info("===텔레그램 메세지 전송 성공===")
-        else:
-            _LOGGER.error(f"텔레그램 메세지 전송 실패 (status code: {res.status_code}")
+        if notify(self.config, message):
+            _LOGGER.info("===텔레그램 메세지 전송 요청===")
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import uuid
+
+import pytest
+import yaml
+
+# src 모듈이 import 시점에 결과 디렉토리를 정하므로 import 전에 테스트용 디렉토리로 지정
+os.environ.setdefault("SNAPSHOT_RESULT_DIR", tempfile.mkdtemp(prefix="snapshot-test-"))
+
+from bench.fake_api import FakeGPlatformServer  # noqa: E402
+
+DISK_COUNT = 6
+SNAPSHOT_DAYS = 3
+KEEP_DAYS = 2
+
+
+def write_config(path, server, account_name, **extra) -> str:
+    """
+    fake 서버를 가리키는 config.yml 작성
+
+    :param path: 작성할 디렉토리
+    :param server: FakeGPlatformServer
+    :param account_name: 계정 이름 (테스트마다 달라야 job 기록이 섞이지 않음)
+    :param extra: 덮어쓸 최상위 항목
+
+    :return: config 파일 경로
+    """
+    config = {
+        "kt_cloud": {"account_name": account_name, "api_key": server.api_key, "secret_key": server.secret_key,
+                     "endpoint": server.endpoint},
+        "telegram": {"bot_token": "test", "chat_id": "test", "api_url": server.base_url},
+        "time": {"start_date": "2024-01-01", "cycle": "1d", "del_cycle": f"{KEEP_DAYS}d",
+                 "create_time": "01:00", "delete_time": "02:00"},
+        "http": {"pool_size": 4, "timeout": [5, 10]},
+        "rate_limit": {"rate": 1000, "burst": 100, "max_jobs": 8},
+        "job_tracker": {"poll_interval": 0.05, "max_poll_interval": 0.1},
+        "report": {"workers": 4},
+    }
+    config.update(extra)
+
+    config_path = os.path.join(path, "config.yml")
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f)
+
+    return config_path
+
+
+def write_disk_list(path, volumes) -> str:
+    """
+    "디스크 이름, 서버 이름" 형식의 disk_list 작성
+
+    :return: disk_list 파일 경로
+    """
+    disk_list_path = os.path.join(path, "disk_list")
+    with open(disk_list_path, "w") as f:
+        for volume in volumes:
+            f.write(f"{volume['name']}, {volume['vmdisplayname']}\n")
+
+    return disk_list_path
+
+
+@pytest.fixture
+def fake_server():
+    """ 디스크마다 지난 SNAPSHOT_DAYS일치 스냅샷이 있는 fake G-Platform 서버 (테스트마다 API 키가 다름) """
+    server = FakeGPlatformServer(api_key=f"test-{uuid.uuid4().hex}", secret_key="test-secret",
+                                 disk_count=DISK_COUNT, snapshot_days=SNAPSHOT_DAYS, job_duration=(0.02, 0.1)).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def config_files(tmp_path, fake_server):
+    """ fake 서버용 (config 파일 경로, disk_list 파일 경로) """
+    account_name = f"test-{uuid.uuid4().hex[:8]}"
+    return (write_config(str(tmp_path), fake_server, account_name),
+            write_disk_list(str(tmp_path), fake_server.volumes))
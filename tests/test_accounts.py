@@ -0,0 +1,46 @@
+import logging
+
+from src.common.base import BaseManager
+from src.common.settings import load_config
+from src.manager.create_snapshot import CreateSnapshotManager
+from tests.conftest import DISK_COUNT, write_config, write_disk_list
+
+
+def test_zones_share_account_disk_list_by_default():
+    config = {"accounts": [{"account_name": "a", "api_key": "k", "zones": ["z1", "z2"], "disk_list": "/disks"}]}
+
+    account_list = BaseManager.list_accounts(config)
+
+    assert [account["account_name"] for account in account_list] == ["a(z1)", "a(z2)"]
+    assert [account["disk_list"] for account in account_list] == ["/disks", "/disks"]
+
+
+def test_zone_disk_list_overrides_account_disk_list():
+    config = {"accounts": [{"account_name": "a", "api_key": "k", "disk_list": "/disks",
+                            "zones": [{"zone_id": "z1", "disk_list": "/disks-z1"}, "z2"]}]}
+
+    account_list = BaseManager.list_accounts(config)
+
+    assert [(account["zone_id"], account["disk_list"]) for account in account_list] == \
+           [("z1", "/disks-z1"), ("z2", "/disks")]
+    assert account_list[0]["account_name"] == "a(z1)"
+
+
+def test_zone_disk_lists_do_not_report_other_zone_disks(tmp_path, fake_server, caplog):
+    half = DISK_COUNT // 2
+    zones = []
+    for index, volumes in enumerate((fake_server.volumes[:half], fake_server.volumes[half:])):
+        zone_dir = tmp_path / f"zone{index}"
+        zone_dir.mkdir()
+        zones.append({"zone_id": f"zone{index}", "disk_list": write_disk_list(str(zone_dir), volumes)})
+
+    account = {"account_name": f"zones-{fake_server.api_key[-8:]}", "api_key": fake_server.api_key,
+               "secret_key": fake_server.secret_key, "endpoint": fake_server.endpoint, "zones": zones}
+    config_path = write_config(str(tmp_path), fake_server, "unused", accounts=[account])
+
+    with caplog.at_level(logging.ERROR):
+        for zone_account in BaseManager.list_accounts(load_config(config_path)):
+            CreateSnapshotManager(config_path, None, account=zone_account).create_snapshot()
+
+    assert fake_server.calls["createSnapshot"] == DISK_COUNT
+    assert "존재하지 않는 디스크" not in caplog.text
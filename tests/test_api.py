@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from bench.fake_api import FakeGPlatformServer
+from src.manager.api import AsyncGPlatformApi, GPlatformApi, get_session, session_pool_size
+
+
+class InFlight:
+    """ 동시에 실행 중인 블로킹 호출 수 기록 """
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.current = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+        time.sleep(self.duration)
+        with self.lock:
+            self.current -= 1
+        return "ok"
+
+
+def test_concurrency_is_capped_by_pool_size():
+    api = AsyncGPlatformApi(g_platform_api=SimpleNamespace(pool_size=3), max_concurrency=10)
+    assert api.max_concurrency == 3
+
+    assert AsyncGPlatformApi(g_platform_api=SimpleNamespace(pool_size=3)).max_concurrency == 3
+    assert AsyncGPlatformApi(g_platform_api=SimpleNamespace(pool_size=3), max_concurrency=2).max_concurrency == 2
+
+
+def test_shared_session_reports_its_pool_size():
+    session = get_session()
+    assert session_pool_size(session) >= 1
+    assert session_pool_size(object()) >= 1
+
+
+def test_timed_out_calls_keep_their_slot_until_the_thread_finishes():
+    api = AsyncGPlatformApi(g_platform_api=SimpleNamespace(pool_size=2), call_timeout=0.05)
+    in_flight = InFlight(0.3)
+
+    async def run():
+        return await asyncio.gather(*(api._call(in_flight) for _ in range(6)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert in_flight.peak == 2
+    assert in_flight.current == 0  # asyncio.run은 남은 스레드가 끝날 때까지 기다림
+
+
+def test_call_returns_result_within_timeout():
+    api = AsyncGPlatformApi(g_platform_api=SimpleNamespace(pool_size=2), call_timeout=5)
+    in_flight = InFlight(0.01)
+
+    async def run():
+        return await asyncio.gather(*(api._call(in_flight) for _ in range(5)))
+
+    assert asyncio.run(run()) == ["ok"] * 5
+    assert in_flight.peak <= 2
+
+
+def test_call_raises_error_from_thread():
+    api = AsyncGPlatformApi(g_platform_api=SimpleNamespace(pool_size=1))
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(api._call(fail))
+
+
+class NoCountServer(FakeGPlatformServer):
+    """ 리스트 응답에 count를 주지 않는 서버 """
+
+    def _listVolumes(self, params):
+        status, body = super()._listVolumes(params)
+        body["listvolumesresponse"].pop("count")
+        return status, body
+
+
+@pytest.fixture
+def list_server(request):
+    server_class, disk_count, page_cap = request.param
+    server = server_class(api_key="key", secret_key="secret", disk_count=disk_count, page_cap=page_cap).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("list_server, calls", [
+    ((FakeGPlatformServer, 10, 3), 4),  # 3, 3, 3, 1 (count로 끝을 앎)
+    ((FakeGPlatformServer, 9, 3), 3),
+    ((FakeGPlatformServer, 10, None), 2),  # 요청한 pagesize 그대로
+    ((NoCountServer, 10, 3), 4),  # 마지막 페이지가 앞 페이지보다 작음
+    ((NoCountServer, 9, 3), 4),  # 빈 페이지를 받아야 끝을 앎
+    ((NoCountServer, 0, 3), 1),
+], indirect=["list_server"])
+def test_pages_until_all_records_when_server_caps_page_size(list_server, calls):
+    api = GPlatformApi("key", "secret", endpoint=list_server.endpoint)
+
+    volumes = list(api.iter_disk(page_size=5))
+
+    assert [volume.name for volume in volumes] == [volume["name"] for volume in list_server.volumes]
+    assert list_server.calls["listVolumes"] == calls
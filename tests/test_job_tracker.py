@@ -0,0 +1,77 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from src.common.metrics import JOB_DURATION
+from src.manager.create_snapshot import CreateSnapshotManager
+from src.manager.job_tracker import JobTracker, JOB_FAIL, JOB_SUCCESS
+from src.manager.ledger import JobLedger
+from tests.test_retry import connection_refused, http_error
+
+DONE = {"queryasyncjobresultresponse": {"jobstatus": JOB_SUCCESS, "jobresult": {}}}
+
+
+class FakeAsyncApi:
+    """ 정해둔 응답(또는 예외)을 순서대로 돌려주는 job 상태 확인 API """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def check_job(self, job_id):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_tracker(*results) -> JobTracker:
+    return JobTracker(FakeAsyncApi(*results), poll_interval=0.01, max_poll_interval=0.01, timeout=5)
+
+
+def test_duration_counts_from_submit_time(monkeypatch):
+    tracker = make_tracker(DONE)
+    submitted_at = datetime.now() - timedelta(seconds=30)
+    observed = []
+    monkeypatch.setattr(JOB_DURATION, "observe", lambda value, **labels: observed.append(value))
+
+    job = asyncio.run(tracker.track("job-1", "disk1", "create", submitted_at=submitted_at))
+
+    assert job["status"] == JOB_SUCCESS
+    assert job["submitted_at"] == submitted_at
+    assert observed and observed[0] >= 30
+
+
+def test_client_error_fails_fast():
+    tracker = make_tracker(http_error(404), DONE)
+
+    job = asyncio.run(tracker.track("job-1", "disk1"))
+
+    assert job["status"] == JOB_FAIL
+    assert job["completed_at"] is None
+    assert "404" in job["error_text"]
+    assert tracker.async_api.calls == 1
+
+
+def test_transient_error_polls_again():
+    tracker = make_tracker(http_error(503), connection_refused(), DONE)
+
+    job = asyncio.run(tracker.track("job-1", "disk1"))
+
+    assert job["status"] == JOB_SUCCESS
+    assert tracker.async_api.calls == 3
+
+
+def test_adopt_keeps_recorded_submit_time(tmp_path):
+    ledger = JobLedger(tmp_path / "ledger.db")
+    submitted_at = datetime.now() - timedelta(minutes=5)
+    ledger.add_job(ledger.start_run("acct", "create"), "job-1", "disk1", "create", "vol-1", submitted_at=submitted_at)
+
+    manager = CreateSnapshotManager.__new__(CreateSnapshotManager)
+    manager.ledger, manager.run_id, manager.resource_sizes = ledger, ledger.start_run("acct", "create"), {}
+
+    assert manager.adopt("job-1", "disk1", "vol-1") == submitted_at
+    assert ledger.run_jobs(manager.run_id)[0]["job_id"] == "job-1"
+
+    # 기록에 없는 job (다른 worker가 제출)은 지금 시각으로 기록
+    assert manager.adopt("job-2", "disk2", "vol-2") >= datetime.now() - timedelta(seconds=5)
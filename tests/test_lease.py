@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.common.lease import LEASE_DONE, LEASE_HELD, LeaseManager
+
+SCOPE = "test/create/2024-10-21"
+
+
+@pytest.fixture
+def make_manager(tmp_path):
+    managers = []
+
+    def make(worker_id, ttl=60, max_wait=10):
+        manager = LeaseManager(SCOPE, lease_dir=str(tmp_path), worker_id=worker_id, ttl=ttl, max_wait=max_wait)
+        managers.append(manager)
+        return manager
+
+    yield make
+
+    for manager in managers:
+        manager.stop()
+
+
+def hold_lock(manager, key, seconds) -> threading.Event:
+    """ 다른 worker가 lease 파일을 쓰는 중인 것처럼 별도 스레드에서 잠금을 잡고 있음 """
+    locked = threading.Event()
+
+    def hold():
+        with manager._lock(key):
+            locked.set()
+            time.sleep(seconds)
+
+    threading.Thread(target=hold, daemon=True).start()
+    assert locked.wait(5)
+    return locked
+
+
+def test_disabled_manager_always_claims(tmp_path):
+    manager = LeaseManager(SCOPE, lease_dir=str(tmp_path), enabled=False)
+
+    assert manager.claim("server1").status == LEASE_HELD
+    assert manager.claim("server1") is not None
+    assert manager.read("server1") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_held_lease_is_not_claimed_by_other_worker(make_manager):
+    a, b = make_manager("a"), make_manager("b")
+
+    assert a.claim("server1") is not None
+    assert b.claim("server1") is None
+    assert a.claim("server1") is not None  # 같은 worker는 재시작 후 바로 다시 가져감
+
+
+def test_expired_lease_is_taken_over_with_jobs(make_manager):
+    a, b = make_manager("a", ttl=0.1), make_manager("b", ttl=0.1)
+
+    a.claim("server1")
+    asyncio.run(a.record("server1", "job-1", "disk1", "vol-1"))
+    time.sleep(0.15)
+
+    lease = b.claim("server1")
+    assert lease.worker == "b" and lease.taken_over
+    assert lease.jobs == (("job-1", "disk1", "vol-1"),)
+
+    # 가져간 뒤에는 이전 worker가 lease를 바꾸지 못함
+    asyncio.run(a.complete("server1"))
+    assert b.read("server1").status == LEASE_HELD
+
+
+def test_completed_lease_is_never_claimed_again(make_manager):
+    a, b = make_manager("a", ttl=0.1), make_manager("b", ttl=0.1)
+
+    a.claim("server1")
+    asyncio.run(a.complete("server1"))
+    time.sleep(0.15)
+
+    assert b.claim("server1") is None
+    assert a.claim("server1") is None
+    assert b.read("server1").status == LEASE_DONE
+
+
+def test_heartbeat_extends_held_lease(make_manager):
+    a, b = make_manager("a", ttl=0.3), make_manager("b", ttl=0.3)
+
+    with a:
+        first = a.claim("server1").expires_at
+        time.sleep(0.5)  # ttl이 지났지만 연장됨
+
+        assert a.read("server1").expires_at > first
+        assert b.claim("server1") is None
+
+    time.sleep(0.4)  # 연장이 멈추면 만료
+    assert b.claim("server1").taken_over
+
+
+def test_claim_does_not_wait_for_lock(make_manager):
+    a = make_manager("a")
+    hold_lock(a, "server1", 1)
+
+    started = time.monotonic()
+    assert a.claim("server1") is None
+    assert time.monotonic() - started < 0.5
+
+
+def test_sweep_takes_over_expired_leases(make_manager):
+    a, b = make_manager("a", ttl=0.2), make_manager("b", ttl=0.2)
+
+    a.claim("server1")
+    a.claim("server2")
+    asyncio.run(a.complete("server2"))
+
+    async def run(key, lease):
+        return [(key, lease.taken_over)]
+
+    assert asyncio.run(b.sweep(["server1", "server2"], run)) == [("server1", True)]
+    assert b.read("server1").worker == "b"
+
+
+def test_sweep_retries_key_skipped_for_lock_contention(make_manager):
+    a = make_manager("a")
+    hold_lock(a, "server1", 0.3)
+    assert a.claim("server1") is None
+
+    async def run(key, lease):
+        return [key]
+
+    assert asyncio.run(a.sweep(["server1"], run)) == ["server1"]
+
+
+def test_sweep_gives_up_after_max_wait(make_manager):
+    a, b = make_manager("a", ttl=60), make_manager("b", max_wait=0.2)
+    a.claim("server1")
+
+    async def run(key, lease):
+        return [key]
+
+    started = time.monotonic()
+    assert asyncio.run(b.sweep(["server1"], run)) == []
+    assert time.monotonic() - started < 2
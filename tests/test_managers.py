@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from src.manager.create_snapshot import CreateSnapshotManager
+from src.manager.delete_snapshot import DeleteSnapshotManager
+from src.manager.telegram import TelegramManager
+from tests.conftest import DISK_COUNT, KEEP_DAYS, SNAPSHOT_DAYS
+
+
+def snapshot_dates(server) -> dict:
+    """ 디스크 이름 -> fake 서버에 남아 있는 스냅샷 날짜 목록 """
+    dates = {volume["name"]: set() for volume in server.volumes}
+    for snapshot in server.snapshots.values():
+        dates[snapshot["volumename"]].add(snapshot["name"][len(snapshot["volumename"]) + 1:])
+
+    return dates
+
+
+def days_ago(days) -> str:
+    return (datetime.now().date() - timedelta(days=days)).isoformat()
+
+
+def test_create_makes_one_snapshot_per_disk(fake_server, config_files):
+    CreateSnapshotManager(*config_files).create_snapshot()
+
+    assert fake_server.calls["createSnapshot"] == DISK_COUNT
+    for dates in snapshot_dates(fake_server).values():
+        assert days_ago(0) in dates
+
+
+def test_create_twice_does_not_resubmit(fake_server, config_files):
+    CreateSnapshotManager(*config_files).create_snapshot()
+    CreateSnapshotManager(*config_files).create_snapshot()
+
+    assert fake_server.calls["createSnapshot"] == DISK_COUNT
+
+
+def test_delete_keeps_retention_window(fake_server, config_files):
+    CreateSnapshotManager(*config_files).create_snapshot()
+    DeleteSnapshotManager(*config_files).delete_snapshot()
+
+    assert fake_server.calls["deleteSnapshot"] == DISK_COUNT * (SNAPSHOT_DAYS + 1 - KEEP_DAYS)
+    for dates in snapshot_dates(fake_server).values():
+        assert dates == {days_ago(day) for day in range(KEEP_DAYS)}
+
+
+def test_report_counts(fake_server, config_files, monkeypatch):
+    CreateSnapshotManager(*config_files).create_snapshot()
+    DeleteSnapshotManager(*config_files).delete_snapshot()
+
+    messages = []
+    monkeypatch.setattr(TelegramManager, "send_message", lambda self, message: messages.append(message))
+    TelegramManager(*config_files).telegram()
+
+    deleted = DISK_COUNT * (SNAPSHOT_DAYS + 1 - KEEP_DAYS)
+    assert len(messages) == 1
+    assert f"생성 수량 비교 : {DISK_COUNT} / {DISK_COUNT}" in messages[0]
+    assert f"삭제 수량 비교 : {deleted} / {deleted}" in messages[0]
+    assert f"최근 스냅샷 보유 디스크 : {DISK_COUNT} / {DISK_COUNT}" in messages[0]
@@ -0,0 +1,34 @@
+import logging
+
+import pytest
+
+from src.manager.pacing import backup_window, parse_window, plan_slots
+
+
+@pytest.mark.parametrize("value, seconds", [
+    (None, None),
+    ("", None),
+    ("   ", None),
+    (90, 90),
+    ("30m", 30 * 60),
+    (" 4h ", 4 * 60 * 60),
+    ("1d", 24 * 60 * 60),
+])
+def test_parse_window(value, seconds):
+    assert parse_window(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["h", "4x", "xd"])
+def test_backup_window_logs_key_of_bad_value(value, caplog):
+    with caplog.at_level(logging.ERROR):
+        assert backup_window({"pacing": {"create_window": value}}, "create") is None
+
+    assert "pacing.create_window" in caplog.text
+
+
+def test_plan_slots_uses_fewest_slots_within_window():
+    durations = [60] * 8
+
+    assert plan_slots(durations, 8, None) == (8, 60)
+    assert plan_slots(durations, 8, 120) == (4, 120)
+    assert plan_slots(durations, 8, 30) == (8, 60)
@@ -0,0 +1,35 @@
+from src.manager.pipeline import SnapshotPipeline
+from src.manager.telegram import TelegramManager
+from tests.conftest import DISK_COUNT, KEEP_DAYS, SNAPSHOT_DAYS
+from tests.test_managers import days_ago, snapshot_dates
+
+
+def test_pipeline_creates_once_and_applies_retention(fake_server, config_files):
+    SnapshotPipeline(*config_files).run()
+
+    assert fake_server.calls["createSnapshot"] == DISK_COUNT
+    assert fake_server.calls["deleteSnapshot"] == DISK_COUNT * (SNAPSHOT_DAYS + 1 - KEEP_DAYS)
+    for dates in snapshot_dates(fake_server).values():
+        assert dates == {days_ago(day) for day in range(KEEP_DAYS)}
+
+
+def test_pipeline_rerun_submits_nothing(fake_server, config_files):
+    SnapshotPipeline(*config_files).run()
+    calls = dict(fake_server.calls)
+
+    SnapshotPipeline(*config_files).run()
+
+    assert fake_server.calls["createSnapshot"] == calls["createSnapshot"]
+    assert fake_server.calls["deleteSnapshot"] == calls["deleteSnapshot"]
+
+
+def test_pipeline_results_are_reported(fake_server, config_files, monkeypatch):
+    SnapshotPipeline(*config_files).run()
+
+    messages = []
+    monkeypatch.setattr(TelegramManager, "send_message", lambda self, message: messages.append(message))
+    TelegramManager(*config_files).telegram()
+
+    deleted = DISK_COUNT * (SNAPSHOT_DAYS + 1 - KEEP_DAYS)
+    assert f"생성 수량 비교 : {DISK_COUNT} / {DISK_COUNT}" in messages[0]
+    assert f"삭제 수량 비교 : {deleted} / {deleted}" in messages[0]
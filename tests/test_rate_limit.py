@@ -0,0 +1,93 @@
+import asyncio
+import logging
+import threading
+import time
+import uuid
+
+import pytest
+
+from src.common.rate_limit import JobSlots, get_submitter
+
+
+def test_waiter_wakes_on_release_from_another_thread():
+    slots = JobSlots(2)
+
+    async def main():
+        await slots.acquire(2)
+        threading.Timer(0.02, slots.release, args=(2,)).start()
+
+        started = time.monotonic()
+        await slots.acquire(2)
+        return time.monotonic() - started
+
+    assert asyncio.run(main()) < 0.5
+    assert slots.free == 0
+
+
+def test_waiters_across_event_loops_are_served_in_order():
+    slots = JobSlots(3)
+    order = []
+
+    async def wait(name, count):
+        await slots.acquire(count)
+        order.append(name)
+
+    async def hold_all():
+        await slots.acquire(3)
+
+    asyncio.run(hold_all())
+    big = threading.Thread(target=asyncio.run, args=(wait("big", 3),))
+    big.start()
+    while not slots._waiters:
+        time.sleep(0.01)
+
+    small = threading.Thread(target=asyncio.run, args=(wait("small", 1),))
+    small.start()
+    while len(slots._waiters) < 2:
+        time.sleep(0.01)
+
+    # 자리 하나로는 먼저 기다린 big(3자리)을 건너뛰어 small에게 주지 않음
+    slots.release(1)
+    time.sleep(0.05)
+    assert order == []
+
+    slots.release(2)
+    big.join(timeout=5)
+    assert order == ["big"]
+
+    slots.release(3)
+    small.join(timeout=5)
+    assert order == ["big", "small"]
+
+
+def test_cancelled_waiter_does_not_keep_slots():
+    slots = JobSlots(1)
+
+    async def main():
+        await slots.acquire()
+        waiter = asyncio.ensure_future(slots.acquire())
+        await asyncio.sleep(0.01)
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        slots.release()
+        await asyncio.wait_for(slots.acquire(), timeout=1)
+
+    asyncio.run(main())
+    assert slots.free == 0 and not slots._waiters
+
+
+def test_submitter_is_shared_and_warns_on_different_settings(caplog):
+    key = uuid.uuid4().hex
+    submitter = get_submitter(key, {"rate_limit": {"rate": 5, "max_jobs": 4}})
+
+    with caplog.at_level(logging.WARNING):
+        assert get_submitter(key, {"rate_limit": {"rate": 5, "max_jobs": 4}}) is submitter
+        assert not caplog.records
+
+        assert get_submitter(key, {"rate_limit": {"rate": 10, "max_jobs": 4}}) is submitter
+
+    assert "rate=10.0" in caplog.text
+    assert submitter.bucket.max_rate == 5 and submitter.max_jobs == 4
@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+import pytest
+
+from src.manager.model import Snapshot
+from src.manager.retention import RetentionPolicy, SnapshotIndex, parse_days, parse_snapshot_name
+
+TODAY = date(2024, 10, 21)  # 월요일
+
+
+def daily(days, today=TODAY) -> list:
+    """ 오늘부터 하루에 하나씩 최신순 (날짜, 스냅샷) 리스트 """
+    dates = [today - timedelta(days=day) for day in range(days)]
+    return [(d, Snapshot(f"snap-{d}", f"disk-{d}", "vol", None)) for d in dates]
+
+
+def kept(policy, snapshots) -> set:
+    deleted = {snapshot.id for snapshot in policy.select_delete(snapshots, TODAY)}
+    return {d for d, snapshot in snapshots if snapshot.id not in deleted}
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("disk1-2024-10-21", ("disk1", date(2024, 10, 21))),
+    ("disk-1-server-1-2024-10-21", ("disk-1-server-1", date(2024, 10, 21))),
+    ("before-upgrade", None),
+    ("disk1-2024-13-01", None),
+    ("disk12024-10-21", None),
+    ("2024-10-21", None),
+])
+def test_parse_snapshot_name(name, expected):
+    assert parse_snapshot_name(name) == expected
+
+
+def test_parse_days():
+    assert parse_days("13d") == 13
+    assert parse_days(" 7 ") == 7
+    with pytest.raises(ValueError):
+        parse_days("1w")
+
+
+def test_no_policy_keeps_everything():
+    assert RetentionPolicy().select_delete(daily(30), TODAY) == []
+
+
+def test_max_age():
+    assert kept(RetentionPolicy(max_age=2), daily(10)) == {TODAY, TODAY - timedelta(days=1)}
+
+
+def test_keep_last_counts_snapshots_not_days():
+    snapshots = daily(30)[::5]  # 5일에 하나씩
+    assert kept(RetentionPolicy(keep_last=3), snapshots) == {d for d, _ in snapshots[:3]}
+
+
+def test_keep_daily():
+    assert kept(RetentionPolicy(keep_daily=3), daily(10)) == {TODAY - timedelta(days=day) for day in range(3)}
+
+
+def test_keep_weekly_keeps_newest_of_each_week():
+    assert kept(RetentionPolicy(keep_weekly=3), daily(30)) == {date(2024, 10, 21), date(2024, 10, 20),
+                                                              date(2024, 10, 13)}
+
+
+def test_keep_monthly_keeps_newest_of_each_month():
+    assert kept(RetentionPolicy(keep_monthly=3), daily(90)) == {date(2024, 10, 21), date(2024, 9, 30),
+                                                               date(2024, 8, 31)}
+
+
+def test_gfs_keeps_union_of_rules():
+    policy = RetentionPolicy(keep_daily=2, keep_weekly=2, keep_monthly=2)
+    assert kept(policy, daily(90)) == {date(2024, 10, 21), date(2024, 10, 20), date(2024, 9, 30)}
+
+
+def test_from_config_falls_back_to_del_cycle():
+    policy = RetentionPolicy.from_config({"time": {"del_cycle": "13d"}})
+    assert policy.max_age == 13 and policy.keep_daily is None
+
+    with pytest.raises(ValueError):
+        RetentionPolicy.from_config({"time": {"del_cycle": "two weeks"}})
+
+
+def test_index_skips_snapshots_of_unknown_disks():
+    index = SnapshotIndex([("disk1", "server1")])
+
+    assert index.add(Snapshot("1", "disk1-2024-10-01", "vol", None))
+    assert not index.add(Snapshot("2", "before-upgrade-2024-10-01", "vol", None))
+    assert not index.add(Snapshot("3", "disk1-manual", "vol", None))
+
+    assert [snapshot.id for snapshot in index.expired(RetentionPolicy(max_age=7), TODAY)] == ["1"]
+
+
+def test_index_uses_server_name_for_duplicate_disk_names():
+    index = SnapshotIndex([("root", "server1"), ("root", "server2"), ("data", "server1")])
+
+    assert not index.add(Snapshot("1", "root-2024-10-01", "vol", None))  # 어느 서버의 디스크인지 알 수 없음
+    assert index.add(Snapshot("2", "root-server1-2024-10-01", "vol", None))
+    assert index.add(Snapshot("3", "root-server2-2024-10-20", "vol", None))
+    assert index.add(Snapshot("4", "data-2024-10-01", "vol", None))
+    assert index.add(Snapshot("5", "data-server1-2024-10-02", "vol", None))
+
+    assert set(index.index) == {("root", "server1"), ("root", "server2"), ("data", "server1")}
+    assert {snapshot.id for snapshot in index.expired(RetentionPolicy(max_age=7), TODAY)} == {"2", "4", "5"}
@@ -0,0 +1,207 @@
+import json
+import time
+import uuid
+
+import pytest
+import requests
+import urllib3
+
+from src.common.retry import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy, classify
+from src.manager.api import GPlatformApi
+
+SAFE = "listVolumes"
+UNSAFE = "createSnapshot"
+
+
+def response(status, body=None, headers=None) -> requests.Response:
+    res = requests.Response()
+    res.status_code = status
+    res._content = json.dumps(body or {}).encode()
+    res.headers.update(headers or {})
+    return res
+
+
+def http_error(status, headers=None) -> requests.HTTPError:
+    return requests.HTTPError(f"{status}", response=response(status, headers=headers))
+
+
+def connection_refused() -> requests.ConnectionError:
+    reason = urllib3.exceptions.NewConnectionError(None, "Connection refused")
+    return requests.ConnectionError(urllib3.exceptions.MaxRetryError(None, "/", reason))
+
+
+class FakeSession:
+    """ 정해둔 응답(또는 예외)을 순서대로 돌려주는 session """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """ 재시도 대기 시간을 기록하고 실제로는 기다리지 않음 """
+    slept = []
+    monkeypatch.setattr(time, "sleep", slept.append)
+    return slept
+
+
+def make_api(*results, **policy) -> GPlatformApi:
+    # breaker는 엔드포인트 단위로 공유되므로 테스트마다 다른 엔드포인트 사용
+    endpoint = f"http://{uuid.uuid4().hex}/client/api"
+    return GPlatformApi("key", "secret", session=FakeSession(*results), endpoint=endpoint,
+                        retry_policy=RetryPolicy(**{"base_delay": 0.01, **policy}))
+
+
+@pytest.mark.parametrize("error, safe_result, unsafe_result", [
+    (http_error(429), (True, False), (True, False)),
+    (http_error(503), (True, True), (True, True)),
+    (http_error(500), (True, True), (False, True)),
+    (http_error(504), (True, True), (False, True)),
+    (http_error(400), (False, False), (False, False)),
+    (http_error(404), (False, False), (False, False)),
+    (requests.ReadTimeout(), (True, True), (False, True)),
+    (requests.ConnectTimeout(), (True, True), (True, True)),
+    (connection_refused(), (True, True), (True, True)),
+    (requests.ConnectionError("Connection reset by peer"), (True, True), (False, True)),
+    (CircuitOpenError("open"), (False, False), (False, False)),
+])
+def test_classify(error, safe_result, unsafe_result):
+    assert classify(error, SAFE) == safe_result
+    assert classify(error, UNSAFE) == unsafe_result
+
+
+def test_delay_honours_retry_after():
+    policy = RetryPolicy(base_delay=0.01, max_delay=0.01)
+
+    assert policy.delay(0, "5") >= 5
+    assert policy.delay(3, None) <= 0.01
+    assert policy.delay(0, "Wed, 21 Oct 2015 07:28:00 GMT") <= 0.01  # HTTP 날짜 형식은 무시
+
+
+def test_request_waits_for_retry_after(sleeps):
+    throttled = []
+    api = make_api(response(429, headers={"Retry-After": "3"}), response(200, {"ok": True}))
+    api.on_throttle = throttled.append
+
+    assert api.list_disk() == {"ok": True}
+    assert api.session.calls == 2
+    assert sleeps and sleeps[0] >= 3
+    assert throttled == ["3"]
+
+
+def test_budget_is_spent_once_per_retry():
+    budget = RetryBudget(2)
+
+    assert budget.spend() and budget.spend()
+    assert not budget.spend()
+
+
+def test_request_stops_when_budget_is_exhausted(sleeps):
+    api = make_api(*[response(500)] * 4, budget=1)
+
+    with pytest.raises(requests.HTTPError):
+        api.list_disk()
+
+    assert api.session.calls == 2  # 첫 호출 + 예산 1번
+    assert api.retry_budget.remaining == 0
+
+
+def test_request_stops_after_max_attempts(sleeps):
+    api = make_api(*[requests.ConnectTimeout()] * 5, max_attempts=3)
+
+    with pytest.raises(requests.ConnectTimeout):
+        api.list_disk()
+
+    assert api.session.calls == 3
+
+
+def test_create_is_not_resent_after_read_timeout(sleeps):
+    api = make_api(requests.ReadTimeout(), response(200, {"jobid": "job-1"}))
+
+    with pytest.raises(requests.ReadTimeout):
+        api.create_disk_snapshot("vol-1", "disk1-2024-10-21")
+
+    assert api.session.calls == 1
+    assert sleeps == []
+
+
+@pytest.mark.parametrize("error", [http_error(500), requests.ConnectionError("Connection reset by peer")])
+def test_create_is_not_resent_when_server_may_have_processed_it(sleeps, error):
+    api = make_api(error, response(200, {"jobid": "job-1"}))
+
+    with pytest.raises(type(error)):
+        api.create_disk_snapshot("vol-1", "disk1-2024-10-21")
+
+    assert api.session.calls == 1
+
+
+@pytest.mark.parametrize("error", [requests.ConnectTimeout(), connection_refused(), http_error(503)])
+def test_create_is_resent_when_not_processed(sleeps, error):
+    api = make_api(error, response(200, {"jobid": "job-1"}))
+
+    assert api.create_disk_snapshot("vol-1", "disk1-2024-10-21") == {"jobid": "job-1"}
+    assert api.session.calls == 2
+
+
+def test_query_is_resent_after_read_timeout(sleeps):
+    api = make_api(requests.ReadTimeout(), response(200, {"jobstatus": 1}))
+
+    assert api.check_job("job-1") == {"jobstatus": 1}
+    assert api.session.calls == 2
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker("test", threshold=2, reset_timeout=0.05, max_wait=0)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):  # max_wait를 넘기므로 기다리지 않고 실패
+        breaker.before_call()
+
+    time.sleep(0.06)
+    breaker.before_call()  # 시험 호출 한 번은 통과
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker._wait_time() > 0  # 시험 호출 결과가 나올 때까지 다른 호출은 대기
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_breaker_reopens_when_probe_fails():
+    breaker = CircuitBreaker("test", threshold=3, reset_timeout=0.05, max_wait=0)
+    for _ in range(3):
+        breaker.record_failure()
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_failure()  # 시험 호출 실패는 threshold와 상관없이 바로 다시 열림
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_request_fails_fast_while_breaker_is_open(sleeps):
+    api = make_api(*[requests.ConnectTimeout()] * 2, response(200), max_attempts=1, breaker_threshold=2,
+                   breaker_reset=60, breaker_max_wait=0)
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectTimeout):
+            api.list_disk()
+
+    with pytest.raises(CircuitOpenError):
+        api.list_disk()
+
+    assert api.session.calls == 2
@@ -0,0 +1,124 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.common.scheduler import CATCH_UP_ONCE, CATCH_UP_SKIP, DeadlineScheduler
+
+DAY = timedelta(days=1)
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "scheduler_state.json")
+
+
+def queued(scheduler) -> list:
+    """ heap에 쌓인 (예약 시각, 다음 예약 등록 여부)를 실행 순서대로 반환 """
+    return [(slot, reschedule) for _, _, _, slot, reschedule in sorted(scheduler._heap, key=lambda item: item[:2])]
+
+
+def test_future_start_is_queued_once(state_path):
+    scheduler = DeadlineScheduler(state_path=state_path, max_workers=1)
+    start = datetime.now() + timedelta(hours=1)
+
+    scheduler.add("create", lambda: None, start, DAY)
+
+    assert queued(scheduler) == [(start, True)]
+    assert scheduler.next_run() == start
+
+
+def test_catch_up_once_runs_missed_slot_now(state_path):
+    scheduler = DeadlineScheduler(state_path=state_path, max_workers=1)
+    start = datetime.now() - 2 * DAY - timedelta(hours=1)  # 마지막 예약 시각은 1시간 전
+
+    scheduler.add("create", lambda: None, start, DAY, catch_up=CATCH_UP_ONCE)
+
+    last_slot = start + 2 * DAY
+    assert queued(scheduler) == [(last_slot, False), (last_slot + DAY, True)]
+    assert scheduler.next_run() <= datetime.now()
+
+
+def test_catch_up_once_skips_slot_already_done(state_path):
+    start = datetime.now() - 2 * DAY - timedelta(hours=1)
+    last_slot = start + 2 * DAY
+
+    scheduler = DeadlineScheduler(state_path=state_path, max_workers=1)
+    scheduler._state["create"] = last_slot
+    scheduler.add("create", lambda: None, start, DAY, catch_up=CATCH_UP_ONCE)
+
+    assert queued(scheduler) == [(last_slot + DAY, True)]
+
+
+def test_catch_up_skip_waits_for_next_slot(state_path):
+    scheduler = DeadlineScheduler(state_path=state_path, max_workers=1)
+    start = datetime.now() - 2 * DAY - timedelta(hours=1)
+
+    scheduler.add("create", lambda: None, start, DAY, catch_up=CATCH_UP_SKIP)
+
+    assert queued(scheduler) == [(start + 3 * DAY, True)]
+
+
+def test_running_task_is_not_dispatched_again(state_path):
+    scheduler = DeadlineScheduler(state_path=state_path, max_workers=2)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+
+    slot = datetime.now() - timedelta(minutes=1)
+    task = scheduler.add("create", func, slot + DAY, DAY)
+
+    scheduler._dispatch(task, slot)
+    assert started.wait(5)
+    scheduler._dispatch(task, slot + DAY)  # 이전 실행이 아직 끝나지 않음
+
+    release.set()
+    scheduler._executor.shutdown(wait=True)
+
+    assert calls == [1]
+    assert not task.running
+
+
+def test_finished_slot_is_persisted(state_path):
+    start = datetime.now() - 2 * DAY - timedelta(hours=1)
+    last_slot = start + 2 * DAY
+    done = threading.Event()
+
+    scheduler = DeadlineScheduler(state_path=state_path, max_workers=1)
+    scheduler.add("create", done.set, start, DAY, catch_up=CATCH_UP_ONCE)
+
+    thread = threading.Thread(target=scheduler.run_forever, daemon=True)
+    thread.start()
+    try:
+        assert done.wait(5)
+    finally:
+        scheduler.stop()
+        thread.join(5)
+
+    # 실행 기록 파일이 저장되도록 작업 종료까지 대기 (_state는 파일 저장 전에 바뀜)
+    scheduler._executor.shutdown(wait=True)
+
+    # 재시작해도 같은 예약 시각은 다시 실행하지 않음
+    restarted = DeadlineScheduler(state_path=state_path, max_workers=1)
+    assert restarted._state == {"create": last_slot}
+
+    restarted.add("create", lambda: None, start, DAY, catch_up=CATCH_UP_ONCE)
+    assert queued(restarted) == [(last_slot + DAY, True)]
+
+
+def test_failing_task_does_not_stop_scheduler(state_path):
+    scheduler = DeadlineScheduler(state_path=state_path, max_workers=1)
+    slot = datetime.now()
+
+    def func():
+        raise SystemExit(1)
+
+    task = scheduler.add("create", func, slot + DAY, DAY)
+    scheduler._run(task, slot)
+
+    assert not task.running
+    assert scheduler._state["create"] == slot
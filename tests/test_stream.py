@@ -0,0 +1,85 @@
+import json
+import random
+
+import pytest
+
+from src.manager.stream import iter_records
+
+SNAPSHOTS = [{"id": f"snap-{i}", "name": f"디스크-{i}-2024-10-21", "tags": [], "note": "a]b}c,\"d\""}
+             for i in range(20)]
+
+
+def body(items, key="snapshot") -> bytes:
+    return json.dumps({"listsnapshotsresponse": {"count": len(items), key: items}}, ensure_ascii=False).encode()
+
+
+def split(data, sizes) -> list:
+    """ data를 sizes 크기의 조각으로 나눔 (마지막은 남은 전부) """
+    chunks, pos = [], 0
+    for size in sizes:
+        chunks.append(data[pos:pos + size])
+        pos += size
+    chunks.append(data[pos:])
+
+    return [chunk for chunk in chunks if chunk]
+
+
+def parse(chunks) -> list:
+    return list(iter_records(chunks, "listsnapshotsresponse", "snapshot", lambda item: item))
+
+
+def test_single_chunk():
+    assert parse([body(SNAPSHOTS)]) == SNAPSHOTS
+
+
+def test_one_byte_chunks():
+    data = body(SNAPSHOTS)
+    assert parse([data[i:i + 1] for i in range(len(data))]) == SNAPSHOTS
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_chunk_boundaries(seed):
+    data = body(SNAPSHOTS)
+    rng = random.Random(seed)
+    assert parse(split(data, [rng.randint(1, 64) for _ in range(len(data))])) == SNAPSHOTS
+
+
+def test_multibyte_character_split_across_chunks():
+    data = body(SNAPSHOTS[:1])
+    pos = data.index("디".encode()) + 1  # 3바이트 문자 중간에서 자름
+    assert parse([data[:pos], data[pos:]]) == SNAPSHOTS[:1]
+
+
+def test_whitespace_between_items():
+    data = json.dumps({"listsnapshotsresponse": {"snapshot": SNAPSHOTS[:3]}}, indent=4).encode()
+    assert parse([data[i:i + 7] for i in range(0, len(data), 7)]) == SNAPSHOTS[:3]
+
+
+def test_empty_list():
+    assert parse([body([])]) == []
+
+
+def test_missing_item_key_falls_back_to_full_parse():
+    data = json.dumps({"listsnapshotsresponse": {}}).encode()
+    assert parse([data[:5], data[5:]]) == []
+
+
+def test_truncated_response_raises():
+    data = body(SNAPSHOTS[:3])
+    with pytest.raises(json.JSONDecodeError):
+        parse([data[:len(data) // 2]])
+
+
+def test_count_before_list_is_reported():
+    meta = {}
+    data = body(SNAPSHOTS[:3])
+    assert list(iter_records([data[:10], data[10:]], "listsnapshotsresponse", "snapshot", lambda item: item,
+                             meta)) == SNAPSHOTS[:3]
+    assert meta == {"count": 3}
+
+
+def test_count_without_list_is_reported():
+    meta = {}
+    data = json.dumps({"listsnapshotsresponse": {"count": 0}}).encode()
+    assert list(iter_records([data], "listsnapshotsresponse", "snapshot", lambda item: item, meta)) == []
+    assert meta == {"count": 0}